@@ -1,3 +1,5 @@
+import db
+db.configure(db.MEMORY)  # base en mémoire : ne touche pas data/game.db
 from db import DB
 print('create:', DB.create_user('tmp_user3','Tmp3','secret123',None))
 print('auth:', DB.authenticate('tmp_user3','secret123'))
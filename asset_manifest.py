@@ -0,0 +1,180 @@
+# ========================================
+# MANIFESTE DES ASSETS
+# Métadonnées des images précalculées par build_manifest (table asset_manifest) :
+# py -m tools.build_manifest, ou en arrière-plan par le jeu quand le manifeste est incomplet
+# Validé en une fois au démarrage : ensuite, aucun chargeur ne sonde le disque image par image
+# ========================================
+
+# === IMPORTS ===
+import hashlib  # Empreinte du contenu des fichiers
+import os  # Parcours du dossier assets (os.scandir) et normalisation des chemins
+from pathlib import Path  # Parcours des dossiers (build_manifest)
+from typing import Dict, Optional, Set
+import pygame as pg  # Chargement des images
+from config import ASSETS_DIR  # Racine des fichiers décrits par le manifeste
+from models import Asset  # Entrée du manifeste
+from repositories import AssetRepo  # Lecture de la table asset_manifest
+
+IMAGE_EXTS = (".png", ".jpg", ".jpeg")  # Fichiers décrits par le manifeste (les sons n'y sont pas)
+
+
+def normalize_path(path: str) -> str:
+    """Chemin relatif avec des "/" (forme utilisée en base et dans config.py)."""
+    return os.path.normpath(path).replace(os.sep, "/")
+
+
+def is_under(path: str, root: str) -> bool:
+    """Le chemin normalisé `path` est-il `root` ou dans un de ses sous-dossiers ?"""
+    return path == root or path.startswith(root + "/")
+
+
+def file_hash(path: Path) -> str:
+    """Calcule l'empreinte (blake2b) du contenu d'un fichier."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):  # lecture par blocs de 64 Ko
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class AssetManifest:
+    """Vue validée du manifeste : fichiers présents sur le disque + métadonnées encore à jour."""
+
+    def __init__(self, root: str = ASSETS_DIR):
+        self.root = normalize_path(root)
+        self.entries: Dict[str, Asset] = {}  # chemin -> métadonnées (seulement si le fichier n'a pas changé)
+        self.on_disk: Optional[Set[str]] = None  # fichiers présents sous root (None = pas encore validé)
+
+    def validate(self) -> dict:
+        """Parcourt root une seule fois (os.scandir) et confronte le disque au manifeste.
+
+        Une entrée dont la taille ne correspond plus est ignorée (le chargeur retombe sur
+        le décodage) ; on compare la taille et non la date, qui change à chaque copie du jeu.
+
+        Returns:
+            dict: {"recorded", "valid", "stale", "missing": [chemins], "unlisted"}
+        """
+        sizes = {}
+        stack = [self.root]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        if entry.is_dir():
+                            stack.append(entry.path)
+                        else:
+                            sizes[normalize_path(entry.path)] = entry.stat().st_size
+            except OSError:
+                continue  # dossier illisible ou absent : ses fichiers seront "manquants"
+        self.on_disk = set(sizes)
+
+        recorded = AssetRepo.all()
+        self.entries = {p: a for p, a in recorded.items() if sizes.get(p) == a.size}
+        missing = sorted(p for p in recorded if p not in sizes)
+        return {
+            "recorded": len(recorded),
+            "valid": len(self.entries),
+            "stale": len(recorded) - len(self.entries) - len(missing),
+            "missing": missing,
+            "unlisted": sum(1 for p in self.on_disk - set(recorded) if p.lower().endswith(IMAGE_EXTS)),
+        }
+
+    def _is_under_root(self, path: str) -> bool:
+        return is_under(path, self.root)
+
+    def exists(self, path: str) -> bool:
+        """Le fichier existe-t-il ? Réponse en mémoire pour tout ce qui est sous root."""
+        path = normalize_path(path)
+        if self.on_disk is not None and self._is_under_root(path):
+            return path in self.on_disk
+        return os.path.exists(path)  # pas encore validé, ou fichier hors du dossier assets
+
+    def info(self, path: str) -> Optional[Asset]:
+        """Métadonnées à jour d'une image, ou None (inconnue du manifeste ou modifiée depuis)."""
+        return self.entries.get(normalize_path(path))
+
+    def load_image(self, path: str, size=None) -> Optional[pg.Surface]:
+        """Charge (et redimensionne) une image, ou renvoie None si elle n'existe pas.
+
+        Grâce au manifeste, on sait avant décodage s'il faut convert() ou convert_alpha(),
+        et on évite le redimensionnement quand l'image a déjà la taille voulue.
+        """
+        if not self.exists(path):
+            return None
+        img = pg.image.load(path)
+        asset = self.info(path)
+        has_alpha = asset.has_alpha if asset else img.get_alpha() is not None
+        img = img.convert_alpha() if has_alpha else img.convert()
+        if size is None:
+            return img
+        size = (int(size[0]), int(size[1]))
+        if asset and (asset.width, asset.height) == size:
+            return img  # déjà à la bonne taille
+        return pg.transform.smoothscale(img, size)
+
+    def content_rect(self, path: str, size) -> Optional[pg.Rect]:
+        """Rectangle des pixels visibles, ramené à une image redimensionnée en `size`.
+
+        Sert à cliquer sur le vêtement lui-même et non sur ses bords transparents.
+        """
+        asset = self.info(path)
+        if asset is None or not asset.width or not asset.height:
+            return None
+        sx, sy = size[0] / asset.width, size[1] / asset.height
+        return pg.Rect(round(asset.bbox_x * sx), round(asset.bbox_y * sy),
+                       round(asset.bbox_w * sx), round(asset.bbox_h * sy))
+
+
+# ========================================
+# CONSTRUCTION DU MANIFESTE
+# ========================================
+def describe(path: Path, digest: str) -> tuple:
+    """Décode une image et renvoie sa ligne de manifeste (ordre de ASSET_COLUMNS)."""
+    img = pg.image.load(str(path))
+    has_alpha = bool(img.get_flags() & pg.SRCALPHA)
+    # Rectangle des pixels non transparents (toute l'image si elle n'a pas d'alpha)
+    bbox = img.get_bounding_rect() if has_alpha else img.get_rect()
+    return (normalize_path(str(path)), os.path.getsize(path), img.get_width(), img.get_height(),
+            int(has_alpha), bbox.x, bbox.y, bbox.w, bbox.h, digest)
+
+
+def build_manifest(root: str = ASSETS_DIR, dry_run: bool = False) -> dict:
+    """Met le manifeste à jour : seules les images nouvelles ou modifiées sont décodées.
+
+    Returns:
+        dict: compteurs {"scanned", "new", "updated", "unchanged", "removed"}
+    """
+    existing = AssetRepo.all()
+    stats = {"scanned": 0, "new": 0, "updated": 0, "unchanged": 0, "removed": 0}
+    rows = []
+    seen = set()
+
+    for path in sorted(Path(root).rglob("*")):
+        if not path.is_file() or path.suffix.lower() not in IMAGE_EXTS:
+            continue
+        stats["scanned"] += 1
+        key = normalize_path(str(path))
+        seen.add(key)
+        digest = file_hash(path)
+        current = existing.get(key)
+        if current is not None and current.content_hash == digest:
+            if current.size != os.path.getsize(path):
+                rows.append(describe(path, digest))  # taille incohérente : on réécrit
+                stats["updated"] += 1
+            else:
+                stats["unchanged"] += 1
+            continue
+        rows.append(describe(path, digest))
+        stats["new" if current is None else "updated"] += 1
+
+    # Seules les entrées sous root ont été parcourues (--dir assets/clothes ne touche pas aux fonds)
+    root_key = normalize_path(str(root))
+    removed = [p for p in existing if p not in seen and is_under(p, root_key)]
+    stats["removed"] = len(removed)
+    if not dry_run and (rows or removed):
+        AssetRepo.sync(rows, removed)  # une seule transaction
+    return stats
+
+
+# Instance partagée par les scènes (validée par Game au démarrage)
+MANIFEST = AssetManifest()
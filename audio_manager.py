@@ -1,19 +1,68 @@
 # ========================================
 # GESTIONNAIRE AUDIO / MUSIQUE
-# Contrôle la lecture des musiques de fond
+# Contrôle la lecture des musiques de fond et des effets sonores
+# Les pistes sont décodées en arrière-plan (pg.mixer.Sound) et jouées sur deux canaux réservés :
+# changer de piste = fondu enchaîné entre les deux canaux, sans jamais bloquer une frame
+# Les effets sont décodés une fois au démarrage (SfxBank) et joués sur leur propre groupe de canaux
 # ========================================
 
 # === IMPORTS ===
+import os  # Vérification de la playlist au démarrage
+import sqlite3  # Erreur de lecture des enveloppes (base verrouillée, table absente)
+from concurrent.futures import Future, ThreadPoolExecutor  # Décodage des pistes hors de la boucle de rendu
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np  # Bips de remplacement synthétisés (effets sans fichier)
 import pygame as pg  # Pygame pour la gestion audio
+from asset_manifest import file_hash  # Empreinte du fichier = clé de son enveloppe
+from config import MUSIC_CROSSFADE_MS  # Durée du fondu enchaîné entre deux pistes
+from config import SFX_CHANNELS, SFX_PATHS, SFX_VOLUME  # Effets sonores
+from models import AudioEnvelope
+from repositories import EnvelopeRepo  # Enveloppes d'énergie précalculées (py -m tools.analyze_audio)
+
+MUSIC_CHANNELS = 2  # Canaux réservés à la musique (piste qui part + piste qui arrive)
+# Priorité de chaque effet : quand tous les canaux sont pris, un effet coupe le plus ancien
+# des effets de priorité inférieure ou égale (sinon il n'est pas joué)
+SFX_PRIORITIES = {"click": 1, "pickup": 1, "drop": 2, "replace": 2, "remove": 2, "validate": 3}
+# Bip synthétisé quand le fichier de l'effet manque : (fréquence en Hz, durée en ms)
+SFX_FALLBACK_TONES = {"click": (880, 40), "pickup": (660, 60), "drop": (440, 90), "replace": (550, 110),
+                      "remove": (330, 90), "validate": (990, 250)}
+
+
+def validate_playlist(tracks: List[str]):
+    """Sépare la playlist en (pistes présentes sur le disque, pistes introuvables)."""
+    valid, missing = [], []
+    for path in tracks:
+        (valid if os.path.isfile(path) else missing).append(path)
+    return valid, missing
+
+
+def _decode(path: str):
+    """Sur le thread de décodage : (Sound, enveloppe précalculée ou None)."""
+    sound = pg.mixer.Sound(path)
+    try:
+        envelope = EnvelopeRepo.by_hash(file_hash(Path(path)))
+    except (sqlite3.Error, OSError) as e:
+        # Base indisponible : la musique joue quand même, le disque tourne simplement à vitesse constante
+        print(f"⚠ Enveloppe de {path} illisible : {e}")
+        envelope = None
+    return sound, envelope
 
 
 # === CLASSE AUDIO MANAGER ===
 class AudioManager:
-    """Gère la lecture des musiques de fond du jeu."""
-    
+    """Gère la lecture des musiques de fond du jeu.
+
+    Une piste est décodée une fois sur un thread dédié (Future lu dans update()), puis jouée
+    en boucle sur l'un des deux canaux réservés ; la piste suivante est décodée à l'avance.
+    """
+
     def __init__(self, tracks, volume=0.6):
         """Initialise le gestionnaire avec une liste de pistes musical."""
-        self.tracks = tracks[:]  # Copie la liste des fichiers de musique
+        # Playlist vérifiée une fois ici : une piste absente n'est jamais proposée
+        self.tracks, missing = validate_playlist(tracks)
+        if missing:
+            print(f"⚠ {len(missing)} musique(s) introuvable(s) : {', '.join(missing)}")
         self.index = 0  # Index de la piste actuelle (commence par 0 = première piste)
         self.volume = volume  # Volume sonore (0.0 à 1.0)
         self.paused = False  # État pausé (False = en lecture)
@@ -22,52 +71,247 @@ class AudioManager:
         if not pg.mixer.get_init():
             pg.mixer.init()
 
-        # Fixe le volume de la musique
-        pg.mixer.music.set_volume(self.volume)
+        # Deux canaux gardés pour la musique : pg.mixer.find_channel() (effets sonores) ne les prend jamais
+        pg.mixer.set_reserved(MUSIC_CHANNELS)
+        self.channels = [pg.mixer.Channel(i) for i in range(MUSIC_CHANNELS)]
+        self.current = 0  # canal de la piste en cours
+        self.playing: Optional[int] = None  # index de la piste qui joue (None = silence)
+        self.wanted: Optional[int] = None  # index demandé, lancé par update() dès qu'il est décodé
+
+        # Pistes décodées (au plus la piste en cours + la suivante : ~25 Mo chacune)
+        self.sounds: Dict[int, pg.mixer.Sound] = {}
+        self.envelopes: Dict[int, AudioEnvelope] = {}  # index -> enveloppe (quelques Ko, gardées)
+        self.started_at = 0  # pg.time.get_ticks() au départ de la piste en cours (décalé par les pauses)
+        self.paused_at = 0  # pg.time.get_ticks() au moment de la pause
+        self.loading: Dict[int, Future] = {}  # index -> décodage en cours
+        self.loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="newstyle-audio")
+        if self.tracks:
+            self._preload(self.index)  # première piste prête avant l'arrivée au menu
+
+    # --- Décodage en arrière-plan ---
+    def _preload(self, index):
+        """Lance le décodage d'une piste si elle n'est ni prête ni en cours de décodage."""
+        if index not in self.sounds and index not in self.loading:
+            self.loading[index] = self.loader.submit(_decode, self.tracks[index])
+
+    def _collect(self):
+        """Récupère les pistes décodées (appelé depuis la boucle principale)."""
+        for index, job in list(self.loading.items()):
+            if not job.done():
+                continue
+            del self.loading[index]
+            try:
+                self.sounds[index], envelope = job.result()
+            except (pg.error, OSError) as e:
+                print(f"Erreur lors du décodage de {self.tracks[index]} : {e}")
+                if self.wanted == index:
+                    self.wanted = None
+                continue
+            if envelope is not None:
+                self.envelopes[index] = envelope
+        # Libère les pistes qui ne servent plus (ni en cours, ni demandée, ni suivante)
+        keep = {self.playing, self.wanted, self._next_index()}
+        for index in [i for i in self.sounds if i not in keep]:
+            del self.sounds[index]
+
+    def _next_index(self):
+        target = self.wanted if self.wanted is not None else self.index
+        return (target + 1) % len(self.tracks) if self.tracks else None
 
+    def update(self, dt):
+        """À appeler à chaque frame : démarre la piste demandée dès qu'elle est décodée (fondu enchaîné)."""
+        self._collect()
+        if self.wanted is not None and self.wanted in self.sounds and not self.paused:
+            self._crossfade(self.wanted)
+            self.wanted = None
+            self._preload(self._next_index())  # next_track() suivant : instantané
+
+    def _crossfade(self, index):
+        """Fait partir la piste en cours et arriver `index` sur l'autre canal (fondus gérés par SDL_mixer)."""
+        old = self.channels[self.current]
+        if self.playing is not None and old.get_busy():
+            self.current = 1 - self.current
+            old.fadeout(MUSIC_CROSSFADE_MS)
+            fade_in = MUSIC_CROSSFADE_MS
+        else:
+            fade_in = 0  # rien ne joue : départ franc
+        channel = self.channels[self.current]
+        channel.set_volume(self.volume)
+        channel.play(self.sounds[index], loops=-1, fade_ms=fade_in)  # boucle infinie (-1)
+        self.playing = index
+        self.started_at = pg.time.get_ticks()
+
+    def position(self) -> float:
+        """Position de lecture dans la piste en cours (secondes), 0 si rien ne joue."""
+        if self.playing is None or self.playing not in self.sounds:
+            return 0.0
+        now = self.paused_at if self.paused else pg.time.get_ticks()
+        return ((now - self.started_at) / 1000) % max(self.sounds[self.playing].get_length(), 1e-3)
+
+    def level(self) -> Optional[Tuple[float, float]]:
+        """(volume, battement) entre 0 et 1 à la position de lecture, lus dans l'enveloppe précalculée.
+
+        None si rien ne joue ou si la piste n'a pas été analysée (py -m tools.analyze_audio).
+        """
+        envelope = self.envelopes.get(self.playing) if self.playing is not None and not self.paused else None
+        if envelope is None or not envelope.rms:
+            return None
+        i = min(int(self.position() * envelope.rate), len(envelope.rms) - 1)
+        return envelope.rms[i] / 255, envelope.beat[i] / 255
+
+    # --- Commandes ---
     def play(self, index=None):
         """Lance la lecture d'une piste (ou continue la piste actuelle)."""
         # Vérifie qu'il y a des pistes disponibles
         if not self.tracks:
             return
-        
+
         # Si un index est fourni, on va à cette piste
         if index is not None:
             self.index = index % len(self.tracks)  # Modulo pour boucler si index > taille liste
 
-        # Arrête la musique actuelle
-        pg.mixer.music.stop()
-        # Charge la piste sélectionnée
-        pg.mixer.music.load(self.tracks[self.index])
-        # Lance la lecture avec boucle infinie (-1)
-        pg.mixer.music.play(-1)
-        # Marque comme non pausé
-        self.paused = False
+        if self.paused:
+            self.toggle_pause()  # reprend là où la pause a arrêté la piste
+        if self.index == self.playing and self.channels[self.current].get_busy():
+            self.wanted = None  # déjà en cours : on ne la relance pas
+            return
+        # La piste démarre dans update() dès qu'elle est décodée (tout de suite si elle l'est déjà)
+        self.wanted = self.index
+        self._preload(self.index)
+        self.update(0)
 
     def next_track(self):
-        """Passe à la piste suivante."""
+        """Passe à la piste suivante (fondu enchaîné, sans attendre le décodage)."""
         # Vérifie qu'il y a des pistes disponibles
         if not self.tracks:
             return
-        
+
         # Passe à la piste suivante (ou revient à la première si c'était la dernière)
         self.index = (self.index + 1) % len(self.tracks)
         # Lance la lecture de la nouvelle piste
         self.play()
 
+    def stop(self):
+        """Coupe la musique (fondu court) ; play() la relancera."""
+        for channel in self.channels:
+            channel.fadeout(MUSIC_CROSSFADE_MS // 4)
+        self.playing = self.wanted = None
+        self.paused = False
+
     def is_playing(self):
-        """Retourne True si une musique est en cours de lecture."""
-        # get_busy() = True si une musique joue actuellement
+        """Retourne True si une musique est en cours de lecture (ou sur le point de démarrer)."""
         # Vérifie aussi qu'on n'est pas en pause
-        return pg.mixer.music.get_busy() and not self.paused
+        if self.paused:
+            return False
+        return self.wanted is not None or (self.playing is not None and self.channels[self.current].get_busy())
 
     def toggle_pause(self):
         """Bascule entre pause et lecture."""
         if self.paused:
             # Si on était en pause, on relance la lecture
-            pg.mixer.music.unpause()
+            for channel in self.channels:
+                channel.unpause()
             self.paused = False
+            self.started_at += pg.time.get_ticks() - self.paused_at  # la pause ne compte pas dans la position
         else:
             # Si on jouait, on met en pause
-            pg.mixer.music.pause()
+            for channel in self.channels:
+                channel.pause()
             self.paused = True
+            self.paused_at = pg.time.get_ticks()
+
+    def shutdown(self):
+        """Arrête le thread de décodage (à la fermeture du jeu)."""
+        self.loader.shutdown(wait=False, cancel_futures=True)
+
+
+# === BANQUE D'EFFETS SONORES ===
+def _tone(freq: int, duration_ms: int) -> Optional[pg.mixer.Sound]:
+    """Bip sinusoïdal amorti, au format du mixer (None si ce format n'est pas géré)."""
+    rate, fmt, channels = pg.mixer.get_init()
+    t = np.arange(int(rate * duration_ms / 1000)) / rate
+    wave = np.sin(2 * np.pi * freq * t) * np.exp(-t * 6000 / duration_ms) * 0.4  # entre -0.4 et 0.4
+    dtypes = {-8: np.int8, 8: np.uint8, -16: np.int16, 16: np.uint16, -32: np.int32, 32: np.float32}
+    dtype = dtypes.get(fmt)
+    if dtype is None:
+        return None
+    if dtype is not np.float32:
+        info = np.iinfo(dtype)
+        wave = wave * (info.max - info.min) / 2 + (info.max + info.min + 1) / 2
+    samples = wave.astype(dtype)
+    if channels > 1:
+        samples = np.repeat(samples[:, None], channels, axis=1)
+    return pg.sndarray.make_sound(np.ascontiguousarray(samples))
+
+
+class SfxBank:
+    """Effets sonores décodés une fois, joués sur un groupe de canaux réservés.
+
+    Jouer un effet ne décode rien : play() choisit un canal libre du groupe, ou coupe
+    l'effet le moins prioritaire (le plus ancien à priorité égale) si tous sont pris.
+    """
+
+    def __init__(self):
+        self.sounds: Dict[str, pg.mixer.Sound] = {}  # nom -> effet décodé (vide tant que load() n'a pas tourné)
+        self.channels: List[pg.mixer.Channel] = []
+        self.voices: List[tuple] = []  # par canal : (priorité, numéro d'ordre) de l'effet en cours
+        self.sequence = 0  # numéro d'ordre du dernier effet lancé
+        self.stats = {"played": 0, "stolen": 0, "dropped": 0}
+
+    def load(self, paths: Dict[str, str] = SFX_PATHS, channels: int = SFX_CHANNELS, volume: float = SFX_VOLUME) -> dict:
+        """Décode tous les effets et réserve leurs canaux (juste après MUSIC_CHANNELS).
+
+        Returns:
+            dict: {"loaded": [noms], "synthesized": [noms]} (synthétisé = fichier absent ou illisible)
+        """
+        if not pg.mixer.get_init():
+            pg.mixer.init()
+        report = {"loaded": [], "synthesized": []}
+        for name, path in paths.items():
+            try:
+                sound = pg.mixer.Sound(path) if os.path.isfile(path) else None
+            except pg.error:
+                sound = None
+            if sound is None:
+                sound = _tone(*SFX_FALLBACK_TONES.get(name, (660, 80)))
+                if sound is None:
+                    continue
+                report["synthesized"].append(name)
+            else:
+                report["loaded"].append(name)
+            sound.set_volume(volume)
+            self.sounds[name] = sound
+
+        first = MUSIC_CHANNELS
+        pg.mixer.set_num_channels(max(pg.mixer.get_num_channels(), first + channels))
+        pg.mixer.set_reserved(first + channels)  # find_channel() ne prendra ni la musique ni les effets
+        self.channels = [pg.mixer.Channel(i) for i in range(first, first + channels)]
+        self.voices = [(0, 0)] * channels
+        return report
+
+    def play(self, name: str, priority: Optional[int] = None) -> bool:
+        """Joue un effet déjà décodé. Renvoie False s'il n'a pas pu être joué (inconnu, ou canaux plus prioritaires)."""
+        sound = self.sounds.get(name)
+        if sound is None or not self.channels:
+            return False
+        if priority is None:
+            priority = SFX_PRIORITIES.get(name, 1)
+        free = [i for i, channel in enumerate(self.channels) if not channel.get_busy()]
+        if free:
+            slot = free[0]
+        else:
+            # Vol de voix : l'effet le moins prioritaire, puis le plus ancien
+            slot = min(range(len(self.voices)), key=self.voices.__getitem__)
+            if self.voices[slot][0] > priority:
+                self.stats["dropped"] += 1
+                return False
+            self.stats["stolen"] += 1
+        self.sequence += 1
+        self.voices[slot] = (priority, self.sequence)
+        self.channels[slot].play(sound)
+        self.stats["played"] += 1
+        return True
+
+
+# Instance partagée par les scènes et les widgets (chargée par Game au démarrage)
+SFX = SfxBank()
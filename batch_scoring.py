@@ -0,0 +1,84 @@
+# ========================================
+# SCORING PAR LOTS (NUMPY)
+# Note des milliers/millions de tenues d'un coup avec les mêmes règles que Scoring.score
+# Une tenue = une ligne d'indices de vêtements, complétée par -1 (case vide)
+# ========================================
+
+# === IMPORTS ===
+from typing import Iterable, List, Sequence
+import numpy as np  # Calcul vectorisé sur toutes les tenues à la fois
+from models import Garment
+from scoring_rules import NO_THEME, get_rules  # Règles du score compilées (mêmes tables que Scoring.score)
+
+EMPTY = -1  # Indice d'une case vide dans une ligne de tenue
+
+
+class BatchScorer:
+    """Scoring vectorisé d'un grand nombre de tenues sur un catalogue fixé.
+
+    Chaque vêtement du catalogue reçoit un indice (sa position dans `garments`).
+    Les tenues sont une matrice (n_tenues, largeur) de ces indices, EMPTY pour les cases vides.
+    """
+
+    def __init__(self, garments: Sequence[Garment]):
+        self.garments = list(garments)
+        self.index_of = {g.id: i for i, g in enumerate(self.garments)}  # garment.id -> indice
+        self.rules = get_rules()
+        self.theme_codes = self.rules.theme_codes  # thèmes des règles, dans l'ordre de leurs indices
+        # Indice de thème de chaque vêtement (NO_THEME = aucun), comme ScoringRules.theme_of
+        self.garment_theme = np.array([self.rules.theme_of(g.score_theme) for g in self.garments], dtype=np.int32)
+        # Table (n_thèmes, n_vêtements + 1) : points de chaque vêtement pour chaque thème,
+        # dernière colonne à 0 pour EMPTY. Les règles sont compilées en une fois ici.
+        n_cats = len(self.rules.category_index)
+        cat = np.array([self.rules.category_index.get(g.category_id, n_cats) for g in self.garments], dtype=np.int32)
+        # Une colonne de plus par thème pour les catégories inconnues des règles (bonus du thème seul)
+        gains = np.array([row + [bonus] for row, bonus in zip(self.rules.gains, self.rules.theme_bonus)],
+                         dtype=np.int32).reshape(len(self.theme_codes), n_cats + 1)
+        self.gain_table = np.zeros((len(self.theme_codes), len(self.garments) + 1), dtype=np.int32)
+        # Harmonie : classe de palette de chaque vêtement (-1 = pas de palette -> dernière colonne à 0)
+        palette = np.array([self.rules.palette_class.get(g.id, -1) for g in self.garments], dtype=np.int32)
+        palette_gains = np.array([row + [0] for row in self.rules.palette_gains], dtype=np.int32) \
+            .reshape(len(self.theme_codes), -1)
+        for t in range(len(self.theme_codes)):
+            self.gain_table[t, :-1] = np.where(self.garment_theme == t, gains[t, cat], 0) + palette_gains[t, palette]
+
+    def encode(self, outfits: Iterable[Iterable[Garment]], width: int = None) -> np.ndarray:
+        """Transforme des listes de vêtements en matrice d'indices (complétée par EMPTY)."""
+        rows = [[self.index_of[g.id] for g in outfit] for outfit in outfits]
+        width = width if width is not None else max((len(r) for r in rows), default=0)
+        matrix = np.full((len(rows), width), EMPTY, dtype=np.int32)
+        for i, r in enumerate(rows):
+            matrix[i, :len(r)] = r
+        return matrix
+
+    def gains(self, theme_code: str) -> np.ndarray:
+        """Points apportés par chaque vêtement pour ce thème, plus une case finale à 0 (pour EMPTY)."""
+        t = self.rules.theme_of(theme_code)
+        if t == NO_THEME:
+            return np.zeros(len(self.garments) + 1, dtype=np.int32)
+        return self.gain_table[t]
+
+    def size_points(self, width: int) -> np.ndarray:
+        """Points de taille pour 0..width vêtements (indexés par le nombre de vêtements)."""
+        return np.array([self.rules.size(n) for n in range(width + 1)], dtype=np.int32)
+
+    def score(self, theme_code: str, outfits: np.ndarray) -> np.ndarray:
+        """Score de chaque ligne de `outfits` (mêmes résultats que Scoring.score, tenue par tenue)."""
+        outfits = np.asarray(outfits, dtype=np.int32)
+        gains = self.gains(theme_code)
+        # EMPTY (-1) désigne la dernière case de `gains`, qui vaut 0 : pas de masque à appliquer
+        matching = gains[outfits].sum(axis=1, dtype=np.int32)
+        count = (outfits != EMPTY).sum(axis=1, dtype=np.int32)
+        size = self.size_points(outfits.shape[1])[count]
+        return np.maximum(0, self.rules.base + matching + size)
+
+    def score_all_themes(self, outfits: np.ndarray) -> np.ndarray:
+        """Scores (n_tenues, n_thèmes) pour tous les thèmes du catalogue, dans l'ordre de theme_codes."""
+        return np.stack([self.score(t, outfits) for t in self.theme_codes], axis=1) \
+            if self.theme_codes else np.zeros((len(outfits), 0), dtype=np.int32)
+
+    def rank(self, theme_code: str, outfits: np.ndarray, k: int = 10) -> List[int]:
+        """Indices des k meilleures tenues (score décroissant, ordre d'entrée en cas d'égalité)."""
+        scores = self.score(theme_code, outfits)
+        order = np.argsort(-scores, kind="stable")
+        return order[:k].tolist()
@@ -0,0 +1,120 @@
+# ========================================
+# INDEX DE RECHERCHE DU CATALOGUE
+# Index inversés construits une fois depuis la base : chaque frappe dans la
+# recherche de la galerie ne fait que des intersections d'ensembles d'ids
+# ========================================
+
+# === IMPORTS ===
+import re  # Découpage des noms en mots
+from bisect import bisect_left, bisect_right  # Préfixes dans le vocabulaire trié, tranches de prix
+from collections import defaultdict  # Ensembles d'ids créés à la volée
+from typing import Dict, List, Optional, Set
+from config import PRICE_BUCKETS  # Bornes des tranches de prix
+from db import normalize_code as normalize  # Minuscules sans accents (même forme que les codes de thème)
+from repositories import GarmentRepo  # Lecture du catalogue page par page
+
+_WORD = re.compile(r"\w+")  # un mot = lettres/chiffres consécutifs
+SHORT_PREFIX = 2  # préfixes de 1 à 2 lettres précalculés (ils touchent une grande partie du catalogue)
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Découpe un texte normalisé en mots."""
+    return _WORD.findall(normalize(text))
+
+
+def price_bucket(price: Optional[int]) -> int:
+    """Indice de la tranche de prix (0 = moins de PRICE_BUCKETS[0], ...)."""
+    return bisect_right(PRICE_BUCKETS, price or 0)
+
+
+def price_bucket_labels() -> List[str]:
+    """Libellés des tranches de prix, ex: ["< 10", "10-19", "20+"]."""
+    bounds = list(PRICE_BUCKETS)
+    labels = [f"< {bounds[0]}"]
+    labels += [f"{lo}-{hi - 1}" for lo, hi in zip(bounds, bounds[1:])]
+    labels.append(f"{bounds[-1]}+")
+    return labels
+
+
+class CatalogIndex:
+    """Index inversés du catalogue : mot, thème, catégorie et tranche de prix -> ids de vêtements.
+
+    Seuls des ids (entiers) sont gardés en mémoire, pas les vêtements : la galerie
+    relit ensuite les vêtements trouvés par pages (GarmentRepo.by_ids).
+    """
+
+    def __init__(self):
+        self.by_token: Dict[str, Set[int]] = defaultdict(set)  # mot du nom -> ids
+        self.by_short_prefix: Dict[str, Set[int]] = defaultdict(set)  # "r", "ro" -> ids (évite de gros unions)
+        self.by_theme: Dict[str, Set[int]] = defaultdict(set)  # thème normalisé -> ids
+        self.by_category: Dict[int, Set[int]] = defaultdict(set)  # category_id -> ids
+        self.by_price: Dict[int, Set[int]] = defaultdict(set)  # tranche de prix -> ids
+        self.rank: Dict[int, int] = {}  # id -> position dans l'ordre de la galerie (catégorie, id)
+        self.vocabulary: List[str] = []  # mots triés (recherche par préfixe)
+
+    @classmethod
+    def build(cls, page_size: int = 1000) -> "CatalogIndex":
+        """Construit l'index en un seul parcours du catalogue (à lancer sur le thread de travail)."""
+        index = cls()
+        for page in GarmentRepo.iter_pages(page_size):
+            for g in page:
+                index.add(g)
+        index.vocabulary = sorted(index.by_token)
+        return index
+
+    def add(self, g):
+        """Indexe un vêtement (les vêtements arrivent dans l'ordre de la galerie)."""
+        self.rank[g.id] = len(self.rank)
+        for token in tokenize(g.name):
+            self.by_token[token].add(g.id)
+            for k in range(1, min(SHORT_PREFIX, len(token)) + 1):
+                self.by_short_prefix[token[:k]].add(g.id)
+        if g.score_theme:
+            self.by_theme[normalize(g.score_theme)].add(g.id)
+        self.by_category[g.category_id].add(g.id)
+        self.by_price[price_bucket(g.price)].add(g.id)
+
+    def themes(self) -> List[str]:
+        """Thèmes présents dans le catalogue (normalisés, triés)."""
+        return sorted(self.by_theme)
+
+    def _prefix(self, prefix: str) -> Set[int]:
+        """Ids dont le nom contient un mot commençant par `prefix`."""
+        if len(prefix) <= SHORT_PREFIX:
+            return self.by_short_prefix.get(prefix, set())
+        start = bisect_left(self.vocabulary, prefix)
+        end = bisect_left(self.vocabulary, prefix + "\uffff")  # fin de la plage des mots du préfixe
+        words = self.vocabulary[start:end]
+        if len(words) == 1:
+            return self.by_token[words[0]]
+        return set().union(*(self.by_token[w] for w in words))
+
+    def search(self, text: str = "", theme: Optional[str] = None, category_id: Optional[int] = None,
+               bucket: Optional[int] = None) -> Optional[Set[int]]:
+        """Ids correspondant à TOUS les critères donnés (None = aucun filtre actif).
+
+        Chaque mot de `text` est un préfixe ("ros pun" trouve "Top rose punk").
+        L'ensemble renvoyé peut être celui de l'index : ne pas le modifier.
+        """
+        sets = [self._prefix(t) for t in tokenize(text)]
+        if theme is not None:
+            sets.append(self.by_theme.get(normalize(theme), set()))
+        if category_id is not None:
+            sets.append(self.by_category.get(category_id, set()))
+        if bucket is not None:
+            sets.append(self.by_price.get(bucket, set()))
+        if not sets:
+            return None
+        if len(sets) == 1:
+            return sets[0]  # un seul critère : pas de copie
+        sets.sort(key=len)  # on part du plus petit ensemble : intersections plus rapides
+        result = sets[0] & sets[1]
+        for s in sets[2:]:
+            if not result:
+                break
+            result &= s
+        return result
+
+    def ordered(self, ids: Set[int]) -> List[int]:
+        """Trie des ids dans l'ordre de la galerie (catégorie puis id)."""
+        return sorted(ids, key=self.rank.__getitem__)
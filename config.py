@@ -8,14 +8,34 @@ WINDOW_HEIGHT = 640  # Hauteur de la fenêtre en pixels
 
 # === PERFORMANCE ===
 FPS = 60  # Nombre d'images par seconde (60 FPS = 60 mises à jour par seconde)
+FIXED_TIMESTEP = True  # Logique à pas fixe (SIM_HZ), indépendante du rendu ; False = un update par frame avec le dt réel
+SIM_HZ = 60  # Mises à jour de la logique par seconde en mode pas fixe
+MAX_FRAME_TIME = 0.25  # Une frame plus longue (fenêtre déplacée, pause du débogueur) compte pour 0,25 s
+MAX_UPDATES_PER_FRAME = 5  # Au-delà, le retard est abandonné (évite la spirale : plus de retard -> plus de mises à jour)
+MAX_FRAMESKIP = 2  # Frames dont le dessin peut être sauté d'affilée quand la logique est en retard
+LAG_FRAME_FACTOR = 1.5  # Une frame plus longue que 1,5 pas de logique = retard (en dessous : simple gigue du tick)
+SCORE_CACHE_SIZE = 4096  # Scores de tenues gardés en mémoire (cache LRU de Scoring.score)
+EVENT_BUDGET_MS = 4.0  # Temps max de traitement des événements par frame (le reste passe à la frame suivante)
 
 # === BASE DE DONNÉES ===
 DB_PATH = "data/game.db"  # Chemin vers le fichier de la base de données SQLite
+DB_BUSY_TIMEOUT_MS = 5000  # Attente max (ms) quand un autre processus écrit dans la base (bornes partagées)
+DB_WRITE_RETRIES = 5  # Nouvelles tentatives d'une écriture si la base reste verrouillée ("database is locked")
+DB_RETRY_BASE_DELAY = 0.02  # Délai de base (s) entre deux tentatives, doublé à chaque essai + aléa (jitter)
+GARMENT_PAGE_SIZE = 64  # Vêtements lus par page (la galerie se remplit d'une page par frame)
+PRICE_BUCKETS = (10, 20)  # Bornes des tranches de prix des filtres de la galerie (< 10, 10-19, 20+)
+
+# === SESSION "SE SOUVENIR DE MOI" ===
+SESSION_TOKEN_PATH = "data/session.token"  # Fichier contenant le jeton de session (en clair, local au poste)
+SESSION_TTL_DAYS = 30  # Durée de validité d'un jeton en jours
 
 # === TITRE ET COULEUR ===
 TITLE = "Jeu de Dressing"  # Titre affiché dans la barre de la fenêtre
 BACKGROUND_COLOR = (240, 240, 245)  # Couleur de fond par défaut (RGB : gris-bleu clair)
 
+# === ASSETS ===
+ASSETS_DIR = "assets"  # Dossier des images/sons (décrit par la table asset_manifest)
+
 # === CHEMINS DES IMAGES DE FOND D'ÉCRAN ===
 SIDEBAR_BG_PATH = "assets/backgrounds/sidebar_bg.png"  # Fond pour la zone de galerie (gauche)
 STAGE_BG_PATH = "assets/backgrounds/stage_bg.png"  # Fond pour la zone mannequin (droite)
@@ -34,6 +54,21 @@ MUSIC_TRACKS = [
     "assets/musics/404 (New Era).mp3",  # Musique 3
     "assets/musics/Tila Tsoli - Bimbo Doll (Lyrics).mp3"  # Musique 4
 ]
+# Les pistes absentes sont écartées au démarrage (AudioManager), avec un avertissement
+MUSIC_CROSSFADE_MS = 1500  # Durée du fondu enchaîné quand on change de musique (millisecondes)
+
+# === EFFETS SONORES ===
+# Décodés une fois au démarrage (un fichier absent est remplacé par un bip synthétisé)
+SFX_PATHS = {
+    "click": "assets/sounds/click.wav",  # Clic sur un bouton
+    "pickup": "assets/sounds/pickup.wav",  # Vêtement attrapé dans la galerie
+    "drop": "assets/sounds/drop.wav",  # Vêtement posé sur le mannequin
+    "replace": "assets/sounds/replace.wav",  # Vêtement qui en remplace un autre de la même catégorie
+    "remove": "assets/sounds/remove.wav",  # Vêtement retiré du mannequin
+    "validate": "assets/sounds/validate.wav",  # Tenue validée
+}
+SFX_CHANNELS = 6  # Canaux réservés aux effets (au-delà, un effet moins prioritaire est coupé)
+SFX_VOLUME = 0.5  # Volume des effets (0.0 à 1.0)
 
 # === IMAGE DU TITRE ===
 # Image affichée en haut du menu au lieu du texte
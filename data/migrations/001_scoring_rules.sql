@@ -0,0 +1,9 @@
+-- Règles de score par défaut (mêmes valeurs que l'ancien calcul codé en dur) :
+-- 50 points de base, +15 par vêtement du thème (theme.bonus), -5 par vêtement au-delà de 4
+INSERT OR IGNORE INTO scoring_rule (name, value) VALUES ('base', 50);
+INSERT OR IGNORE INTO outfit_size_points (item_count, points) VALUES (0, 0), (1, 0), (2, 0), (3, 0), (4, 0), (5, -5);
+
+-- Codes de thème normalisés (minuscules sans accents) : 'Chic' et 'chic' sont le même thème
+UPDATE OR IGNORE theme SET code = normalize_code(code) WHERE code != normalize_code(code);
+UPDATE garment SET score_theme = normalize_code(score_theme)
+WHERE score_theme IS NOT NULL AND score_theme != normalize_code(score_theme);
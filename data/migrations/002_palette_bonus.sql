@@ -0,0 +1,6 @@
+-- Harmonie des couleurs (palettes extraites par py -m tools.extract_palettes) :
+-- une palette neutre ou douce va au thème chic, une palette vive ou multicolore au thème colorful
+INSERT OR IGNORE INTO theme_palette_bonus (theme_id, palette_class, bonus) SELECT id, 0, 5 FROM theme WHERE code = 'chic';
+INSERT OR IGNORE INTO theme_palette_bonus (theme_id, palette_class, bonus) SELECT id, 1, 3 FROM theme WHERE code = 'chic';
+INSERT OR IGNORE INTO theme_palette_bonus (theme_id, palette_class, bonus) SELECT id, 2, 3 FROM theme WHERE code = 'colorful';
+INSERT OR IGNORE INTO theme_palette_bonus (theme_id, palette_class, bonus) SELECT id, 3, 5 FROM theme WHERE code = 'colorful';
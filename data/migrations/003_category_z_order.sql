@@ -0,0 +1,15 @@
+-- Calque d'affichage de chaque catégorie (0 = au fond -> 5 = devant), fixé une fois en base.
+-- Reprend les mots-clés que les scènes testaient à chaque frame sur le nom de la catégorie.
+UPDATE category SET z_order = CASE
+  WHEN name LIKE '%shoe%' OR name LIKE '%chaussure%' OR name LIKE '%feet%' THEN 0
+  WHEN name LIKE '%bottom%' OR name LIKE '%bas%' OR name LIKE '%pants%' OR name LIKE '%pantalon%'
+    OR name LIKE '%skirt%' OR name LIKE '%jupe%' OR name LIKE '%short%' OR name LIKE '%jean%' THEN 1
+  WHEN name LIKE '%top%' OR name LIKE '%haut%' OR name LIKE '%shirt%' OR name LIKE '%dress%' OR name LIKE '%robe%'
+    OR name LIKE '%coat%' OR name LIKE '%manteau%' OR name LIKE '%jacket%' OR name LIKE '%veste%'
+    OR name LIKE '%sweater%' OR name LIKE '%pull%' THEN 2
+  WHEN name LIKE '%hair%' OR name LIKE '%cheveu%' OR name LIKE '%head%' OR name LIKE '%chapeau%' OR name LIKE '%hat%' THEN 3
+  WHEN name LIKE '%face%' OR name LIKE '%visage%' OR name LIKE '%mask%' OR name LIKE '%masque%'
+    OR name LIKE '%glasses%' OR name LIKE '%lunette%' THEN 4
+  WHEN name LIKE '%acc%' THEN 5
+  ELSE z_order
+END;
@@ -3,7 +3,8 @@
 CREATE TABLE IF NOT EXISTS category ( -- Crée la table "category" si elle n'existe pas déjà
   id INTEGER PRIMARY KEY AUTOINCREMENT,-- Colonne "id" : entier, clé primaire, valeur auto-incrémentée
   name TEXT UNIQUE NOT NULL,-- Colonne "name" : texte, obligatoire, et doit être unique (pas deux catégories avec le même nom)
-  max_items INTEGER NOT NULL DEFAULT 1-- Colonne "max_items" : entier, obligatoire, valeur par défaut = 1 (nombre max d’objets dans cette catégorie)
+  max_items INTEGER NOT NULL DEFAULT 1,-- Colonne "max_items" : entier, obligatoire, valeur par défaut = 1 (nombre max d’objets dans cette catégorie)
+  z_order INTEGER NOT NULL DEFAULT 2-- Colonne "z_order" : calque d'affichage sur le mannequin (0=chaussures au fond -> 5=accessoires devant)
 
 );-- Fin de la définition de la table "category"
 
@@ -14,10 +15,15 @@ CREATE TABLE IF NOT EXISTS garment (-- Crée la table "garment" (vêtements) si
   sprite_path TEXT NOT NULL,-- Colonne "sprite_path" : chemin de l’image/du sprite du vêtement, texte obligatoire
   score_theme TEXT DEFAULT NULL,-- Colonne "score_theme" : thème de score associé (optionnel, peut être NULL)
   price INTEGER DEFAULT 0,-- Colonne "price" : prix du vêtement, entier, par défaut 0
+  content_hash TEXT DEFAULT NULL,-- Colonne "content_hash" : empreinte du fichier sprite (remplie par l'import du catalogue)
   FOREIGN KEY(category_id) REFERENCES category(id) ON DELETE CASCADE-- Déclare "category_id" comme clé étrangère vers "category(id)" :
 );-- si une catégorie est supprimée, tous les vêtements de cette catégorie sont aussi supprimés (CASCADE)
 -- Fin de la définition de la table "garment"
 
+CREATE UNIQUE INDEX IF NOT EXISTS idx_garment_sprite ON garment(sprite_path);-- Un sprite = un vêtement (clé de l'upsert de l'import du catalogue)
+CREATE INDEX IF NOT EXISTS idx_garment_category ON garment(category_id, id);-- Parcours du catalogue page par page (pagination par clé)
+CREATE INDEX IF NOT EXISTS idx_garment_price ON garment(category_id, price, id);-- Vêtements les moins chers d'une catégorie (candidats du solveur de tenues)
+
 CREATE TABLE IF NOT EXISTS mannequin (-- Crée la table "mannequin" si elle n'existe pas déjà
   id INTEGER PRIMARY KEY AUTOINCREMENT,-- Colonne "id" : entier, clé primaire, auto-incrémentée
   name TEXT NOT NULL,-- Colonne "name" : nom du mannequin, texte obligatoire
@@ -27,9 +33,29 @@ CREATE TABLE IF NOT EXISTS mannequin (-- Crée la table "mannequin" si elle n'ex
 CREATE TABLE IF NOT EXISTS theme (-- Crée la table "theme" si elle n'existe pas déjà
   id INTEGER PRIMARY KEY AUTOINCREMENT,-- Colonne "id" : entier, clé primaire, auto-incrémentée
   code TEXT UNIQUE NOT NULL,-- Colonne "code" : code du thème, texte, obligatoire et unique (identifiant technique)
-  label TEXT NOT NULL-- Colonne "label" : libellé du thème (nom lisible), texte obligatoire
+  label TEXT NOT NULL,-- Colonne "label" : libellé du thème (nom lisible), texte obligatoire
+  bonus INTEGER NOT NULL DEFAULT 15-- Colonne "bonus" : points par vêtement porté de ce thème
+);
+
+CREATE TABLE IF NOT EXISTS scoring_rule (-- Règles de score générales (lues et compilées une fois au chargement)
+  name TEXT PRIMARY KEY,-- Colonne "name" : nom de la règle (ex: 'base' = points de départ de toute tenue)
+  value INTEGER NOT NULL-- Colonne "value" : valeur entière de la règle
+);
+
+CREATE TABLE IF NOT EXISTS theme_category_bonus (-- Points en plus pour un vêtement du thème porté dans une catégorie donnée
+  theme_id INTEGER NOT NULL,-- Colonne "theme_id" : thème concerné
+  category_id INTEGER NOT NULL,-- Colonne "category_id" : catégorie concernée
+  bonus INTEGER NOT NULL,-- Colonne "bonus" : points ajoutés à theme.bonus (peut être négatif)
+  PRIMARY KEY(theme_id, category_id),
+  FOREIGN KEY(theme_id) REFERENCES theme(id) ON DELETE CASCADE,
+  FOREIGN KEY(category_id) REFERENCES category(id) ON DELETE CASCADE
 );
 
+CREATE TABLE IF NOT EXISTS outfit_size_points (-- Courbe de points selon le nombre de vêtements portés
+  item_count INTEGER PRIMARY KEY,-- Colonne "item_count" : nombre de vêtements de la tenue
+  points INTEGER NOT NULL-- Colonne "points" : points ajoutés (négatif = pénalité) ; au-delà du dernier
+);-- nombre listé, la courbe continue avec la pente de ses deux derniers points
+
 CREATE TABLE IF NOT EXISTS run_result (-- Crée la table "run_result" pour stocker le résultat d’une run / partie si elle n'existe pas déjà
   id INTEGER PRIMARY KEY AUTOINCREMENT,-- Colonne "id" : entier, clé primaire, auto-incrémentée
   mannequin_id INTEGER NOT NULL,-- Colonne "mannequin_id" : référence au mannequin utilisé, entier obligatoire
@@ -50,3 +76,48 @@ CREATE TABLE IF NOT EXISTS users (
     password_hash BLOB NOT NULL,
     created_at TEXT NOT NULL DEFAULT (datetime('now'))
 );
+
+CREATE TABLE IF NOT EXISTS session (-- Sessions "se souvenir de moi" (évite la vérification bcrypt au relancement)
+  id INTEGER PRIMARY KEY AUTOINCREMENT,-- Colonne "id" : entier, clé primaire, auto-incrémentée
+  user_id INTEGER NOT NULL,-- Colonne "user_id" : utilisateur connecté par ce jeton
+  token_hash TEXT UNIQUE NOT NULL,-- Colonne "token_hash" : SHA-256 du jeton (le jeton en clair n'existe que dans data/session.token)
+  expires_at TEXT NOT NULL,-- Colonne "expires_at" : date d'expiration, même format que datetime('now')
+  created_at TEXT NOT NULL DEFAULT (datetime('now')),-- Colonne "created_at" : date de création du jeton
+  FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE-- supprimer un utilisateur supprime ses sessions
+);-- UNIQUE sur token_hash crée l'index utilisé par la reprise de session au démarrage
+
+CREATE TABLE IF NOT EXISTS asset_manifest (-- Métadonnées des images de assets/ (remplie par py -m tools.build_manifest)
+  path TEXT PRIMARY KEY,-- Colonne "path" : chemin relatif avec des "/" (ex: assets/clothes/tops/top1.png)
+  size INTEGER NOT NULL,-- Colonne "size" : taille du fichier en octets (validée au démarrage)
+  width INTEGER NOT NULL,-- Colonne "width" : largeur de l'image en pixels
+  height INTEGER NOT NULL,-- Colonne "height" : hauteur de l'image en pixels
+  has_alpha INTEGER NOT NULL,-- Colonne "has_alpha" : 1 si l'image a un canal de transparence
+  bbox_x INTEGER NOT NULL,-- Colonnes "bbox_*" : rectangle des pixels visibles (image sans ses bords transparents)
+  bbox_y INTEGER NOT NULL,
+  bbox_w INTEGER NOT NULL,
+  bbox_h INTEGER NOT NULL,
+  content_hash TEXT NOT NULL-- Colonne "content_hash" : empreinte blake2b du fichier (reconstruction incrémentale)
+);
+
+CREATE TABLE IF NOT EXISTS garment_palette (-- Couleurs dominantes des sprites (remplie par py -m tools.extract_palettes)
+  garment_id INTEGER PRIMARY KEY,-- Colonne "garment_id" : vêtement analysé
+  colors BLOB NOT NULL,-- Colonne "colors" : jusqu'à 5 couleurs de 4 octets (r, g, b, part sur 255), la plus présente d'abord
+  palette_class INTEGER NOT NULL,-- Colonne "palette_class" : 0 = neutre, 1 = doux, 2 = vif, 3 = multicolore
+  content_hash TEXT NOT NULL,-- Colonne "content_hash" : empreinte du sprite analysé (extraction incrémentale)
+  FOREIGN KEY(garment_id) REFERENCES garment(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS theme_palette_bonus (-- Harmonie : points d'un vêtement selon sa palette, pour un thème
+  theme_id INTEGER NOT NULL,-- Colonne "theme_id" : thème concerné
+  palette_class INTEGER NOT NULL,-- Colonne "palette_class" : classe de palette (voir garment_palette)
+  bonus INTEGER NOT NULL,-- Colonne "bonus" : points ajoutés, que le vêtement soit du thème ou non
+  PRIMARY KEY(theme_id, palette_class),
+  FOREIGN KEY(theme_id) REFERENCES theme(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS audio_envelope (-- Enveloppes d'énergie des musiques (remplie par py -m tools.analyze_audio)
+  content_hash TEXT PRIMARY KEY,-- Colonne "content_hash" : empreinte blake2b du fichier audio analysé
+  rate INTEGER NOT NULL,-- Colonne "rate" : nombre de valeurs par seconde de musique
+  rms BLOB NOT NULL,-- Colonne "rms" : volume (RMS) normalisé, un octet (0-255) par valeur
+  beat BLOB NOT NULL-- Colonne "beat" : impulsion de battement (255 sur un temps fort, puis décroissante), un octet par valeur
+);
@@ -1,10 +1,15 @@
 # ========================================
 # IMPORTS - Bibliothèques utilisées
 # ========================================
+import random  # Aléa (jitter) entre deux tentatives d'écriture
 import sqlite3  # Permet de gérer une base de données SQLite
+import itertools  # Compteur pour nommer les bases en mémoire
+import time  # Attente entre deux tentatives d'écriture
+import unicodedata  # Suppression des accents dans les codes ("Soirée" -> "soiree")
 from pathlib import Path  # Utilitaire pour manipuler les chemins de fichiers de manière robuste
 import bcrypt  # Bibliothèque pour hasher et vérifier les mots de passe de manière sécurisée
 from config import DB_PATH  # Importe le chemin par défaut de la base de données depuis config.py
+from config import DB_BUSY_TIMEOUT_MS, DB_WRITE_RETRIES, DB_RETRY_BASE_DELAY  # Accès concurrent (plusieurs bornes)
 
 # ========================================
 # CHEMINS DES FICHIERS SQL
@@ -13,6 +18,32 @@ from config import DB_PATH  # Importe le chemin par défaut de la base de donné
 SCHEMA = Path('data/schema.sql')
 # Chemin vers le fichier de données initiales (données pré-remplies)
 SEED = Path('data/seed_data.sql')
+# Migrations de données, appliquées une seule fois et dans l'ordre (PRAGMA user_version = nb déjà appliquées)
+MIGRATIONS = sorted(Path('data/migrations').glob('*.sql'))
+
+# Chemin spécial : base en mémoire (tests, benchmarks) au lieu d'un fichier
+MEMORY = ":memory:"
+_memory_ids = itertools.count(1)  # chaque Database(MEMORY) a sa propre base
+
+# ========================================
+# HACHAGE DES MOTS DE PASSE
+# ========================================
+def hash_password(password: str) -> bytes:
+    """Hache un mot de passe avec bcrypt (fonction de module : utilisable dans un ProcessPoolExecutor)."""
+    # Convertit le mot de passe en bytes et le hache avec bcrypt (salé automatiquement)
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
+
+
+def normalize_code(text):
+    """Minuscules sans accents : "Soirée" -> "soiree" (codes de thème, recherche insensible à la casse).
+
+    Aussi enregistrée comme fonction SQL `normalize_code(x)` pour les migrations.
+    """
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
 
 # ========================================
 # CLASSE DATABASE - Gestion de la base de données
@@ -24,24 +55,44 @@ class Database:
         """Initialise la base de données.
         
         Args:
-            path (str): Chemin vers le fichier de la base de données
+            path (str): Chemin vers le fichier de la base de données, ou MEMORY (":memory:")
+                pour une base en mémoire, partagée par toutes les connexions de cette instance
         """
         # Stocke le chemin de la base de données
         self.path = path
         # Initialise la connexion à None (pas encore connecté)
         self._connection = None
-        # Crée le dossier 'data' s'il n'existe pas
-        Path('data').mkdir(exist_ok=True)
+        self._keeper = None  # connexion qui garde la base en mémoire en vie
+        if path == MEMORY:
+            # Base nommée en cache partagé : chaque connect() voit les mêmes tables
+            self._target = f"file:newstyle-mem-{next(_memory_ids)}?mode=memory&cache=shared"
+            self._keeper = sqlite3.connect(self._target, uri=True, check_same_thread=False)
+        else:
+            self._target = path
+            # Crée le dossier de la base (ex: 'data') s'il n'existe pas
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
         # Initialise la structure et les données de la base de données
         self._init_db()
 
+    def _open(self):
+        """Ouvre une connexion brute vers le fichier ou la base en mémoire."""
+        # check_same_thread=False : la connexion peut être ouverte par le thread de travail
+        # (authentification) et fermée par close() depuis le thread principal
+        # timeout : attend (busy_timeout) au lieu d'échouer tout de suite si un autre processus écrit
+        return sqlite3.connect(self._target, uri=self._keeper is not None,
+                               timeout=DB_BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+
     def _init_db(self):
         """Initialise la base de données en exécutant le schéma et les données initiales."""
-        # Vérifie si la BD existe déjà
-        db_exists = Path(self.path).exists()
+        # Vérifie si la BD existe déjà (une base en mémoire est toujours neuve)
+        db_exists = self._keeper is None and Path(self.path).exists()
         
         # Se connecte à la base de données (crée le fichier s'il n'existe pas)
-        with sqlite3.connect(self.path) as con:
+        with self._open() as con:
+            # Mode WAL (enregistré dans le fichier) : les lectures ne bloquent plus les écritures
+            # et plusieurs instances du jeu peuvent partager data/game.db
+            con.execute("PRAGMA journal_mode=WAL")
+
             # Exécute TOUJOURS le schéma (CREATE TABLE IF NOT EXISTS)
             con.executescript(SCHEMA.read_text(encoding='utf-8'))
             
@@ -83,24 +134,87 @@ class Database:
                 else:
                     con.execute("ALTER TABLE users ADD COLUMN username TEXT NOT NULL DEFAULT ''")
 
-            con.commit()
+            # Même principe pour la table garment (colonnes ajoutées après coup)
+            garment_cols = [r[1] for r in con.execute("PRAGMA table_info(garment)").fetchall()]
+            if 'content_hash' not in garment_cols:
+                con.execute("ALTER TABLE garment ADD COLUMN content_hash TEXT DEFAULT NULL")
+            theme_cols = [r[1] for r in con.execute("PRAGMA table_info(theme)").fetchall()]
+            if 'bonus' not in theme_cols:
+                con.execute("ALTER TABLE theme ADD COLUMN bonus INTEGER NOT NULL DEFAULT 15")
+            category_cols = [r[1] for r in con.execute("PRAGMA table_info(category)").fetchall()]
+            if 'z_order' not in category_cols:
+                con.execute("ALTER TABLE category ADD COLUMN z_order INTEGER NOT NULL DEFAULT 2")
+
+            # Migrations de données pas encore appliquées à cette base
+            con.create_function("normalize_code", 1, normalize_code, deterministic=True)
+            version = con.execute("PRAGMA user_version").fetchone()[0]
+            for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+                # Script et numéro de version dans UNE transaction : un arrêt entre les deux
+                # ne peut pas faire rejouer une migration (ALTER TABLE ADD COLUMN n'est pas rejouable)
+                script = migration.read_text(encoding='utf-8')
+                try:
+                    con.executescript(f"BEGIN;\n{script}\n;\nPRAGMA user_version = {number};\nCOMMIT;")
+                except sqlite3.Error:
+                    if con.in_transaction:
+                        con.execute("ROLLBACK")
+                    raise
+
             con.commit()
 
-    def connect(self):
+    def connect(self, row_factory=sqlite3.Row):
         """Établit une connexion à la base de données.
+
+        Args:
+            row_factory: sqlite3.Row (accès par nom, par défaut) ou None pour des tuples
+                (plus rapide : les repositories construisent les modèles par position)
         
         Returns:
             sqlite3.Connection: La connexion à la base de données
         """
         # Crée une connexion à la base de données sqlite
-        con = sqlite3.connect(self.path)
+        con = self._open()
+        # En WAL, synchronous=NORMAL reste sûr et évite un fsync à chaque commit
+        con.execute("PRAGMA synchronous=NORMAL")
         # Configure le factory pour retourner des dictionnaires au lieu de tuples
         # Cela permet d'accéder aux colonnes par leur nom (ex: row['id'])
-        con.row_factory = sqlite3.Row
+        con.row_factory = row_factory
         # Stocke la connexion en tant que variable d'instance
         self._connection = con
         return con
 
+    def write(self, fn):
+        """Exécute `fn(con)` dans une transaction d'écriture courte, avec reprise si la base est occupée.
+
+        BEGIN IMMEDIATE prend le verrou d'écriture dès le début : un conflit est détecté avant
+        tout travail, et la transaction ne contient que l'écriture elle-même. Si la base reste
+        verrouillée après busy_timeout, on réessaie avec un délai exponentiel + aléa (jitter)
+        pour que les processus en conflit ne se réveillent pas tous en même temps.
+
+        Args:
+            fn (callable): reçoit la connexion et fait les INSERT/UPDATE (sans commit)
+
+        Returns:
+            La valeur renvoyée par `fn`
+        """
+        for attempt in range(DB_WRITE_RETRIES + 1):
+            con = self.connect()
+            try:
+                con.execute("BEGIN IMMEDIATE")
+                result = fn(con)
+                con.commit()
+                return result
+            except sqlite3.OperationalError as e:
+                con.rollback()
+                busy = "locked" in str(e) or "busy" in str(e)
+                if not busy or attempt == DB_WRITE_RETRIES:
+                    raise
+                time.sleep(random.uniform(0, DB_RETRY_BASE_DELAY * (2 ** attempt)))
+            except Exception:
+                con.rollback()  # ex: IntegrityError (identifiant déjà pris) -> remonte à l'appelant
+                raise
+            finally:
+                con.close()
+
     def close(self):
         """Ferme la connexion à la base de données de manière sécurisée."""
         # Vérifie s'il existe une connexion active
@@ -114,6 +228,11 @@ class Database:
                 # Affiche un message d'erreur si la fermeture échoue
                 print(f"Erreur lors de la fermeture de la connexion DB : {e}")
 
+        # Une base en mémoire disparaît avec sa dernière connexion
+        if self._keeper is not None:
+            self._keeper.close()
+            self._keeper = None
+
         # Arrête le gestionnaire de SQLite
         try:
             sqlite3.shutdown()
@@ -134,8 +253,23 @@ class Database:
         Returns:
             bytes: Le mot de passe hashé
         """
-        # Convertit le mot de passe en bytes et le hache avec bcrypt (salé automatiquement)
-        return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
+        return hash_password(password)
+
+    @staticmethod
+    def validate_user_fields(username: str, display_name: str, password: str):
+        """Vérifie les règles de création de compte (champs déjà nettoyés avec strip()).
+
+        Returns:
+            str | None: Le message d'erreur, ou None si les champs sont valides
+        """
+        # Validation simple des champs (longueur minimale)
+        if len(username) < 3:
+            return "Identifiant trop court (min 3)."
+        if len(display_name) < 3:
+            return "Pseudo trop court (min 3)."
+        if len(password) < 6:
+            return "Mot de passe trop court (min 6)."
+        return None
 
     def verify_password(self, password: str, password_hash: bytes) -> bool:
         """Vérifie si un mot de passe correspond à son hash.
@@ -156,13 +290,9 @@ class Database:
         """
         username = username.strip()
         display_name = display_name.strip()
-        # Validation simple des champs (longueur minimale)
-        if len(username) < 3:
-            return False, "Identifiant trop court (min 3)."
-        if len(display_name) < 3:
-            return False, "Pseudo trop court (min 3)."
-        if len(password) < 6:
-            return False, "Mot de passe trop court (min 6)."
+        error = self.validate_user_fields(username, display_name, password)
+        if error:
+            return False, error
         # Hash le mot de passe avant de le stocker
         pw_hash = self.hash_password(password)
 
@@ -171,12 +301,10 @@ class Database:
             avatar_path = 'assets/avatars/default.png'
 
         try:
-            with sqlite3.connect(self.path) as con:
-                con.execute(
-                    "INSERT INTO users (username, display_name, avatar_path, password_hash) VALUES (?, ?, ?, ?)",
-                    (username, display_name, avatar_path, pw_hash)
-                )
-                con.commit()
+            self.write(lambda con: con.execute(
+                "INSERT INTO users (username, display_name, avatar_path, password_hash) VALUES (?, ?, ?, ?)",
+                (username, display_name, avatar_path, pw_hash)
+            ))
             return True, "Compte créé !"
         except sqlite3.IntegrityError:
             return False, "Identifiant déjà utilisé."
@@ -187,8 +315,7 @@ class Database:
     def authenticate(self, username: str, password: str):
         username = username.strip()
 
-        with sqlite3.connect(self.path) as con:
-            con.row_factory = sqlite3.Row
+        with self.connect() as con:
             row = con.execute(
                 "SELECT id, display_name, avatar_path, password_hash FROM users WHERE username = ?",
                 (username,)
@@ -210,7 +337,44 @@ class Database:
 
 
 # ========================================
-# INSTANCIATION GLOBALE
+# INSTANCE GLOBALE (CRÉÉE À LA DEMANDE)
 # ========================================
-# Crée une instance globale de la base de données (utilisée dans toute l'application)
-DB = Database()
+_database = None  # Database réellement utilisée (créée au premier accès)
+
+
+def get_database() -> Database:
+    """Retourne la base de données du jeu, en la créant (fichier DB_PATH) au premier appel."""
+    global _database
+    if _database is None:
+        _database = Database()
+    return _database
+
+
+def configure(path: str = DB_PATH) -> Database:
+    """Choisit la base utilisée par toute l'application (à appeler avant le premier accès à DB).
+
+    Exemple (tests, benchmarks) : `db.configure(db.MEMORY)` pour une base en mémoire
+    créée depuis schema.sql + seed_data.sql, isolée de data/game.db.
+    """
+    return use_database(Database(path))
+
+
+def use_database(database: Database) -> Database:
+    """Injecte une instance de Database déjà créée (remplace la base globale)."""
+    global _database
+    _database = database
+    return database
+
+
+class _DatabaseProxy:
+    """Objet `DB` importé partout : délègue à la base configurée, créée seulement au premier usage.
+
+    Importer db.py (et donc repositories / scènes) ne touche plus au disque.
+    """
+
+    def __getattr__(self, name):
+        return getattr(get_database(), name)
+
+
+# Instance globale utilisée dans toute l'application (`from db import DB`)
+DB = _DatabaseProxy()
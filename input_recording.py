@@ -0,0 +1,130 @@
+# ========================================
+# ENREGISTREMENT D'UNE PARTIE (ENTRÉES + GRAINE)
+# Garde, frame par frame, la durée de la frame et les événements traités, la graine du hasard
+# (thème et mannequin de "Nouvelle partie") et la frame où chaque tâche de fond est vue finie.
+# Le tout tient dans un petit fichier JSON compressé (gzip), rejoué à l'identique par
+# py -m tools.replay : sans fenêtre, aussi vite que possible, en mesurant chaque frame.
+# ========================================
+
+# === IMPORTS ===
+import gzip  # Fichier compressé (les frames sans événement se répètent beaucoup)
+import json
+import time  # Attente des tâches de fond au rejeu
+from concurrent.futures import Future
+from typing import List, Optional
+import pygame as pg
+
+RECORDING_VERSION = 2  # Format du fichier (un rejeu refuse un autre format)
+
+
+# === ÉVÉNEMENTS <-> JSON ===
+def encode_event(event) -> list:
+    """[type, attributs] : seuls les attributs simples sont gardés (pos, key, unicode, button...)."""
+    attrs = {}
+    for key, value in event.dict.items():
+        if isinstance(value, tuple):
+            attrs[key] = list(value)
+        elif isinstance(value, (bool, int, float, str)):
+            attrs[key] = value
+    return [event.type, attrs]
+
+
+def decode_event(data: list):
+    """Recrée l'événement pygame enregistré par encode_event."""
+    event_type, attrs = data
+    return pg.event.Event(event_type, {k: tuple(v) if isinstance(v, list) else v for k, v in attrs.items()})
+
+
+# === TÂCHES DE FOND ===
+class GatedJob:
+    """Future d'une tâche de fond tel que le voit une scène : "finie" seulement une fois libérée.
+
+    La boucle libère les tâches en début de frame : à l'enregistrement, celles qui sont finies ;
+    au rejeu, celles de la frame enregistrée. Les scènes voient donc le résultat à la même frame.
+    """
+
+    def __init__(self, future: Future):
+        self.future = future
+        self.released = False
+
+    def done(self) -> bool:
+        return self.released
+
+    def result(self, timeout=None):
+        return self.future.result(timeout)
+
+    def exception(self, timeout=None):
+        return self.future.exception(timeout)
+
+
+class JobGate:
+    """Tâches de fond numérotées dans l'ordre de soumission (le même à l'enregistrement et au rejeu)."""
+
+    def __init__(self):
+        self.jobs: List[GatedJob] = []
+        self.waiting: List[int] = []  # numéros des tâches pas encore libérées
+
+    def track(self, future: Future) -> GatedJob:
+        job = GatedJob(future)
+        self.waiting.append(len(self.jobs))
+        self.jobs.append(job)
+        return job
+
+    def ready(self) -> List[int]:
+        """Numéros des tâches finies mais pas encore libérées."""
+        return [i for i in self.waiting if self.jobs[i].future.done()]
+
+    def release(self, indices: List[int]):
+        for i in indices:
+            self.jobs[i].released = True
+        if indices:
+            self.waiting = [i for i in self.waiting if not self.jobs[i].released]
+
+    def wait(self, indices: List[int]) -> float:
+        """Attend la fin des tâches `indices` (rejeu : celles libérées à cette frame) ; renvoie l'attente en s."""
+        start = time.perf_counter()
+        for i in indices:
+            self.jobs[i].future.exception()  # bloque sans relever l'erreur (la scène la lira)
+        return time.perf_counter() - start
+
+
+# === ENREGISTREMENT ===
+class InputRecorder:
+    """Accumule les frames d'une partie et les écrit à la fermeture du jeu.
+
+    Une frame = [durée en ms], + [événements] s'il y en a, + [tâches libérées] s'il y en a.
+    """
+
+    def __init__(self, path: str, seed: int, scene: str, user: Optional[list] = None):
+        self.path = path
+        self.header = {"version": RECORDING_VERSION, "pygame": pg.version.ver, "seed": seed,
+                       "start": {"scene": scene, "user": user}}
+        self.frames: List[list] = []
+
+    def frame(self, frame_dt: float, events: list, released: List[int]):
+        frame = [round(frame_dt * 1000, 3)]
+        if events or released:
+            frame.append([encode_event(e) for e in events])
+        if released:
+            frame.append(released)
+        self.frames.append(frame)
+
+    def save(self, end_scene: str):
+        data = dict(self.header, frames=self.frames, end={"scene": end_scene, "frames": len(self.frames)})
+        with gzip.open(self.path, "wt", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        print(f"✓ Partie enregistrée : {self.path} ({len(self.frames)} frames)")
+
+
+def load_recording(path: str) -> dict:
+    """Lit un enregistrement ; chaque frame devient (durée en s, événements pygame, tâches libérées)."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != RECORDING_VERSION:
+        raise ValueError(f"Format d'enregistrement non pris en charge : {data.get('version')}")
+    data["frames"] = [
+        (frame[0] / 1000, [decode_event(e) for e in frame[1]] if len(frame) > 1 else [],
+         frame[2] if len(frame) > 2 else [])
+        for frame in data["frames"]
+    ]
+    return data
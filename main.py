@@ -5,12 +5,18 @@
 
 # === IMPORTS SYSTÈME ===
 import os  # Pour opérations système
+import argparse  # Option --record de la ligne de commande
+import random  # Hasard du jeu (graine gardée dans les enregistrements de partie)
 import gc  # Garbage collector (nettoie la mémoire)
-import time  # Pour gérer les délais
+import time  # Pour gérer les délais (et mesurer le traitement des événements)
+from collections import deque  # Événements reportés à la frame suivante
+from concurrent.futures import ThreadPoolExecutor  # Tâches lentes (bcrypt, BDD) hors de la boucle de rendu
 import pygame as pg  # Pygame - bibliothèque de jeu
 
 # === IMPORTS CONFIGURATION ===
 from config import WINDOW_WIDTH, WINDOW_HEIGHT, FPS, TITLE  # Paramètres du jeu
+from config import EVENT_BUDGET_MS  # Temps max de traitement des événements par frame
+from config import FIXED_TIMESTEP, SIM_HZ, MAX_FRAME_TIME, MAX_UPDATES_PER_FRAME, MAX_FRAMESKIP, LAG_FRAME_FACTOR  # Boucle à pas fixe
 
 # === IMPORTS SCÈNES ===
 from scenes.menu_scene import MenuScene  # Écran menu principal
@@ -21,9 +27,24 @@ from scenes.register_scene import RegisterScene  # Écran inscription
 
 # === IMPORTS AUTRES ===
 from db import DB  # Base de données
-from audio_manager import AudioManager  # Gestion des musiques
-from repositories import UserRepo  # Repository pour les utilisateurs
+from audio_manager import SFX, AudioManager  # Gestion des musiques et des effets sonores
+from repositories import UserRepo, SessionRepo  # Repositories utilisateurs et sessions
 from config import MUSIC_TRACKS  # Liste des fichiers musicaux
+from config import SESSION_TOKEN_PATH  # Fichier du jeton "se souvenir de moi"
+from asset_manifest import MANIFEST, build_manifest  # Manifeste des images (validé au démarrage, reconstruit s'il est incomplet)
+from scoring_rules import get_rules  # Règles de score (lues en base et compilées une fois)
+from services import Scoring  # Compteurs du cache des scores (affichés à la fermeture)
+from input_recording import InputRecorder, JobGate  # Enregistrement / rejeu d'une partie
+
+
+# Événements jamais bloqués, même si aucune scène ne les traite
+SYSTEM_EVENT_TYPES = frozenset({
+    pg.TEXTINPUT, pg.TEXTEDITING,  # texte saisi (remplit KEYDOWN.unicode)
+    pg.ACTIVEEVENT, pg.VIDEORESIZE, pg.VIDEOEXPOSE,
+    pg.WINDOWSHOWN, pg.WINDOWHIDDEN, pg.WINDOWEXPOSED, pg.WINDOWMOVED, pg.WINDOWRESIZED,
+    pg.WINDOWSIZECHANGED, pg.WINDOWMINIMIZED, pg.WINDOWMAXIMIZED, pg.WINDOWRESTORED,
+    pg.WINDOWENTER, pg.WINDOWLEAVE, pg.WINDOWFOCUSGAINED, pg.WINDOWFOCUSLOST, pg.WINDOWCLOSE,
+})
 
 
 # ========================================
@@ -31,10 +52,25 @@ from config import MUSIC_TRACKS  # Liste des fichiers musicaux
 # Gère la fenêtre, les événements globaux et la navigation entre scènes
 # ========================================
 class Game:
-    def __init__(self):
+    def __init__(self, record_path=None, replay=None):
+        """
+        Args:
+            record_path (str): enregistre la partie dans ce fichier (entrées, graine), à rejouer avec py -m tools.replay
+            replay (dict): enregistrement chargé par load_recording ; la boucle est alors pilotée par tools.replay
+        """
         pg.init()
+        # Hasard du jeu : une graine par partie, la même au rejeu
+        seed = replay["seed"] if replay else random.randrange(2 ** 32)
+        self.rng = random.Random(seed)
+        self.replay = replay
+        # Tâches de fond vues finies en début de frame seulement (enregistrement / rejeu), sinon Future bruts
+        self.jobs = JobGate() if record_path or replay else None
+        self.recorder = None
+
         # Initialise le gestionnaire audio (mais ne le lance pas encore)
         self.audio = AudioManager(MUSIC_TRACKS, volume=0.2)
+        # Effets sonores décodés une fois ici (après la musique : leurs canaux viennent après les siens)
+        SFX.load()
         # Ne pas lancer la musique ici - elle sera lancée seulement au menu
 
         self.w, self.h = WINDOW_WIDTH, WINDOW_HEIGHT
@@ -44,28 +80,79 @@ class Game:
         self.running = True
         self.is_fullscreen = False
 
+        # Événements : SDL ne met en file que ceux qu'une scène traite (le reste est jeté dès la source)
+        # MOUSEMOTION reste autorisé pour suivre la souris (mouse_pos) même si la scène ne l'écoute pas
+        # TEXTINPUT doit rester autorisé : pygame en tire KEYDOWN.unicode (majuscules, AltGr, accents)
+        # Fenêtre (exposition, redimensionnement, focus) : SDL en a besoin pour redessiner correctement
+        handled = {pg.QUIT, pg.KEYDOWN, pg.MOUSEMOTION, pg.MOUSEBUTTONDOWN} | SYSTEM_EVENT_TYPES
+        for scene_cls in (LoginScene, RegisterScene, MenuScene, DressScene, ResultScene):
+            handled |= scene_cls.EVENT_TYPES
+        pg.event.set_blocked(None)
+        pg.event.set_allowed(sorted(handled))
+        self.mouse_pos = pg.mouse.get_pos()  # position de la souris, tenue à jour par les événements
+        self.pending_events = deque()  # événements reportés (budget de la frame dépassé)
+        # Au rejeu, chaque frame traite exactement les événements enregistrés pour elle : pas de budget
+        self.event_budget_ms = float("inf") if replay else EVENT_BUDGET_MS
+        self.event_stats = {"received": 0, "coalesced": 0, "dispatched": 0, "deferred": 0,
+                            "frames": 0, "total_ms": 0.0, "max_ms": 0.0}
+
+        # Boucle à pas fixe : temps pas encore simulé, et compteurs (mises à jour, dessins, dessins sautés)
+        self.accumulator = 0.0
+        self.skipped_draws = 0  # dessins sautés d'affilée
+        self.frame_stats = {"updates": 0, "draws": 0, "skipped": 0}
+
+        # Validation du manifeste des images : un seul parcours de assets/ pour toute la partie
+        report = MANIFEST.validate()
+        if report["missing"]:
+            print(f"⚠ {len(report['missing'])} image(s) du manifeste introuvable(s) : {', '.join(report['missing'][:5])}")
+        self._manifest_outdated = bool(report["stale"] or report["unlisted"] or report["missing"])
+
+        # Règles de score compilées une fois ici : le score d'une tenue n'est plus que des lectures de tables
+        get_rules()
+
+        # Thread de travail pour les tâches bloquantes (bcrypt, écritures BDD)
+        # Les scènes récupèrent un Future et appliquent le résultat dans update()
+        self.worker = ThreadPoolExecutor(max_workers=2, thread_name_prefix="newstyle-worker")
+
         # Infos utilisateur (remplies après connexion)
         self.current_user_id = None
         self.current_username = None
 
-        # --- SCENE MANAGER ---
-        # Scène de départ : LOGIN
-        self.scene = None
-        self.set_scene("login")
-        assert self.scene is not None  # Pour le type checker - scene est toujours définie
-
         # `current_avatar` contient le chemin vers l'image à afficher
         self.current_avatar = None
         self.cached_avatar = None  # Avatar mis en cache pour éviter les rechargements
 
-        # Exporte les utilisateurs en JSON à chaque démarrage
-        UserRepo.export_to_json()
+        # Index de recherche du catalogue (construit à la première partie, puis réutilisé)
+        self.catalog_index = None
+
+        # --- SCENE MANAGER ---
+        # Scène de départ : MENU si un jeton "se souvenir de moi" est valide, sinon LOGIN
+        # Rejeu : même utilisateur connecté et même écran de départ qu'à l'enregistrement
+        self.scene = None
+        if replay:
+            start = replay["start"]
+            self.current_user_id, self.current_username, self.current_avatar = start["user"] or (None, None, None)
+            start_scene = start["scene"]
+        else:
+            start_scene = "menu" if self._resume_session() else "login"
+        self.set_scene(start_scene)
+        assert self.scene is not None  # Pour le type checker - scene est toujours définie
+        if record_path:
+            user = [self.current_user_id, self.current_username, self.current_avatar] if self.current_user_id else None
+            self.recorder = InputRecorder(record_path, seed, start_scene, user)
+
+        # Exporte les utilisateurs en JSON, en arrière-plan et seulement si la table a changé
+        self.export_users()
+        # Manifeste incomplet (première installation, images ajoutées) : reconstruit en arrière-plan,
+        # il servira au prochain lancement (cette partie retombe sur le décodage des images concernées)
+        if self._manifest_outdated and not replay:
+            self.worker.submit(build_manifest)
 
     # Méthode unique pour changer de scène
     def set_scene(self, name, *args):
         # Arrête la musique si on va vers connexion/inscription
         if name in ["login", "register"]:
-            pg.mixer.music.stop()  # Arrête la musique
+            self.audio.stop()  # Arrête la musique (fondu court)
         
         # Lance la musique si on va vers menu ou habillage
         if name in ["menu", "dress"]:
@@ -94,6 +181,36 @@ class Game:
         else:
             raise ValueError(f"Scène inconnue: {name}")
 
+    def export_users(self):
+        """Exporte les utilisateurs en JSON en arrière-plan (seulement si la table a changé).
+
+        Directement sur le thread : aucune scène n'attend l'export, il reste hors enregistrement.
+        Rien au rejeu : il ne doit rien écrire hors de sa copie de la base, ni charger le thread pendant les mesures.
+        """
+        if not self.replay:
+            self.worker.submit(UserRepo.export_if_changed)
+
+    def submit(self, fn, *args):
+        """Lance fn(*args) sur le thread de travail et renvoie un Future.
+
+        Le résultat doit être lu depuis la boucle principale (dans `update` de la scène)
+        avec `future.done()` / `future.result()` : pygame n'est pas thread-safe.
+        Au rejeu, fn est vue finie à la frame enregistrée (voir wait_jobs).
+        """
+        if self.jobs is None:
+            return self.worker.submit(fn, *args)
+        return self.jobs.track(self.worker.submit(fn, *args))
+
+    def wait_jobs(self, released):
+        """Rejeu : attend les tâches libérées à la prochaine frame, avant de la chronométrer.
+
+        Returns:
+            float: temps d'attente en ms (bcrypt, index, solveur : hors temps de frame)
+        """
+        if self.jobs is None or not released:
+            return 0.0
+        return self.jobs.wait(released) * 1000
+
     # Optionnel : tu peux garder tes anciens goto_*, mais ils deviennent juste des alias
     def goto_menu(self):
         self.set_scene("menu")
@@ -103,6 +220,46 @@ class Game:
         self.set_scene("login")
         self.cached_avatar = None  # Réinitialise le cache
 
+    # --- Session "se souvenir de moi" ---
+    def _resume_session(self):
+        """Reconnecte l'utilisateur du jeton enregistré (sans bcrypt). Retourne True si réussi."""
+        try:
+            with open(SESSION_TOKEN_PATH, encoding="utf-8") as f:
+                token = f.read().strip()
+        except OSError:
+            return False  # pas de jeton : connexion classique
+        user = SessionRepo.resume(token) if token else None
+        if user is None:
+            return False  # jeton expiré ou révoqué
+        self.current_user_id = user.id
+        self.current_username = user.display_name
+        self.current_avatar = user.avatar_path
+        return True
+
+    def save_session_token(self, token):
+        """Enregistre le jeton de session (créé par SessionRepo.create) pour le prochain lancement."""
+        if self.replay:
+            return  # rejeu : la session du poste reste celle de l'utilisateur
+        try:
+            with open(SESSION_TOKEN_PATH, "w", encoding="utf-8") as f:
+                f.write(token)
+        except OSError as e:
+            print(f"Impossible d'enregistrer la session : {e}")
+
+    def logout(self):
+        """Déconnecte l'utilisateur : révoque le jeton, oublie l'utilisateur et retourne au login."""
+        try:
+            if not self.replay:  # rejeu : la session du poste n'est ni révoquée ni effacée
+                with open(SESSION_TOKEN_PATH, encoding="utf-8") as f:
+                    SessionRepo.revoke(f.read().strip())
+                os.remove(SESSION_TOKEN_PATH)
+        except OSError:
+            pass  # pas de session mémorisée
+        self.current_user_id = None
+        self.current_username = None
+        self.current_avatar = None
+        self.goto_login()
+
     def goto_register(self):
         self.set_scene("register")
 
@@ -115,6 +272,33 @@ class Game:
     def cleanup(self):
         """Nettoyage à la fermeture."""
         try:
+            # Attend la fin des tâches en cours (ex: création de compte) avant de fermer la BDD
+            self.worker.shutdown(wait=True)
+            self.audio.shutdown()  # décodage de musique éventuellement en cours : abandonné
+
+            # Efficacité du cache des scores sur cette session
+            info = Scoring.cache_info()
+            if info["hits"] + info["misses"]:
+                print(f"Cache des scores : {info['hit_rate']:.0%} de succès ({info['hits']}/{info['hits'] + info['misses']}), "
+                      f"{info['size']}/{info['maxsize']} tenues, {info['evictions']} évictions, {info['invalidations']} invalidations")
+
+            # Coût du traitement des événements sur cette session
+            stats = self.event_stats
+            if stats["received"]:
+                print(f"Événements : {stats['received']} reçus, {stats['coalesced']} mouvements fusionnés, "
+                      f"{stats['deferred']} reportés, {stats['total_ms'] / max(stats['frames'], 1):.3f} ms/frame "
+                      f"(max {stats['max_ms']:.2f} ms)")
+
+            # Enregistrement de la partie (écrit maintenant : la partie est finie)
+            if self.recorder is not None:
+                self.recorder.save(type(self.scene).__name__)
+
+            # Boucle à pas fixe : dessins sautés quand la logique prenait du retard
+            frames = self.frame_stats
+            if frames["skipped"]:
+                print(f"Boucle : {frames['updates']} mises à jour, {frames['draws']} images dessinées, "
+                      f"{frames['skipped']} sautées")
+
             # BASE DE DONNÉES : fermer la connexion à la base de données
             DB.close()
 
@@ -171,31 +355,117 @@ class Game:
             except Exception:
                 pass
 
+    def _poll_events(self):
+        """Événements de la frame (reportés d'abord), chaque suite de MOUSEMOTION fusionnée en un seul."""
+        events = list(self.pending_events)
+        self.pending_events.clear()
+        for event in pg.event.get():
+            self.event_stats["received"] += 1
+            if event.type == pg.MOUSEMOTION and events and events[-1].type == pg.MOUSEMOTION:
+                # Dernière position, déplacement cumulé : l'ordre avec les clics est conservé
+                prev = events[-1]
+                rel = (prev.rel[0] + event.rel[0], prev.rel[1] + event.rel[1])
+                events[-1] = pg.event.Event(pg.MOUSEMOTION, dict(event.dict, rel=rel))
+                self.event_stats["coalesced"] += 1
+            else:
+                events.append(event)
+        return events
+
+    def _handle_events(self, events):
+        """Transmet les événements à la scène qui s'y abonne, dans la limite de EVENT_BUDGET_MS par frame.
+
+        Returns:
+            list: les événements traités (ceux qui ne sont pas reportés)
+        """
+        stats = self.event_stats
+        start = time.perf_counter()
+        deadline = start + self.event_budget_ms / 1000
+        handled = events
+        for i, event in enumerate(events):
+            if i and time.perf_counter() > deadline:
+                self.pending_events.extend(events[i:])  # traités en tête de la frame suivante
+                stats["deferred"] += len(events) - i
+                handled = events[:i]
+                break
+            if event.type in (pg.MOUSEMOTION, pg.MOUSEBUTTONDOWN, pg.MOUSEBUTTONUP):
+                self.mouse_pos = event.pos
+            if event.type == pg.QUIT:
+                self.running = False
+            elif event.type == pg.KEYDOWN and (
+                event.key == pg.K_F11
+                or (event.key == pg.K_RETURN and (event.mod & pg.KMOD_ALT))
+            ):
+                self.toggle_fullscreen()
+            elif self.scene and event.type in self.scene.EVENT_TYPES:
+                self.scene.handle_event(event)
+                stats["dispatched"] += 1
+        elapsed = (time.perf_counter() - start) * 1000
+        stats["frames"] += 1
+        stats["total_ms"] += elapsed
+        stats["max_ms"] = max(stats["max_ms"], elapsed)
+        return handled
+
+    def step(self, frame_dt, events=None, released=None):
+        """Une frame : événements, mises à jour de la logique, puis dessin (sauf s'il est sauté).
+
+        Au rejeu, `events` et `released` (tâches de fond vues finies) viennent de l'enregistrement.
+        """
+        if events is None:
+            events = self._poll_events()
+        if self.jobs is not None:
+            released = self.jobs.ready() if released is None else released
+            self.jobs.release(released)
+        handled = self._handle_events(events)
+        if self.recorder is not None:
+            self.recorder.frame(frame_dt, handled, released)
+        frame_dt = min(frame_dt, MAX_FRAME_TIME)
+        self.audio.update(frame_dt)  # pistes décodées en arrière-plan : démarrage / fondu enchaîné
+
+        if not FIXED_TIMESTEP:
+            updates, alpha, behind = 1, 1.0, False
+            if self.scene:
+                self.scene.update(frame_dt)
+        else:
+            # Pas fixe : la logique avance toujours de 1/SIM_HZ, autant de fois que le temps écoulé le demande
+            dt = 1.0 / SIM_HZ
+            self.accumulator += frame_dt
+            updates = 0
+            while self.accumulator >= dt and updates < MAX_UPDATES_PER_FRAME:
+                if self.scene:
+                    self.scene.update(dt)
+                self.accumulator -= dt
+                updates += 1
+            if updates == MAX_UPDATES_PER_FRAME:
+                self.accumulator = min(self.accumulator, dt)  # retard trop grand : abandonné
+            alpha = self.accumulator / dt  # avancement vers la prochaine mise à jour (interpolation)
+            # Vrai retard = frame nettement plus longue qu'un pas, ou plafond atteint. Deux mises à jour
+            # après une frame sans mise à jour (gigue 16/17 ms du tick) ne sont pas un retard
+            behind = frame_dt > LAG_FRAME_FACTOR * dt or updates == MAX_UPDATES_PER_FRAME
+        self.frame_stats["updates"] += updates
+
+        # En retard : on saute le dessin, au plus MAX_FRAMESKIP fois d'affilée
+        if behind and updates and self.skipped_draws < MAX_FRAMESKIP:
+            self.skipped_draws += 1
+            self.frame_stats["skipped"] += 1
+            return
+        self.skipped_draws = 0
+        if self.scene:
+            self.scene.draw(self.screen, alpha)
+        self._draw_avatar()
+        pg.display.flip()
+        self.frame_stats["draws"] += 1
+
     def run(self):
         while self.running:
-            dt = self.clock.tick(FPS) / 1000.0
-
-            for event in pg.event.get():
-                if event.type == pg.QUIT:
-                    self.running = False
-                elif event.type == pg.KEYDOWN and (
-                    event.key == pg.K_F11
-                    or (event.key == pg.K_RETURN and (event.mod & pg.KMOD_ALT))
-                ):
-                    self.toggle_fullscreen()
-                else:
-                    if self.scene:
-                        self.scene.handle_event(event)
-
-            if self.scene:
-                self.scene.update(dt)
-                self.scene.draw(self.screen)
-            self._draw_avatar()
-            pg.display.flip()
+            self.step(self.clock.tick(FPS) / 1000.0)
 
         self.cleanup()
         pg.quit()
 
 
 if __name__ == "__main__":
-    Game().run()
+    parser = argparse.ArgumentParser(description=TITLE)
+    parser.add_argument("--record", metavar="FICHIER", default=None,
+                        help="enregistre la partie (entrées, graine) pour la rejouer avec py -m tools.replay")
+    args = parser.parse_args()
+    Game(record_path=args.record).run()
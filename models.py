@@ -1,6 +1,8 @@
 # ========================================
 # MODÈLES DE DONNÉES (DATACLASSES)
 # Définition des structures de données utilisées dans le jeu
+# slots=True : pas de __dict__ par objet (moins de mémoire, accès plus rapide)
+# frozen=True : objets non modifiables, donc hashables (utilisables dans un set / comme clé)
 # ========================================
 
 # === IMPORTS ===
@@ -9,15 +11,37 @@ from typing import Optional  # Type optionnel (champ peut être None)
 
 
 # === CATÉGORIES DE VÊTEMENTS ===
-@dataclass  # Décorateur transforme la classe en dataclass avec __init__, __repr__, etc.
+DEFAULT_Z_ORDER = 2  # Calque d'une catégorie sans z_order connu (celui des hauts)
+# Mots-clés du nom de catégorie -> calque, testés dans l'ordre (mêmes règles que data/migrations/003_category_z_order.sql)
+Z_ORDER_KEYWORDS = (
+    (0, ("shoe", "chaussure", "feet")),
+    (1, ("bottom", "bas", "pants", "pantalon", "skirt", "jupe", "short", "jean")),
+    (2, ("top", "haut", "shirt", "dress", "robe", "coat", "manteau", "jacket", "veste", "sweater", "pull")),
+    (3, ("hair", "cheveu", "head", "chapeau", "hat")),
+    (4, ("face", "visage", "mask", "masque", "glasses", "lunette")),
+    (5, ("acc",)),
+)
+
+
+def z_order_for(name: str) -> int:
+    """Calque d'une nouvelle catégorie d'après son nom (DEFAULT_Z_ORDER si aucun mot-clé ne correspond)."""
+    name = name.lower()
+    for z_order, keywords in Z_ORDER_KEYWORDS:
+        if any(k in name for k in keywords):
+            return z_order
+    return DEFAULT_Z_ORDER
+
+
+@dataclass(slots=True, frozen=True)  # Dataclass compacte et immuable (__init__, __repr__, __eq__, __hash__)
 class Category:  # Représente une catégorie de vêtements (Top, Bottom, Shoes, etc.)
     id: int  # Identifiant unique de la catégorie
     name: str  # Nom de la catégorie (ex: 'Top', 'Bottom', 'Shoes')
     max_items: int = 1  # Nombre maximum de vêtements de cette catégorie dans une tenue (défaut : 1)
+    z_order: int = DEFAULT_Z_ORDER  # Calque sur le mannequin : 0=chaussures (fond) -> 5=accessoires (avant)
 
 
 # === VÊTEMENTS ===
-@dataclass  # Transforme la classe en dataclass
+@dataclass(slots=True, frozen=True)  # Dataclass compacte et immuable
 class Garment:  # Représente un vêtement/article du jeu
     id: int  # Identifiant unique du vêtement
     name: str  # Nom du vêtement (ex: 'Red T-Shirt', 'Blue Jeans')
@@ -27,8 +51,17 @@ class Garment:  # Représente un vêtement/article du jeu
     price: int = 0  # Prix du vêtement en devises du jeu (défaut : 0)
 
 
+# === THÈMES ===
+@dataclass(slots=True, frozen=True)  # Dataclass compacte et immuable
+class Theme:  # Thème d'une partie (ex: 'chic') et ses points
+    id: int  # Identifiant unique du thème
+    code: str  # Code normalisé (minuscules sans accents), comparé à Garment.score_theme
+    label: str  # Libellé affiché (ex: 'Soirée')
+    bonus: int = 15  # Points par vêtement porté de ce thème
+
+
 # === MANNEQUINS ===
-@dataclass  # Transforme la classe en dataclass
+@dataclass(slots=True, frozen=True)  # Dataclass compacte et immuable
 class Mannequin:  # Représente un mannequin (personnage) qu'on peut habiller
     id: int  # Identifiant unique du mannequin
     name: str  # Nom du mannequin (ex: 'Lina', 'Alex')
@@ -36,10 +69,34 @@ class Mannequin:  # Représente un mannequin (personnage) qu'on peut habiller
 
 
 # === UTILISATEURS ===
-@dataclass  # Transforme la classe en dataclass
+@dataclass(slots=True, frozen=True)  # Dataclass compacte et immuable
 class User:  # Représente un compte utilisateur du jeu
     id: int  # Identifiant unique de l'utilisateur
     username: str  # Nom d'utilisateur unique (pour la connexion)
     display_name: str  # Nom d'affichage du joueur
     avatar_path: str  # Chemin vers l'avatar de l'utilisateur
-    created_at: Optional[str] = None  # Date de création du compte
\ No newline at end of file
+    created_at: Optional[str] = None  # Date de création du compte
+
+
+# === ASSETS (MANIFESTE DES IMAGES) ===
+@dataclass(slots=True, frozen=True)  # Dataclass compacte et immuable
+class Asset:  # Métadonnées précalculées d'une image du dossier assets/
+    path: str  # Chemin relatif de l'image (avec des "/")
+    size: int  # Taille du fichier en octets
+    width: int  # Largeur en pixels
+    height: int  # Hauteur en pixels
+    has_alpha: bool  # True si l'image a un canal de transparence
+    bbox_x: int  # Rectangle des pixels visibles (sans les bords transparents)
+    bbox_y: int
+    bbox_w: int
+    bbox_h: int
+    content_hash: str  # Empreinte blake2b du contenu
+
+
+# === ENVELOPPES AUDIO (DISQUE MUSICAL) ===
+@dataclass(slots=True, frozen=True)  # Dataclass compacte et immuable
+class AudioEnvelope:  # Énergie précalculée d'une musique (py -m tools.analyze_audio)
+    content_hash: str  # Empreinte blake2b du fichier audio
+    rate: int  # Valeurs par seconde
+    rms: bytes  # Volume normalisé (0-255), une valeur par 1/rate seconde
+    beat: bytes  # Impulsion de battement (0-255), même découpage que rms
@@ -1,83 +1,277 @@
-from typing import List, Optional  # Types pour annotations (List, Optional)
-from db import DB  # Instance globale de la DB définie dans db.py
-from models import Category, Garment, Mannequin, User  # Dataclasses utilisées pour mapper les lignes
+from itertools import starmap  # Construit les dataclasses directement depuis les tuples
+from typing import Dict, Iterator, List, Optional, Tuple  # Types pour annotations (Dict, List, Optional...)
+from db import DB, normalize_code  # Instance globale de la DB définie dans db.py, codes de thème normalisés
+from config import GARMENT_PAGE_SIZE  # Taille d'une page du catalogue
+from models import Asset, AudioEnvelope, Category, Garment, Mannequin, Theme, User, z_order_for  # Dataclasses utilisées pour mapper les lignes
 import bcrypt  # Bibliothèque pour hasher et vérifier les mots de passe
+import hashlib  # Hash rapide (SHA-256) des jetons de session
+import secrets  # Génération de jetons aléatoires sûrs
 import json  # Pour exporter en JSON
+import os  # Remplacement atomique du fichier d'export
+import tempfile  # Fichier temporaire propre à chaque export (deux exports peuvent tourner en même temps)
+import threading  # Un seul export des utilisateurs à la fois (export + signature)
 from pathlib import Path  # Pour manipuler les chemins
 
+# Colonnes sélectionnées DANS L'ORDRE des champs des dataclasses : les lignes (tuples)
+# sont passées telles quelles au constructeur, sans sqlite3.Row ni dict intermédiaire
+CATEGORY_COLUMNS = "id, name, max_items, z_order"
+# (content_hash est réservé à l'import du catalogue)
+GARMENT_COLUMNS = "id, name, category_id, sprite_path, score_theme, price"
+MANNEQUIN_COLUMNS = "id, name, base_sprite_path"
+THEME_COLUMNS = "id, code, label, bonus"
+USER_COLUMNS = "id, username, display_name, avatar_path, created_at"
+ASSET_COLUMNS = "path, size, width, height, has_alpha, bbox_x, bbox_y, bbox_w, bbox_h, content_hash"
+
 
 class CategoryRepo:  # Répertoire d'accès aux catégories (utilise la BASE DE DONNÉES)
     @staticmethod  # Méthode statique, pas besoin d'instance
     def all() -> List[Category]:  # Retourne toutes les catégories de la table "category"
         # BASE DE DONNÉES : ouvre une connexion avec la table category
-        with DB.connect() as con:  # Ouvre une connexion (context manager)
+        with DB.connect(row_factory=None) as con:  # Ouvre une connexion (context manager), lignes en tuples
             # BASE DE DONNÉES : sélectionne TOUS les enregistrements de la table category
-            rows = con.execute("SELECT * FROM category").fetchall()  # Récupère toutes les lignes ( rows ) de category, fetchall() = récupère toutes les lignes
-        return [Category(**dict(r)) for r in rows]  # Mappe chaque ligne en dataclass Category
+            rows = con.execute(f"SELECT {CATEGORY_COLUMNS} FROM category ORDER BY id").fetchall()  # Récupère toutes les lignes ( rows ) de category, fetchall() = récupère toutes les lignes
+        return list(starmap(Category, rows))  # Mappe chaque ligne en dataclass Category (par position)
 
 
     @staticmethod  # Méthode utilitaire pour chercher par nom
     def by_name(name: str) -> Optional[Category]:  # Cherche une catégorie par son nom dans la BASE DE DONNÉES
         # BASE DE DONNÉES : ouvre une connexion
-        with DB.connect() as con:  # Ouvre une connexion
+        with DB.connect(row_factory=None) as con:  # Ouvre une connexion
             # BASE DE DONNÉES : sélectionne la catégorie avec un nom spécifique (utilise WHERE pour filtrer)
-            r = con.execute("SELECT * FROM category WHERE name=?", (name,)).fetchone()  # Exécute la requête avec paramètre, r = result ou row ( abrevation de la ligne retournée  )
-        return Category(**dict(r)) if r else None  # Retourne None si non trouvée
+            r = con.execute(f"SELECT {CATEGORY_COLUMNS} FROM category WHERE name=?", (name,)).fetchone()  # Exécute la requête avec paramètre, r = result ou row ( abrevation de la ligne retournée  )
+        return Category(*r) if r else None  # Retourne None si non trouvée
+
+    @staticmethod
+    def create(name: str, max_items: int = 1, z_order: Optional[int] = None) -> Category:  # Crée une catégorie (ou renvoie l'existante)
+        # Calque déduit du nom si non fourni (shoes -> 0 ... accessories -> 5), comme la migration 003
+        if z_order is None:
+            z_order = z_order_for(name)
+        # BASE DE DONNÉES : INSERT OR IGNORE => ne fait rien si le nom existe déjà (UNIQUE)
+        DB.write(lambda con: con.execute(
+            "INSERT OR IGNORE INTO category (name, max_items, z_order) VALUES (?, ?, ?)", (name, max_items, z_order)
+        ))
+        GarmentRepo.catalog_version += 1
+        return CategoryRepo.by_name(name)
 
 
 class GarmentRepo:  # Répertoire d'accès aux vêtements/articles (utilise la BASE DE DONNÉES)
+    # Incrémenté à chaque écriture du catalogue par ce processus (vêtements, catégories, palettes) :
+    # les règles de score compilées et le cache des scores se recalculent quand il change
+    catalog_version = 0
+
     @staticmethod
     def by_category(category_id: int) -> List[Garment]:  # Liste les vêtements d'une catégorie depuis la BASE DE DONNÉES
         # BASE DE DONNÉES : ouvre une connexion à la table garment
-        with DB.connect() as con:  # Ouvre une connexion
+        with DB.connect(row_factory=None) as con:  # Ouvre une connexion
             # BASE DE DONNÉES : sélectionne tous les vêtements appartenant à une catégorie spécifique
-            rows = con.execute("SELECT * FROM garment WHERE category_id=?", (category_id,)).fetchall()  # Récupère les lignes filtrées, rows est different de row ( rows = plusieurs lignes )
-        return [Garment(**dict(r)) for r in rows]  # Mappe les lignes en objets Garment
+            rows = con.execute(f"SELECT {GARMENT_COLUMNS} FROM garment WHERE category_id=?", (category_id,)).fetchall()  # Récupère les lignes filtrées, rows est different de row ( rows = plusieurs lignes )
+        return list(starmap(Garment, rows))  # Mappe les lignes en objets Garment
 
 
     @staticmethod
     def all() -> List[Garment]:  # Retourne tous les vêtements de la BASE DE DONNÉES
         # BASE DE DONNÉES : ouvre une connexion à la table garment
-        with DB.connect() as con:  # Ouvre une connexion
+        with DB.connect(row_factory=None) as con:  # Ouvre une connexion
             # BASE DE DONNÉES : sélectionne TOUS les enregistrements de la table garment
-            rows = con.execute("SELECT * FROM garment").fetchall()  # Sélectionne tous les vêtements
-        return [Garment(**dict(r)) for r in rows]  # Mappe en dataclasses
+            rows = con.execute(f"SELECT {GARMENT_COLUMNS} FROM garment").fetchall()  # Sélectionne tous les vêtements
+        return list(starmap(Garment, rows))  # Mappe en dataclasses
+
+    @staticmethod
+    def page(after: Tuple[int, int] = (0, 0), limit: int = GARMENT_PAGE_SIZE,
+             category_id: Optional[int] = None) -> List[Garment]:  # Une page du catalogue
+        """Retourne au plus `limit` vêtements situés APRÈS la clé `after` = (category_id, id).
+
+        Pagination par clé (keyset) : la requête reprend là où la page précédente s'est
+        arrêtée grâce à l'index (category_id, id), sans OFFSET (qui relirait toutes les
+        lignes déjà vues). Avec `category_id`, seule cette catégorie est parcourue.
+        """
+        cat = after[0] if category_id is None else category_id
+        with DB.connect(row_factory=None) as con:
+            # 1) suite de la catégorie en cours : recherche directe dans l'index (category_id = ?, id > ?)
+            rows = con.execute(
+                f"SELECT {GARMENT_COLUMNS} FROM garment WHERE category_id = ? AND id > ? "
+                "ORDER BY id LIMIT ?", (cat, after[1], limit)
+            ).fetchall()
+            # 2) page pas encore pleine : début des catégories suivantes
+            # (deux requêtes plutôt que "(category_id, id) > (?, ?)", que SQLite ne sait
+            # positionner que sur category_id et qui relirait toute la catégorie en cours)
+            if category_id is None and len(rows) < limit:
+                rows += con.execute(
+                    f"SELECT {GARMENT_COLUMNS} FROM garment WHERE category_id > ? "
+                    "ORDER BY category_id, id LIMIT ?", (cat, limit - len(rows))
+                ).fetchall()
+        return list(starmap(Garment, rows))
+
+    @staticmethod
+    def iter_pages(page_size: int = GARMENT_PAGE_SIZE,
+                   category_id: Optional[int] = None) -> Iterator[List[Garment]]:  # Parcours page par page
+        """Parcourt le catalogue (trié par catégorie puis id) une page à la fois.
+
+        Chaque page ouvre sa propre connexion : entre deux pages, aucune lecture n'est
+        en cours, on peut donc consommer l'itérateur sur plusieurs frames.
+        """
+        after = (0, 0)
+        while True:
+            garments = GarmentRepo.page(after, page_size, category_id)
+            if not garments:
+                return
+            yield garments
+            last = garments[-1]
+            after = (last.category_id, last.id)  # clé de reprise = dernier vêtement reçu
+            if len(garments) < page_size:
+                return  # page incomplète : c'était la dernière
+
+    @staticmethod
+    def by_ids(ids: List[int]) -> List[Garment]:  # Vêtements demandés, dans l'ordre des ids donnés
+        """Relit une liste d'ids (ex: une page de résultats de recherche) en une requête."""
+        if not ids:
+            return []
+        placeholders = ", ".join("?" * len(ids))
+        with DB.connect(row_factory=None) as con:
+            rows = con.execute(f"SELECT {GARMENT_COLUMNS} FROM garment WHERE id IN ({placeholders})", ids).fetchall()
+        by_id = {r[0]: r for r in rows}
+        return [Garment(*by_id[i]) for i in ids if i in by_id]  # un id supprimé entre-temps est ignoré
+
+    @staticmethod
+    def cheapest_per_theme_class(theme_code: str, per_class: int, category_ids: List[int],
+                                 by_palette: bool = True) -> List[Garment]:  # Candidats du solveur de tenues
+        """Les `per_class` vêtements les moins chers de chaque sorte, dans chaque catégorie.
+
+        Une sorte = du thème ou non, et classe de palette (ou pas de palette) : deux vêtements
+        de la même sorte rapportent les mêmes points. `by_palette=False` quand le thème ne
+        donne aucun point d'harmonie : les palettes ne séparent plus les sortes. Le solveur de tenues n'a besoin que de
+        ceux-là : un vêtement plus cher de la même sorte ne peut pas entrer dans son top-k.
+        Chaque requête parcourt l'index (category_id, price, id) dans l'ordre des prix et
+        s'arrête après `per_class` lignes.
+        """
+        join, palette_filter, palette_classes = "", "", [()]
+        out = []
+        with DB.connect(row_factory=None) as con:
+            if by_palette:
+                join = "LEFT JOIN garment_palette ON garment_palette.garment_id = garment.id "
+                palette_filter = "AND palette_class IS ? "
+                palette_classes = [(None,)] + con.execute(
+                    "SELECT DISTINCT palette_class FROM garment_palette ORDER BY palette_class").fetchall()
+            for cat_id in category_ids:
+                for op in ("IS", "IS NOT"):  # du thème / hors thème (NULL compris)
+                    for palette_class in palette_classes:  # (sans palette, puis chaque classe)
+                        out += con.execute(
+                            f"SELECT {GARMENT_COLUMNS} FROM garment {join}"
+                            f"WHERE category_id = ? AND score_theme {op} ? {palette_filter}"
+                            "ORDER BY price, id LIMIT ?", (cat_id, normalize_code(theme_code), *palette_class, per_class)
+                        ).fetchall()
+        return list(starmap(Garment, out))
+
+    @staticmethod
+    def index_by_sprite() -> Dict[str, tuple]:  # État actuel du catalogue, indexé par chemin de sprite
+        """Retourne {sprite_path: (name, category_id, score_theme, price, content_hash)}.
+
+        Utilisé par l'import du catalogue pour ne réécrire que les vêtements nouveaux ou modifiés.
+        """
+        with DB.connect() as con:
+            rows = con.execute(
+                "SELECT sprite_path, name, category_id, score_theme, price, content_hash FROM garment"
+            ).fetchall()
+        return {r[0]: tuple(r[1:]) for r in rows}
+
+    @staticmethod
+    def upsert_many(rows: List[tuple]) -> int:  # Insère ou met à jour un lot de vêtements
+        """Upsert de vêtements en UNE transaction (`executemany`).
+
+        Args:
+            rows (list): tuples (name, category_id, sprite_path, score_theme, price, content_hash)
+
+        Returns:
+            int: Nombre de lignes écrites
+        """
+        if not rows:
+            return 0
+        # Codes de thème normalisés comme en base ("Chic" -> "chic"), vide -> NULL
+        rows = [(name, cat, sprite, normalize_code(theme) or None, price, digest)
+                for name, cat, sprite, theme, price, digest in rows]
+        # DB.write : une seule transaction courte pour tout le lot (reprise si la base est occupée)
+        # sprite_path est UNIQUE : une ligne existante est mise à jour au lieu d'être dupliquée
+        DB.write(lambda con: con.executemany(
+            """
+            INSERT INTO garment (name, category_id, sprite_path, score_theme, price, content_hash)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(sprite_path) DO UPDATE SET
+                name = excluded.name,
+                category_id = excluded.category_id,
+                score_theme = excluded.score_theme,
+                price = excluded.price,
+                content_hash = excluded.content_hash
+            """,
+            rows,
+        ))
+        GarmentRepo.catalog_version += 1
+        return len(rows)
 
 
 class MannequinRepo:  # Répertoire d'accès aux mannequins (utilise la BASE DE DONNÉES)
     @staticmethod
     def all() -> List[Mannequin]:  # Retourne tous les mannequins de la BASE DE DONNÉES
         # BASE DE DONNÉES : ouvre une connexion à la table mannequin
-        with DB.connect() as con:  # Ouvre une connexion
+        with DB.connect(row_factory=None) as con:  # Ouvre une connexion
             # BASE DE DONNÉES : sélectionne TOUS les enregistrements de la table mannequin
-            rows = con.execute("SELECT * FROM mannequin").fetchall()  # Récupère toutes les lignes de mannequin
-        return [Mannequin(**dict(r)) for r in rows]  # Mappe en dataclasses Mannequin
+            rows = con.execute(f"SELECT {MANNEQUIN_COLUMNS} FROM mannequin").fetchall()  # Récupère toutes les lignes de mannequin
+        return list(starmap(Mannequin, rows))  # Mappe en dataclasses Mannequin
+
+
+class ThemeRepo:  # Répertoire d'accès aux thèmes et aux règles de score (utilise la BASE DE DONNÉES)
+    @staticmethod
+    def all() -> List[Theme]:  # Tous les thèmes, dans l'ordre de création
+        with DB.connect(row_factory=None) as con:
+            rows = con.execute(f"SELECT {THEME_COLUMNS} FROM theme ORDER BY id").fetchall()
+        return list(starmap(Theme, rows))
+
+    @staticmethod
+    def scoring_rules() -> Tuple[Dict[str, int], List[Tuple[int, int, int]], Dict[int, int], List[Tuple[int, int, int]]]:
+        """Tables brutes des règles de score, lues en une connexion (compilées par ScoringRules).
+
+        Returns:
+            tuple: ({nom_règle: valeur}, [(theme_id, category_id, bonus)], {nb_vêtements: points},
+                [(theme_id, palette_class, bonus)])
+        """
+        with DB.connect(row_factory=None) as con:
+            values = dict(con.execute("SELECT name, value FROM scoring_rule").fetchall())
+            category_bonus = con.execute(
+                "SELECT theme_id, category_id, bonus FROM theme_category_bonus"
+            ).fetchall()
+            size_points = dict(con.execute("SELECT item_count, points FROM outfit_size_points").fetchall())
+            palette_bonus = con.execute(
+                "SELECT theme_id, palette_class, bonus FROM theme_palette_bonus"
+            ).fetchall()
+        return values, category_bonus, size_points, palette_bonus
+
+
+_export_lock = threading.Lock()  # export des utilisateurs : un seul à la fois (fichier + signature)
 
 
 class UserRepo:  # Répertoire d'accès aux utilisateurs (utilise la BASE DE DONNÉES)
     @staticmethod
     def all() -> List[User]:  # Retourne tous les utilisateurs enregistrés
         # BASE DE DONNÉES : ouvre une connexion à la table users
-        with DB.connect() as con:  # Ouvre une connexion
+        with DB.connect(row_factory=None) as con:  # Ouvre une connexion
             # BASE DE DONNÉES : sélectionne TOUS les utilisateurs SANS le hash du mot de passe (sécurité)
-            rows = con.execute("SELECT id, username, display_name, avatar_path, created_at FROM users").fetchall()
-        return [User(**dict(r)) for r in rows]  # Mappe en dataclasses User
+            rows = con.execute(f"SELECT {USER_COLUMNS} FROM users").fetchall()
+        return list(starmap(User, rows))  # Mappe en dataclasses User
 
     @staticmethod
     def by_id(user_id: int) -> Optional[User]:  # Cherche un utilisateur par son ID
         # BASE DE DONNÉES : ouvre une connexion
-        with DB.connect() as con:  # Ouvre une connexion
+        with DB.connect(row_factory=None) as con:  # Ouvre une connexion
             # BASE DE DONNÉES : sélectionne l'utilisateur avec cet ID
-            r = con.execute("SELECT id, username, display_name, avatar_path, created_at FROM users WHERE id=?", (user_id,)).fetchone()
-        return User(**dict(r)) if r else None  # Retourne None si non trouvé
+            r = con.execute(f"SELECT {USER_COLUMNS} FROM users WHERE id=?", (user_id,)).fetchone()
+        return User(*r) if r else None  # Retourne None si non trouvé
 
     @staticmethod
     def by_username(username: str) -> Optional[User]:  # Cherche un utilisateur par son nom d'utilisateur
         # BASE DE DONNÉES : ouvre une connexion
-        with DB.connect() as con:  # Ouvre une connexion
+        with DB.connect(row_factory=None) as con:  # Ouvre une connexion
             # BASE DE DONNÉES : sélectionne l'utilisateur avec ce username
-            r = con.execute("SELECT id, username, display_name, avatar_path, created_at FROM users WHERE username=?", (username,)).fetchone()
-        return User(**dict(r)) if r else None  # Retourne None si non trouvé
+            r = con.execute(f"SELECT {USER_COLUMNS} FROM users WHERE username=?", (username,)).fetchone()
+        return User(*r) if r else None  # Retourne None si non trouvé
 
     @staticmethod
     def create(username: str, display_name: str, password: str, avatar_path: str = "assets/avatars/default.png") -> Optional[User]:
@@ -85,20 +279,48 @@ class UserRepo:  # Répertoire d'accès aux utilisateurs (utilise la BASE DE DON
         password_hash = bcrypt.hashpw(password.encode(), bcrypt.gensalt())
         
         try:
-            # BASE DE DONNÉES : ouvre une connexion
-            with DB.connect() as con:  # Ouvre une connexion
-                # BASE DE DONNÉES : insère le nouvel utilisateur dans la table users
-                con.execute(
-                    "INSERT INTO users (username, display_name, password_hash, avatar_path) VALUES (?, ?, ?, ?)",
-                    (username, display_name, password_hash, avatar_path)
-                )
-                con.commit()  # Valide la transaction
+            # BASE DE DONNÉES : insère le nouvel utilisateur dans la table users (transaction courte)
+            DB.write(lambda con: con.execute(
+                "INSERT INTO users (username, display_name, password_hash, avatar_path) VALUES (?, ?, ?, ?)",
+                (username, display_name, password_hash, avatar_path)
+            ))
             # Récupère l'utilisateur créé
             return UserRepo.by_username(username)
         except Exception as e:
             print(f"Erreur lors de la création de l'utilisateur : {e}")
             return None
 
+    @staticmethod
+    def existing_usernames(usernames: List[str]) -> set:  # Identifiants déjà pris parmi une liste
+        if not usernames:
+            return set()
+        with DB.connect() as con:
+            # BASE DE DONNÉES : la liste passe par une table temporaire plutôt qu'un IN (?, ?, ...) géant
+            con.execute("CREATE TEMP TABLE IF NOT EXISTS wanted_username (username TEXT PRIMARY KEY)")
+            con.execute("DELETE FROM wanted_username")
+            con.executemany("INSERT OR IGNORE INTO wanted_username VALUES (?)", [(u,) for u in usernames])
+            rows = con.execute(
+                "SELECT u.username FROM users u JOIN wanted_username w ON w.username = u.username"
+            ).fetchall()
+        return {r[0] for r in rows}
+
+    @staticmethod
+    def create_many(rows: List[tuple]) -> int:  # Insère un lot d'utilisateurs déjà validés et hachés
+        """Insère des utilisateurs en UNE transaction (`executemany`).
+
+        Args:
+            rows (list): tuples (username, display_name, avatar_path, password_hash)
+
+        Returns:
+            int: Nombre d'utilisateurs réellement créés (les identifiants déjà pris sont ignorés)
+        """
+        if not rows:
+            return 0
+        return DB.write(lambda con: con.executemany(
+            "INSERT OR IGNORE INTO users (username, display_name, avatar_path, password_hash) VALUES (?, ?, ?, ?)",
+            rows
+        ).rowcount)
+
     @staticmethod
     def authenticate(username: str, password: str) -> Optional[User]:  # Vérifie les identifiants d'un utilisateur
         # BASE DE DONNÉES : ouvre une connexion
@@ -115,9 +337,24 @@ class UserRepo:  # Répertoire d'accès aux utilisateurs (utilise la BASE DE DON
             return UserRepo.by_username(username)  # Authentification réussie
         return None  # Mot de passe incorrect
 
+    @staticmethod
+    def export_signature() -> str:  # "Version" de la table users, pour savoir si l'export est à refaire
+        """Retourne une signature (nombre d'utilisateurs + plus grand id) de la table users.
+
+        Les ids sont en AUTOINCREMENT (jamais réutilisés) : tout ajout ou suppression
+        change la signature. Le jeu ne modifie jamais un utilisateur existant.
+        """
+        with DB.connect() as con:
+            count, max_id = con.execute("SELECT COUNT(*), COALESCE(MAX(id), 0) FROM users").fetchone()
+        return f"{count}:{max_id}"
+
     @staticmethod
     def export_to_json(filepath: str = "data/users_export.json") -> bool:
         """Exporte tous les utilisateurs en JSON pour consultation facile.
+
+        Les lignes sont écrites au fil du curseur (sans liste intermédiaire) dans un
+        fichier temporaire, qui remplace ensuite l'export d'un coup (jamais de JSON à moitié écrit).
+        Chaque export a son propre fichier temporaire : deux exports simultanés ne se mélangent pas.
         
         Args:
             filepath (str): Chemin du fichier JSON (par défaut: data/users_export.json)
@@ -125,33 +362,64 @@ class UserRepo:  # Répertoire d'accès aux utilisateurs (utilise la BASE DE DON
         Returns:
             bool: True si l'export a réussi, False sinon
         """
+        target = Path(filepath)
+        tmp = None
         try:
-            users = UserRepo.all()
-            
-            # Convertit chaque User en dictionnaire
-            users_data = []
-            for user in users:
-                users_data.append({
-                    "id": user.id,
-                    "username": user.username,
-                    "display_name": user.display_name,
-                    "avatar_path": user.avatar_path,
-                    "created_at": user.created_at
-                })
-            
             # Crée le répertoire s'il n'existe pas
-            Path(filepath).parent.mkdir(parents=True, exist_ok=True)
-            
-            # Écrit le JSON formaté (lisible)
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(users_data, f, indent=2, ensure_ascii=False)
-            
-            print(f"✓ Export réussi: {filepath} ({len(users)} utilisateurs)")
+            target.parent.mkdir(parents=True, exist_ok=True)
+
+            count = 0
+            with DB.connect() as con, tempfile.NamedTemporaryFile(
+                'w', encoding='utf-8', dir=target.parent, prefix=target.name + ".", suffix=".tmp", delete=False
+            ) as f:
+                tmp = Path(f.name)
+                cur = con.execute("SELECT id, username, display_name, avatar_path, created_at FROM users")
+                # Même mise en forme que json.dump(liste, indent=2), mais écrite ligne par ligne
+                for r in cur:
+                    f.write("[\n" if count == 0 else ",\n")
+                    entry = json.dumps(dict(r), indent=2, ensure_ascii=False)
+                    f.write("\n".join("  " + line for line in entry.splitlines()))
+                    count += 1
+                f.write("\n]" if count else "[]")
+
+            # Remplacement atomique de l'ancien export
+            os.replace(tmp, target)
+            print(f"✓ Export réussi: {filepath} ({count} utilisateurs)")
             return True
         except Exception as e:
             print(f"✗ Erreur lors de l'export JSON: {e}")
+            if tmp is not None:
+                try:
+                    tmp.unlink()  # ne laisse pas traîner de fichier temporaire
+                except OSError:
+                    pass
             return False
 
+    @staticmethod
+    def export_if_changed(filepath: str = "data/users_export.json") -> bool:
+        """Refait l'export seulement si la table users a changé depuis le dernier export.
+
+        La signature du dernier export est gardée à côté (`<filepath>.sig`). Vérification, export
+        et signature se font sous un verrou : deux exports simultanés (démarrage + inscription)
+        ne peuvent pas laisser un ancien export à côté d'une signature plus récente.
+
+        Returns:
+            bool: True si un export a été écrit, False s'il était déjà à jour (ou en erreur)
+        """
+        sig_path = Path(filepath + ".sig")
+        with _export_lock:
+            # Signature lue AVANT l'export : un ajout pendant l'export sera repris la fois suivante
+            signature = UserRepo.export_signature()
+            try:
+                if Path(filepath).exists() and sig_path.read_text(encoding='utf-8') == signature:
+                    return False  # export déjà à jour
+            except OSError:
+                pass  # pas de signature : on exporte
+            if not UserRepo.export_to_json(filepath):
+                return False
+            sig_path.write_text(signature, encoding='utf-8')
+            return True
+
     @staticmethod
     def get_as_dict_list() -> List[dict]:
         """Retourne Les utilisateurs sous forme de liste de dictionnaires.
@@ -169,4 +437,106 @@ class UserRepo:  # Répertoire d'accès aux utilisateurs (utilise la BASE DE DON
                 "created_at": user.created_at
             }
             for user in users
-        ]
\ No newline at end of file
+        ]
+
+
+class SessionRepo:  # Répertoire des sessions "se souvenir de moi" (utilise la BASE DE DONNÉES)
+    @staticmethod
+    def _hash_token(token: str) -> str:
+        # Le jeton est aléatoire (256 bits) : un hash rapide suffit, pas besoin de bcrypt
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def create(user_id: int, ttl_days: int) -> str:  # Ouvre une session et renvoie le jeton en clair
+        token = secrets.token_urlsafe(32)
+        # BASE DE DONNÉES : seule l'empreinte du jeton est stockée
+        DB.write(lambda con: con.execute(
+            "INSERT INTO session (user_id, token_hash, expires_at) VALUES (?, ?, datetime('now', ?))",
+            (user_id, SessionRepo._hash_token(token), f"+{int(ttl_days)} days")
+        ))
+        return token
+
+    @staticmethod
+    def resume(token: str) -> Optional[User]:  # Retrouve l'utilisateur d'un jeton encore valide
+        with DB.connect(row_factory=None) as con:
+            # BASE DE DONNÉES : une seule requête sur l'index UNIQUE de token_hash
+            r = con.execute(
+                """
+                SELECT u.id, u.username, u.display_name, u.avatar_path, u.created_at
+                FROM session s JOIN users u ON u.id = s.user_id
+                WHERE s.token_hash = ? AND s.expires_at > datetime('now')
+                """,
+                (SessionRepo._hash_token(token),)
+            ).fetchone()
+        return User(*r) if r else None
+
+    @staticmethod
+    def revoke(token: str) -> None:  # Supprime la session (déconnexion) et purge les sessions expirées
+        DB.write(lambda con: con.execute(
+            "DELETE FROM session WHERE token_hash = ? OR expires_at <= datetime('now')",
+            (SessionRepo._hash_token(token),)
+        ))
+
+
+class AssetRepo:  # Répertoire d'accès au manifeste des images (table asset_manifest)
+    @staticmethod
+    def all() -> Dict[str, Asset]:  # Tout le manifeste, indexé par chemin
+        with DB.connect(row_factory=None) as con:
+            rows = con.execute(f"SELECT {ASSET_COLUMNS} FROM asset_manifest").fetchall()
+        return {r[0]: Asset(*r) for r in rows}
+
+    @staticmethod
+    def sync(rows: List[tuple], removed: List[str]) -> None:  # Met à jour le manifeste en une transaction
+        """Insère/remplace les entrées `rows` (dans l'ordre de ASSET_COLUMNS) et supprime `removed`."""
+        def apply(con):
+            con.executemany(
+                f"INSERT OR REPLACE INTO asset_manifest ({ASSET_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            con.executemany("DELETE FROM asset_manifest WHERE path = ?", [(p,) for p in removed])
+        DB.write(apply)
+
+
+class PaletteRepo:  # Répertoire des palettes de couleurs des vêtements (table garment_palette)
+    @staticmethod
+    def hashes() -> Dict[int, str]:  # garment_id -> empreinte du sprite analysé
+        with DB.connect(row_factory=None) as con:
+            return dict(con.execute("SELECT garment_id, content_hash FROM garment_palette").fetchall())
+
+    @staticmethod
+    def classes() -> Dict[int, int]:  # garment_id -> classe de palette (compilée dans les règles de score)
+        with DB.connect(row_factory=None) as con:
+            return dict(con.execute("SELECT garment_id, palette_class FROM garment_palette").fetchall())
+
+    @staticmethod
+    def sync(rows: List[tuple], removed: List[int]) -> None:  # Met à jour les palettes en une transaction
+        """Insère/remplace `rows` (garment_id, colors, palette_class, content_hash) et supprime `removed`."""
+        def apply(con):
+            con.executemany(
+                "INSERT OR REPLACE INTO garment_palette (garment_id, colors, palette_class, content_hash) "
+                "VALUES (?, ?, ?, ?)", rows
+            )
+            con.executemany("DELETE FROM garment_palette WHERE garment_id = ?", [(i,) for i in removed])
+        DB.write(apply)
+        GarmentRepo.catalog_version += 1
+
+
+class EnvelopeRepo:  # Répertoire des enveloppes d'énergie des musiques (table audio_envelope)
+    @staticmethod
+    def hashes() -> List[str]:  # Empreintes des fichiers déjà analysés
+        with DB.connect(row_factory=None) as con:
+            return [r[0] for r in con.execute("SELECT content_hash FROM audio_envelope").fetchall()]
+
+    @staticmethod
+    def by_hash(content_hash: str) -> Optional[AudioEnvelope]:  # Enveloppe d'un fichier, None s'il n'a pas été analysé
+        with DB.connect(row_factory=None) as con:
+            r = con.execute("SELECT content_hash, rate, rms, beat FROM audio_envelope WHERE content_hash = ?",
+                            (content_hash,)).fetchone()
+        return AudioEnvelope(*r) if r else None
+
+    @staticmethod
+    def sync(rows: List[tuple], removed: List[str]) -> None:  # Met à jour les enveloppes en une transaction
+        """Insère/remplace `rows` (content_hash, rate, rms, beat) et supprime les empreintes `removed`."""
+        def apply(con):
+            con.executemany("INSERT OR REPLACE INTO audio_envelope (content_hash, rate, rms, beat) VALUES (?, ?, ?, ?)", rows)
+            con.executemany("DELETE FROM audio_envelope WHERE content_hash = ?", [(h,) for h in removed])
+        DB.write(apply)
@@ -9,6 +9,9 @@ import pygame as pg  # Pygame importé sous le nom pg (bibliothèque de jeu)
 
 # === CLASSE DE BASE ===
 class Scene:  # Classe abstraite (modèle) pour toutes les scènes du jeu
+    # Types d'événements traités par la scène : Game ne lui transmet que ceux-là
+    EVENT_TYPES = frozenset({pg.KEYDOWN, pg.MOUSEBUTTONDOWN})
+
     def __init__(self, game):
         """Initialise une scène avec une référence au jeu."""
         self.game = game  # Stocke la référence vers l'objet jeu principal
@@ -18,11 +21,12 @@ class Scene:  # Classe abstraite (modèle) pour toutes les scènes du jeu
         pass  # Chaque scène concrète implémente sa propre logique
 
     def update(self, dt):
-        """Met à jour la logique de la scène chaque frame."""
-        # dt = delta time (temps écoulé depuis la dernière frame en secondes)
+        """Met à jour la logique de la scène (à pas fixe si FIXED_TIMESTEP : dt vaut alors toujours 1/SIM_HZ)."""
+        # dt = delta time (temps écoulé depuis la dernière mise à jour en secondes)
         pass  # Chaque scène concrète implémente sa propre logique
 
-    def draw(self, screen):
+    def draw(self, screen, alpha=1.0):
         """Dessine tutti les éléments visuels de la scène."""
         # screen = surface pygame où dessiner (l'écran du jeu)
+        # alpha = avancement (0 à 1) entre la dernière mise à jour et la suivante, pour interpoler les animations
         pass  # Chaque scène concrète implémente sa propre logique
\ No newline at end of file
@@ -1,15 +1,26 @@
 # === IMPORTS ===
 import os  # opérations système (vérification existence fichiers, parcours dossiers)
 import shutil  # utilitaires fichiers (suppression récursive de dossiers)
+from bisect import bisect_left, bisect_right, insort  # vignettes visibles (galerie triée par y), calques portés
+from collections import OrderedDict, defaultdict  # cache LRU des vignettes chargées, compteurs
 import pygame as pg  # bibliothèque de jeu pygame (alias pg pour concision)
-from typing import Dict  # annotations de type pour les dictionnaires
+from typing import Dict, List  # annotations de type
 from scenes.base_scene import Scene  # classe abstraite de base pour toutes les scènes
+from asset_manifest import MANIFEST  # existence et métadonnées des images, validées au démarrage
+from audio_manager import SFX  # effets sonores (décodés au démarrage)
 from repositories import CategoryRepo, GarmentRepo  # accès BDD pour catégories et vêtements
-from services import Outfit  # logique métier de gestion de tenue
+from services import Outfit, OutfitSolver  # logique métier de gestion de tenue + suggestion
+from scoring_rules import NO_THEME  # indice "aucun thème" des règles de score
+from catalog_index import CatalogIndex, price_bucket_labels  # recherche et filtres de la galerie
 from config import SIDEBAR_BG_PATH, STAGE_BG_PATH  # chemins des fonds d'écran
+from config import GARMENT_PAGE_SIZE  # taille des pages de résultats relues en base
 
 # === CONSTANTES ===
 SCROLL_SPEED = 40  # Pixels défilés par cran de molette (ajustable selon préférence)
+THUMB_CACHE_SIZE = 48  # Vignettes gardées en mémoire (les plus anciennes sont rechargées à la demande)
+SEARCH_MAX_LEN = 30  # Longueur max du texte de recherche
+SUGGEST_K = 5  # Nombre de tenues proposées par la touche S (S à nouveau = suivante)
+STAGE_CACHE_SIZE = 24  # Sprites à la taille du mannequin gardés en mémoire
 
 # === FONCTIONS UTILITAIRES ===
 def _load_background(path, size, fallback_color):
@@ -24,11 +35,10 @@ def _load_background(path, size, fallback_color):
     Returns:
         pygame.Surface: Image redimensionnée ou surface unie
     """
-    if os.path.exists(path):
-        img = pg.image.load(path)
-        # Convertir pour optimiser le rendu (convert_alpha si transparence, sinon convert)
-        img = img.convert() if img.get_alpha() is None else img.convert_alpha()
-        return pg.transform.smoothscale(img, size)  # redimensionnement de qualité
+    # Manifeste : existence connue sans appel disque, alpha connu sans sonder l'image
+    img = MANIFEST.load_image(path, size)
+    if img is not None:
+        return img
     # Si l'image n'existe pas, créer une surface unie
     surf = pg.Surface(size)
     surf.fill(fallback_color)
@@ -46,7 +56,8 @@ class Draggable:
         
         Args:
             garment (Garment): Dataclass contenant les infos du vêtement
-            image (pygame.Surface): Vignette pour affichage dans la galerie
+            image (pygame.Surface | None): Vignette pour affichage dans la galerie
+                (None = chargée plus tard, quand elle devient visible)
             pos (tuple): Position initiale (x, y) dans la galerie
         """
         self.garment = garment  # référence vers l'objet Garment (id, nom, catégorie, etc.)
@@ -73,6 +84,8 @@ class DressScene(Scene):
     Écran principal d'habillage : galerie de vêtements (gauche) + mannequin (droite).
     Gère le drag & drop, la scrollbar, la superposition des vêtements et la validation.
     """
+    EVENT_TYPES = frozenset({pg.KEYDOWN, pg.MOUSEBUTTONDOWN, pg.MOUSEBUTTONUP, pg.MOUSEMOTION, pg.MOUSEWHEEL})
+
     def __init__(self, game, mannequin, theme):
         """
         Initialise l'écran d'habillage avec la galerie, le mannequin et les fonds d'écran.
@@ -91,10 +104,36 @@ class DressScene(Scene):
         # --- Chargement des données (catégories et vêtements depuis BDD) ---
         self.categories = CategoryRepo.all()  # liste de toutes les catégories (Top, Bottom, etc.)
         self.outfit = Outfit(self.categories)  # objet métier gérant la tenue (quotas, score)
-        self.gallery_items = []  # liste mixte : labels de catégories + objets Draggable
+        self.gallery_items = []  # liste mixte : labels de catégories + objets Draggable (triée par y)
+        self.gallery_ys = []  # y de chaque entrée de gallery_items (pour trouver le visible par bisect)
+        self.pages = None  # itérateur des pages de vêtements restant à placer (None = galerie complète)
+        self.thumbs = OrderedDict()  # Draggable -> None, vignettes chargées (ordre = dernier affichage)
+        self.held = None  # Draggable actuellement tenu à la souris
+        self.stage_cache = {}  # sprite_path -> image à la taille du mannequin (ordre d'insertion)
+
+        # --- Recherche et filtres (index inversés construits une fois par lancement) ---
+        self.search_text = ""  # texte tapé dans la recherche
+        self.search_active = False  # True = le clavier écrit dans la recherche
+        self.filters = {"theme": None, "category": None, "bucket": None}  # un filtre actif max par groupe
+        self.matches = None  # ids des vêtements trouvés (None = aucun filtre, tout le catalogue)
+        self.chips = []  # puces de filtre : (rect, groupe, valeur, libellé)
+        self.chip_font = pg.font.SysFont(None, 20)
+        self.search_rect = pg.Rect(20, 12, 280, 30)
+        self.header_h = self.search_rect.bottom + 10  # hauteur de l'en-tête fixe (grandit avec les puces)
+        self.index = self.game.catalog_index
+        self.index_job = None if self.index else self.game.submit(CatalogIndex.build)
+
+        # --- Suggestions (touche S) : calculées en arrière-plan dès l'ouverture, puis parcourues ---
+        self.suggestions = None  # [(score, vêtements)] du meilleur au moins bon
+        self.suggest_job = self.game.submit(self._find_suggestions)  # S n'attend pas le solveur
+        self.stage_warmup = []  # sprites des suggestions à décoder d'avance à la taille du mannequin
+        self.suggestion_idx = -1
+        self.suggest_msg = ""
+        self.score_badge = (None, None)  # (score affiché, surface) : rendu refait seulement si le score change
         self.scroll_y = 0  # décalage vertical du scroll de la galerie (0 = haut)
         self.content_height = 0  # hauteur totale du contenu de la galerie (calculé dans _build_gallery)
         self.worn_items: Dict[int, Draggable] = {}  # vêtements portés, indexés par garment.id
+        self.worn_layers: List[Draggable] = []  # mêmes vêtements, rangés par calque à l'insertion (ordre de dessin)
 
         # --- État de la scrollbar interactive ---
         self.scrollbar_dragging = False  # True si l'utilisateur drag la scrollbar
@@ -126,16 +165,20 @@ class DressScene(Scene):
         self.gallery_padding = 20  # marge intérieure (pixels depuis le bord gauche/haut)
         self.gallery_gap = 0  # espace entre vignettes (0 = collées)
 
+        if self.index is not None:
+            self._build_chips()
+
         # --- Construction initiale de la galerie et ajustement du scroll ---
-        self._build_gallery()  # crée les objets Draggable et labels à partir de la BDD
+        self._build_gallery()  # démarre le remplissage page par page depuis la BDD
+        self._pump_gallery()  # première page tout de suite : la galerie n'est jamais vide à l'affichage
         self._clamp_scroll()  # limite le scroll dans les bornes valides
 
 
     def _safe_load(self, path, size=(120,120), fill=(200,200,210)):
         """Charge une image si elle existe, sinon retourne un placeholder simple."""
-        if os.path.exists(path):
-            img = pg.image.load(path).convert_alpha()
-            return pg.transform.smoothscale(img, size)  # redimensionne proprement
+        img = MANIFEST.load_image(path, size)  # None si le fichier est absent (sans appel disque)
+        if img is not None:
+            return img
         # Si le fichier est manquant, crée une surface remplie utilisée comme placeholder
         surf = pg.Surface(size, pg.SRCALPHA)
         surf.fill(fill)
@@ -144,43 +187,177 @@ class DressScene(Scene):
 
 
     def _build_gallery(self):
-        """Construit la galerie en respectant la taille des vignettes et le nombre de colonnes."""
+        """Réinitialise la galerie et lance la lecture du catalogue page par page.
+
+        Les vêtements arrivent triés par (catégorie, id) : _pump_gallery en place une page
+        par frame, sans lire toute la table ni charger toutes les vignettes d'avance.
+        """
         self.gallery_items.clear()
-        pad = self.gallery_padding
-        gap = self.gallery_gap
+        self.gallery_ys.clear()
+        self.thumbs.clear()
+        self.pages = self._gallery_pages()
+        self.cat_ids = {c.id for c in self.categories}
+        # Curseur de mise en page : prochaine catégorie à ouvrir, position de la prochaine vignette
+        # (la galerie commence sous l'en-tête de recherche)
+        self.next_cat = 0
+        self.cursor_x = self.gallery_padding
+        self.cursor_y = self.header_h + self.gallery_padding
+        self.cursor_col = 0
+        self.content_height = self.cursor_y
+
+    def _gallery_pages(self):
+        """Pages de vêtements à placer : tout le catalogue, ou seulement les résultats des filtres."""
+        if self.matches is None:
+            yield from GarmentRepo.iter_pages()
+            return
+        ids = self.index.ordered(self.matches)  # ordre de la galerie (catégorie puis id)
+        for start in range(0, len(ids), GARMENT_PAGE_SIZE):
+            yield GarmentRepo.by_ids(ids[start:start + GARMENT_PAGE_SIZE])
+
+    def _pump_gallery(self):
+        """Place la page suivante du catalogue dans la galerie (appelé à chaque frame)."""
+        if self.pages is None:
+            return
+        page = next(self.pages, None)
+        if page is None:
+            # Fin du catalogue : titres des catégories restantes (vides) et dernière ligne
+            # (avec un filtre actif, les catégories sans résultat ne sont pas affichées)
+            while self.matches is None and self.next_cat < len(self.categories):
+                self._open_next_category()
+            self._close_category()
+            self.content_height = self.cursor_y
+            self.pages = None
+            return
+
         tw, th = self.thumb_size
+        gap = self.gallery_gap
         cols = max(1, int(self.gallery_cols))
+        for g in page:
+            if g.category_id not in self.cat_ids:
+                continue  # catégorie créée après l'ouverture de la scène
+            if not MANIFEST.exists(g.sprite_path):
+                continue  # sprite absent du disque : vêtement écarté avant d'être proposé
+            # Ouvre les catégories jusqu'à celle du vêtement (les titres restent dans l'ordre)
+            while self.next_cat == 0 or self.categories[self.next_cat - 1].id != g.category_id:
+                if self.matches is not None and self.categories[self.next_cat].id != g.category_id:
+                    self.next_cat += 1  # filtre actif : catégorie sans résultat, pas de titre
+                    continue
+                self._open_next_category()
+            d = Draggable(g, None, (self.cursor_x, self.cursor_y))  # vignette chargée à l'affichage
+            self.gallery_items.append(d)
+            self.gallery_ys.append(self.cursor_y)
+
+            self.cursor_col += 1
+            if self.cursor_col >= cols:
+                self.cursor_col = 0
+                self.cursor_x = self.gallery_padding
+                self.cursor_y += th + gap
+            else:
+                self.cursor_x += tw + gap
+        # Hauteur connue jusqu'ici (la scrollbar grandit au fil des pages)
+        self.content_height = self.cursor_y + (th + gap if self.cursor_col else 0)
+
+    def _close_category(self):
+        """Termine la catégorie en cours (ligne partielle + séparation)."""
+        if self.next_cat == 0:
+            return  # aucune catégorie ouverte
+        if self.cursor_col != 0:
+            self.cursor_y += self.thumb_size[1] + self.gallery_gap  # compléter la dernière ligne partielle
+        self.cursor_y += self.gallery_gap * 2  # séparation entre catégories
+
+    def _open_next_category(self):
+        """Ferme la catégorie en cours et pose le titre de la suivante."""
+        self._close_category()
+        cat = self.categories[self.next_cat]
+        pad = self.gallery_padding
+        label = self.big.render(cat.name.upper(), True, (40,40,70))
+        self.gallery_items.append(("label", label, (pad, self.cursor_y)))
+        self.gallery_ys.append(self.cursor_y)
+        self.cursor_y += 36  # espace après le titre
+        self.cursor_x = pad
+        self.cursor_col = 0
+        self.next_cat += 1
+
+    # --- Recherche et filtres ---
+    def _build_chips(self):
+        """Dispose les puces de filtre (thèmes, catégories, prix) sous la recherche, avec retour à la ligne."""
+        groups = [("theme", t, t.capitalize()) for t in self.index.themes()]
+        groups += [("category", c.id, c.name.capitalize()) for c in self.categories]
+        groups += [("bucket", i, label) for i, label in enumerate(price_bucket_labels())]
+        self.chips.clear()
+        left, right = self.search_rect.left, self.search_rect.right
+        x, y = left, self.search_rect.bottom + 8
+        last_group = None
+        for group, value, label in groups:
+            w = self.chip_font.size(label)[0] + 16
+            if (last_group is not None and group != last_group) or x + w > right:
+                x, y = left, y + 26  # nouvelle ligne : groupe suivant ou plus de place
+            self.chips.append((pg.Rect(x, y, w, 22), group, value, label))
+            x += w + 6
+            last_group = group
+        self.header_h = y + 22 + 10
+
+    def _apply_filters(self):
+        """Recalcule les résultats via l'index puis ne remet en page que ceux-ci."""
+        if self.index is None:
+            return  # index pas encore prêt : appliqué à son arrivée
+        self.matches = self.index.search(
+            self.search_text, self.filters["theme"], self.filters["category"], self.filters["bucket"]
+        )
+        self.scroll_y = 0
+        self._build_gallery()
+        self._pump_gallery()  # première page tout de suite (pas de frame vide entre deux frappes)
+        self._clamp_scroll()
+
+    def _handle_header_click(self, pos) -> bool:
+        """Clic dans l'en-tête : active la recherche ou bascule une puce. Retourne True si traité."""
+        if pos[1] >= self.header_h or not self.sidebar.collidepoint(pos):
+            self.search_active = False  # clic ailleurs : le clavier revient au jeu
+            return False
+        self.search_active = self.search_rect.collidepoint(pos)
+        for rect, group, value, _ in self.chips:
+            if rect.collidepoint(pos):
+                # re-cliquer une puce active la désactive
+                self.filters[group] = None if self.filters[group] == value else value
+                self._apply_filters()
+                break
+        return True
 
-        y = pad
-        for cat in self.categories:
-            label = self.big.render(cat.name.upper(), True, (40,40,70))
-            self.gallery_items.append(("label", label, (pad, y)))
-            y += 36  # espace après le titre
-
-            x = pad
-            col = 0
-            garments = GarmentRepo.by_category(cat.id)
-            for g in garments:
-                # éviter doublons
-                # (les ids sont uniques par catégorie; si besoin, ajouter un set global)
-                img = self._safe_load(g.sprite_path, size=(tw, th))
-                d = Draggable(g, img, (x, y))
-                self.gallery_items.append(d)
-
-                col += 1
-                if col >= cols:
-                    col = 0
-                    x = pad
-                    y += th + gap
-                else:
-                    x += tw + gap
-
-            # séparation entre catégories
-            if col != 0:
-                y += th + gap  # compléter la dernière ligne partielle
-            y += gap * 2
-
-        self.content_height = y
+    def _handle_search_key(self, event):
+        """Saisie dans la recherche (même gestion du clavier que les champs du login)."""
+        if event.key in (pg.K_RETURN, pg.K_ESCAPE):
+            self.search_active = False
+            return
+        if event.key == pg.K_BACKSPACE:
+            self.search_text = self.search_text[:-1]
+        elif event.unicode and event.unicode.isprintable() and len(self.search_text) < SEARCH_MAX_LEN:
+            self.search_text += event.unicode
+        else:
+            return
+        self._apply_filters()
+
+    def _visible_range(self):
+        """Indices [début, fin) des entrées de la galerie visibles avec le scroll actuel."""
+        top = self.scroll_y - self.thumb_size[1]  # une vignette commencée au-dessus dépasse encore
+        bottom = self.scroll_y + self.sidebar.height
+        return bisect_left(self.gallery_ys, top), bisect_right(self.gallery_ys, bottom)
+
+    def _ensure_thumb(self, item):
+        """Charge la vignette d'un vêtement à la demande (cache LRU de THUMB_CACHE_SIZE)."""
+        if item.thumb is None:
+            item.thumb = self._safe_load(item.garment.sprite_path, size=self.thumb_size)
+            if item.stage_image is None:
+                item.image = item.thumb
+        self.thumbs[item] = None
+        self.thumbs.move_to_end(item)
+        while len(self.thumbs) > THUMB_CACHE_SIZE:
+            old, _ = self.thumbs.popitem(last=False)
+            if old is self.held:
+                self.thumbs[old] = None  # jamais l'objet tenu : on le remet en fin de file
+                continue
+            old.thumb = None
+            if old.stage_image is None:
+                old.image = None
 
     def _clamp_scroll(self):
         max_scroll = max(0, self.content_height - self.sidebar.height)
@@ -190,8 +367,12 @@ class DressScene(Scene):
             self.scroll_y = max_scroll
 
     def handle_event(self, event):
+        if event.type == pg.KEYDOWN and self.search_active:
+            self._handle_search_key(event)
+            return
+
         if event.type == pg.MOUSEWHEEL:
-            if self.sidebar.collidepoint(pg.mouse.get_pos()):
+            if self.sidebar.collidepoint(self.game.mouse_pos):
                 self.scroll_y -= event.y * SCROLL_SPEED
                 self._clamp_scroll()
             return
@@ -200,6 +381,8 @@ class DressScene(Scene):
             # Vérifier si clic sur scrollbar
             if self._try_start_scrollbar_drag(event.pos):
                 return
+            if self._handle_header_click(event.pos):
+                return
             self._start_drag(event)
 
         elif event.type == pg.MOUSEBUTTONUP and event.button == 1:
@@ -220,22 +403,30 @@ class DressScene(Scene):
         elif event.type == pg.KEYDOWN and event.key == pg.K_RETURN:
             self._validate_outfit()
 
+        elif event.type == pg.KEYDOWN and event.key == pg.K_s:
+            self._suggest()
+
     # Réassure la présence des handlers de drag (écrase toute ancienne définition si nécessaire)
     def _start_drag(self, event):
         """Commence le drag sur l’item le plus haut sous le curseur (galerie)."""
-        draggables = [i for i in self.gallery_items if isinstance(i, Draggable)]
+        start, end = self._visible_range()  # seules les vignettes visibles peuvent être cliquées
+        draggables = [i for i in self.gallery_items[start:end] if isinstance(i, Draggable)]
         for item in reversed(draggables):
             draw_pos = pg.Vector2(item.pos) if item.grab else pg.Vector2(item.base_pos.x, item.base_pos.y - self.scroll_y)
+            self._ensure_thumb(item)
             rect = item.image.get_rect(topleft=(int(draw_pos.x), int(draw_pos.y)))
             if rect.collidepoint(event.pos):
                 item.grab = True
                 item.pos = pg.Vector2(draw_pos)
                 item.offset = pg.Vector2(event.pos) - item.pos
+                self.held = item
+                SFX.play("pickup")
                 break
 
     def _stop_drag(self, event):
         """Termine le drag: pose sur la scène si dans le stage, sinon retour/cleanup."""
-        grabbed = [i for i in self.gallery_items if isinstance(i, Draggable) and i.grab]
+        grabbed = [self.held] if self.held is not None else []
+        self.held = None
         for item in grabbed:
             item.grab = False
             if self.stage.collidepoint(event.pos):
@@ -253,7 +444,8 @@ class DressScene(Scene):
                 self.outfit.remove(item.garment)
             except Exception:
                 pass
-            del self.worn_items[item.garment.id]
+            self._unwear(item)
+            SFX.play("remove")
         # Restaurer l'affichage galerie
         self._restore_to_gallery(item)
         # Replacer logiquement à sa position de base (pour cohérence lors d'un prochain drag)
@@ -271,15 +463,34 @@ class DressScene(Scene):
                 return it
         return None
 
+    def _wear(self, item):
+        """Marque l'item comme porté et l'insère à sa place parmi les calques (même calque : le dernier posé au-dessus)."""
+        self.worn_items[item.garment.id] = item
+        insort(self.worn_layers, item, key=lambda it: self.outfit.layer(it.garment))
+
+    def _unwear(self, item):
+        """Retire l'item des vêtements portés (l'ordre des autres calques ne bouge pas)."""
+        del self.worn_items[item.garment.id]
+        self.worn_layers.remove(item)
+
     def _apply_worn_visuals(self, item):
         """Affecte stage_image et positionne l'item sur le mannequin."""
         m_img = self.mannequin_img
         m_w, m_h = m_img.get_width(), m_img.get_height()
         mannequin_x = self.stage.left + (self.stage.width - m_w) // 2 + 8
         mannequin_y = 80
-        item.stage_image = self._safe_load(item.garment.sprite_path, size=(m_w, m_h))
+        item.stage_image = self._stage_image(item.garment.sprite_path, (m_w, m_h))
         item.pos = pg.Vector2(mannequin_x, mannequin_y)
 
+    def _stage_image(self, path, size):
+        """Sprite à la taille du mannequin, gardé en cache (re-porter un vêtement ne redécode pas l'image)."""
+        img = self.stage_cache.get(path)
+        if img is None:
+            img = self.stage_cache[path] = self._safe_load(path, size=size)
+            if len(self.stage_cache) > STAGE_CACHE_SIZE:
+                self.stage_cache.pop(next(iter(self.stage_cache)))  # le plus ancien
+        return img
+
     def _restore_to_gallery(self, item):
         """Réinitialise l'item pour la galerie (sortie du mannequin)."""
         item.stage_image = None
@@ -288,14 +499,17 @@ class DressScene(Scene):
     def _try_remove_worn_at(self, pos):
         """Retire l'item porté cliqué (clic droit) si collision."""
         # Parcourt du haut vers le bas pour cliquer l'item visible au-dessus
-        for it in sorted(self.worn_items.values(), key=lambda i: self._layer_for(i.garment), reverse=True):
+        for it in reversed(self.worn_layers):
             img = it.stage_image if getattr(it, 'stage_image', None) is not None else it.image
-            rect = img.get_rect(topleft=(int(it.pos.x), int(it.pos.y)))
+            # Zone visible du vêtement (manifeste) : un clic dans ses bords transparents passe au calque dessous
+            rect = MANIFEST.content_rect(it.garment.sprite_path, img.get_size()) or img.get_rect()
+            rect = rect.move(int(it.pos.x), int(it.pos.y))
             if rect.collidepoint(pos):
                 # enlever de l'outfit + remettre en galerie
                 self.outfit.remove(it.garment)
                 self._restore_to_gallery(it)
-                del self.worn_items[it.garment.id]
+                self._unwear(it)
+                SFX.play("remove")
                 break
 
     def _drop_on_stage(self, item):
@@ -307,7 +521,8 @@ class DressScene(Scene):
         if self.outfit.can_add(item.garment):
             self.outfit.add(item.garment)
             self._apply_worn_visuals(item)
-            self.worn_items[item.garment.id] = item
+            self._wear(item)
+            SFX.play("drop")
         else:
             # Essayer de remplacer l'article existant de la même catégorie
             existing = self._find_worn_in_category(cat_id)
@@ -316,20 +531,106 @@ class DressScene(Scene):
                 self.outfit.remove(existing.garment)
                 self._restore_to_gallery(existing)
                 if existing.garment.id in self.worn_items:
-                    del self.worn_items[existing.garment.id]
+                    self._unwear(existing)
                 # ajouter le nouveau
                 self.outfit.add(item.garment)
                 self._apply_worn_visuals(item)
-                self.worn_items[item.garment.id] = item
+                self._wear(item)
+                SFX.play("replace")
             else:
                 # Pas possible de remplacer -> retour sidebar
                 item.pos = pg.Vector2(20, item.pos.y)
 
+    # --- Suggestion de tenue ---
+    def _suggest(self):
+        """Habille le mannequin avec la meilleure tenue du thème (appuis suivants : tenues suivantes)."""
+        if self.suggestions is None:
+            self._take_suggestions()  # S pressé avant la fin du calcul en arrière-plan : on attend le résultat
+        if not self.suggestions:
+            self.suggest_msg = "Aucune suggestion"
+            return
+        self.suggestion_idx = (self.suggestion_idx + 1) % len(self.suggestions)
+        score, garments = self.suggestions[self.suggestion_idx]
+        self._wear_outfit(garments)
+        self.suggest_msg = f"Suggestion {self.suggestion_idx + 1}/{len(self.suggestions)} : {score} pts"
+
+    def _find_suggestions(self):
+        """Sur le thread de travail : les SUGGEST_K meilleures tenues du thème."""
+        return OutfitSolver.best(self.theme_code, self.categories, self._suggestion_candidates(), SUGGEST_K)
+
+    def _take_suggestions(self):
+        """Récupère le résultat du solveur et prépare le décodage de ses sprites (un par frame, dans update)."""
+        job, self.suggest_job = self.suggest_job, None
+        try:
+            self.suggestions = job.result()
+        except Exception as e:
+            print(f"Erreur lors du calcul des suggestions : {e}")
+            self.suggestions = []
+        # Sprites pleine taille de la première suggestion d'abord ; pas plus que la moitié du cache
+        paths = dict.fromkeys(g.sprite_path for _, garments in self.suggestions for g in garments)
+        self.stage_warmup = list(paths)[:STAGE_CACHE_SIZE // 2]
+
+    def _suggestion_candidates(self):
+        """Candidats du solveur pré-filtrés en SQL : seuls les moins chers de chaque sorte comptent.
+
+        Les vêtements sans sprite sont écartés (comme dans la galerie) ; si cela laisse une
+        sorte avec trop peu de candidats, on relit une liste plus longue.
+        """
+        keep = SUGGEST_K + max((c.max_items for c in self.categories), default=1)
+        category_ids = [c.id for c in self.categories]
+        per_class = keep
+        rules = self.outfit.rules
+        theme = rules.theme_of(self.theme_code)
+        # Palettes utiles seulement si le thème donne des points d'harmonie
+        by_palette = theme != NO_THEME and any(rules.palette_gains[theme])
+        while True:
+            rows = GarmentRepo.cheapest_per_theme_class(self.theme_code, per_class, category_ids, by_palette)
+            fetched, valid = defaultdict(int), defaultdict(int)  # (catégorie, du thème ?, palette) -> nombre
+            for g in rows:
+                cls = (g.category_id, rules.theme_of(g.score_theme) == theme,
+                       rules.palette_class.get(g.id) if by_palette else None)
+                fetched[cls] += 1
+                valid[cls] += MANIFEST.exists(g.sprite_path)
+            short = [cls for cls, n in fetched.items() if n == per_class and valid[cls] < keep]
+            if not short:
+                return [g for g in rows if MANIFEST.exists(g.sprite_path)]
+            per_class *= 2  # des sprites manquent : on relit plus loin dans ces sortes
+
+    def _wear_outfit(self, garments):
+        """Remplace la tenue portée par `garments`."""
+        for it in list(self.worn_layers):
+            self.outfit.remove(it.garment)
+            self._restore_to_gallery(it)
+            self._unwear(it)
+        in_gallery = {it.garment.id: it for it in self.gallery_items if isinstance(it, Draggable)}
+        for g in garments:
+            # Vêtement pas (encore) placé dans la galerie : objet créé pour l'occasion
+            item = in_gallery.get(g.id) or Draggable(g, None, (self.gallery_padding, 0))
+            self.outfit.add(g)
+            self._apply_worn_visuals(item)
+            self._wear(item)
+
     def update(self, dt):
-        # Met à jour la position des objets en cours de drag
-        mouse = pg.mouse.get_pos()
-        for item in [i for i in self.gallery_items if isinstance(i, Draggable) and i.grab]:
-            item.pos = pg.Vector2(mouse) - item.offset
+        # Index de recherche construit en arrière-plan : puces + filtres dès qu'il est prêt
+        if self.index_job is not None and self.index_job.done():
+            job, self.index_job = self.index_job, None
+            try:
+                self.index = self.game.catalog_index = job.result()
+            except Exception as e:
+                print(f"Erreur lors de l'indexation du catalogue : {e}")
+            else:
+                self._build_chips()
+                self._apply_filters()  # l'en-tête a grandi : la galerie est remise en page dessous
+        # Suggestions prêtes : leurs sprites sont décodés d'avance, un par frame (S ne décode plus rien)
+        if self.suggest_job is not None and self.suggest_job.done():
+            self._take_suggestions()
+        elif self.stage_warmup:
+            self._stage_image(self.stage_warmup.pop(0), self.mannequin_img.get_size())
+        # Remplit la galerie avec la page suivante du catalogue (une par frame)
+        self._pump_gallery()
+        # Met à jour la position de l'objet en cours de drag
+        if self.held is not None:
+            self.held.pos = pg.Vector2(self.game.mouse_pos) - self.held.offset
 
 
     def _draw_sidebar(self, screen):
@@ -337,19 +638,53 @@ class DressScene(Scene):
         screen.blit(self.sidebar_bg, self.sidebar.topleft)
 
     def _draw_gallery_items(self, screen):
-        """Draw gallery labels and draggable items in the sidebar."""
-        for it in self.gallery_items:
+        """Draw gallery labels and draggable items in the sidebar (visible part only)."""
+        start, end = self._visible_range()
+        for it in self.gallery_items[start:end]:
             if isinstance(it, tuple) and it[0] == "label":
                 surf, (x, y) = it[1], it[2]
                 draw_y = y - self.scroll_y
                 if self.sidebar.top <= draw_y <= self.sidebar.bottom:
                     screen.blit(surf, (x, draw_y))
-            elif isinstance(it, Draggable) and it.garment.id not in self.worn_items:
-                if it.grab:
-                    screen.blit(it.image, it.pos)
-                else:
-                    draw_pos = (it.base_pos.x, it.base_pos.y - self.scroll_y)
-                    screen.blit(it.image, draw_pos)
+            elif isinstance(it, Draggable) and it.garment.id not in self.worn_items and not it.grab:
+                self._ensure_thumb(it)
+                draw_pos = (it.base_pos.x, it.base_pos.y - self.scroll_y)
+                screen.blit(it.image, draw_pos)
+        if self.matches is not None and not self.matches:
+            empty = self.font.render("Aucun vêtement trouvé", True, (40,40,70))
+            screen.blit(empty, (self.gallery_padding, self.header_h + self.gallery_padding))
+
+    def _draw_header(self, screen):
+        """Draw the fixed search box and filter chips above the gallery."""
+        header = pg.Rect(0, 0, self.sidebar.width, self.header_h)
+        screen.blit(self.sidebar_bg, header.topleft, header)  # même fond que la galerie, par-dessus le défilement
+        veil = pg.Surface(header.size, pg.SRCALPHA)
+        veil.fill((255, 255, 255, 170))
+        screen.blit(veil, header.topleft)
+
+        border = (100, 150, 255) if self.search_active else (30, 30, 60)
+        pg.draw.rect(screen, (255, 255, 255), self.search_rect, border_radius=15)
+        pg.draw.rect(screen, border, self.search_rect, 2, border_radius=15)
+        if self.search_text:
+            text, color = self.search_text + ("|" if self.search_active else ""), (30, 30, 60)
+        else:
+            text = "Rechercher..." if self.index is not None else "Indexation du catalogue..."
+            color = (140, 140, 140)
+        surf = self.font.render(text, True, color)
+        screen.blit(surf, (self.search_rect.x + 12, self.search_rect.y + 8))
+
+        for rect, group, value, label in self.chips:
+            active = self.filters[group] == value
+            pg.draw.rect(screen, (10, 104, 255) if active else (255, 255, 255), rect, border_radius=11)
+            pg.draw.rect(screen, (10, 104, 255), rect, 1, border_radius=11)
+            surf = self.chip_font.render(label, True, (255, 255, 255) if active else (10, 104, 255))
+            screen.blit(surf, surf.get_rect(center=rect.center))
+
+    def _draw_held(self, screen):
+        """L'objet tenu est dessiné à la souris, même si sa place dans la galerie est hors écran."""
+        held = self.held
+        if held is not None and held.garment.id not in self.worn_items:
+            screen.blit(held.image, held.pos)
 
     def _draw_stage(self, screen):
         """Draw the stage background and mannequin."""
@@ -357,52 +692,11 @@ class DressScene(Scene):
         screen.blit(self.mannequin_img, (self.stage.left + 180, 80))
 
     def _draw_worn_items(self, screen):
-        """Draw items currently worn by the mannequin en respectant l'ordre des calques."""
-        items = sorted(self.worn_items.values(), key=lambda it: self._layer_for(it.garment))
-        for it in items:
+        """Draw items currently worn by the mannequin en respectant l'ordre des calques (déjà trié, aucun tri par frame)."""
+        for it in self.worn_layers:
             img = it.stage_image if getattr(it, 'stage_image', None) is not None else it.image
             screen.blit(img, it.pos)
 
-    # --- Helpers d'ordre de superposition ---
-    def _category_name(self, garment) -> str:
-        """Retourne le nom de catégorie en MAJ, via category_id sinon via attributs textuels."""
-        cid = getattr(garment, "category_id", None)
-        if cid is not None:
-            for c in self.categories:
-                if getattr(c, "id", None) == cid:
-                    return str(getattr(c, "name", "")).upper()
-        # fallback: lire des champs textuels usuels
-        for attr in ("category", "type", "name"):
-            val = getattr(garment, attr, None)
-            if isinstance(val, str):
-                return val.upper()
-        return ""
-
-    def _layer_for(self, garment) -> int:
-        """
-        Renvoie l'indice de calque (0=fond -> 5=avant) selon la catégorie:
-        shoes(0) < bottom(1) < top(2) < hair(3) < face(4) < accessories(5)
-        """
-        name = self._category_name(garment)
-
-        def has(*tokens):
-            return any(tok in name for tok in tokens)
-
-        if has("SHOE", "CHAUSSURE", "FEET"):
-            return 0  # shoes
-        if has("BOTTOM", "BAS", "PANTS", "PANTALON", "SKIRT", "JUPE", "SHORT", "JEAN"):
-            return 1  # bottom
-        if has("TOP", "HAUT", "SHIRT", "DRESS", "ROBE", "COAT", "MANTEAU", "JACKET", "VESTE", "SWEATER", "PULL"):
-            return 2  # top
-        if has("HAIR", "CHEVEU", "HEAD", "CHAPEAU", "HAT"):
-            return 3  # hair
-        if has("FACE", "VISAGE", "MASK", "MASQUE", "GLASSES", "LUNETTE"):
-            return 4  # face
-        if has("ACCESSORY", "ACCESSOIRE", "ACC"):
-            return 5  # accessories
-
-        return 2  # défaut: milieu (top)
-
     def _draw_scrollbar(self, screen):
         """Draw the scrollbar thumb in the sidebar."""
         if self.content_height > self.sidebar.height:
@@ -417,7 +711,7 @@ class DressScene(Scene):
 
     def _draw_hint(self, screen):
         """Draw the hint text at the bottom of the stage."""
-        hint = self.font.render("Molette = défiler | Entrée = valider", True, (30,30,60))
+        hint = self.font.render("Molette = défiler | Recherche/puces = filtrer | S = suggérer | Entrée = valider", True, (30,30,60))
         hint_rect = hint.get_rect(topleft=(self.stage.left + 20, self.game.h - 30))
         # Encadré blanc semi-transparent
         bg_rect = hint_rect.inflate(20, 10)
@@ -437,13 +731,40 @@ class DressScene(Scene):
         screen.blit(bg_surf, bg_rect.topleft)
         screen.blit(title, title_rect)
 
-    def draw(self, screen):
+        # Résultat de la dernière suggestion (touche S), sous le thème
+        if self.suggest_msg:
+            msg = self.font.render(self.suggest_msg, True, (20,20,50))
+            msg_rect = msg.get_rect(topright=(title_rect.right, title_rect.bottom + 12))
+            bg_rect = msg_rect.inflate(20, 10)
+            bg_surf = pg.Surface((bg_rect.width, bg_rect.height), pg.SRCALPHA)
+            bg_surf.fill((255, 255, 255, 200))
+            screen.blit(bg_surf, bg_rect.topleft)
+            screen.blit(msg, msg_rect)
+
+        self._draw_score_badge(screen)
+
+    def _draw_score_badge(self, screen):
+        """Score actuel de la tenue, en haut à gauche de la scène (compteurs de Outfit, O(1))."""
+        score = self.outfit.score(self.theme_code)
+        if self.score_badge[0] != score:
+            self.score_badge = (score, self.big.render(f"Score : {score} pts", True, (20,20,50)))
+        badge = self.score_badge[1]
+        badge_rect = badge.get_rect(topleft=(self.stage.left + 20, 20))
+        bg_rect = badge_rect.inflate(20, 10)
+        bg_surf = pg.Surface((bg_rect.width, bg_rect.height), pg.SRCALPHA)
+        bg_surf.fill((255, 255, 255, 200))
+        screen.blit(bg_surf, bg_rect.topleft)
+        screen.blit(badge, badge_rect)
+
+    def draw(self, screen, alpha=1.0):
         self._draw_sidebar(screen)
         self._draw_gallery_items(screen)
+        self._draw_header(screen)
         self._draw_stage(screen)
         self._draw_worn_items(screen)
         self._draw_scrollbar(screen)
         self._draw_hint(screen)
+        self._draw_held(screen)
     # Nouvelle méthode : supprime récursivement tous les dossiers __pycache__ sous le dossier du module
     def _clean_pycache(self):
         """
@@ -474,8 +795,10 @@ class DressScene(Scene):
         for garment_id, item in self.worn_items.items():
             print(f"  - {item.garment.name if hasattr(item.garment, 'name') else 'Inconnu'} (ID: {garment_id})")
 
-        # Extraire les garments depuis worn_items
-        worn_garments = [item.garment for item in self.worn_items.values()]
+        SFX.play("validate")
+
+        # Extraire les garments, déjà dans l'ordre des calques
+        worn_garments = [item.garment for item in self.worn_layers]
         
         # Déclenche la transition vers l'écran de résultat avec la liste des vêtements
         self.game.goto_result(self.mannequin, (self.theme_code, self.theme_label), self.outfit, worn_garments)
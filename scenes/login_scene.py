@@ -6,8 +6,16 @@
 # === IMPORTS ===
 import pygame as pg  # Pygame pour l'affichage et les événements
 from scenes.base_scene import Scene  # Classe de base pour les scènes
-from ui.widgets import Button  # Widget bouton réutilisable
-from repositories import UserRepo  # Repository pour authentifier les utilisateurs
+from ui.widgets import Button, Spinner  # Widgets bouton + indicateur d'attente
+from repositories import UserRepo, SessionRepo  # Repositories pour authentifier / mémoriser la session
+from config import SESSION_TTL_DAYS  # Durée de validité du jeton "se souvenir de moi"
+
+
+def _login_task(username, password, remember):
+    """Tâche exécutée sur le thread de travail : bcrypt + création éventuelle du jeton de session."""
+    user = UserRepo.authenticate(username, password)
+    token = SessionRepo.create(user.id, SESSION_TTL_DAYS) if (user and remember) else None
+    return user, token
 
 
 class LoginScene(Scene):
@@ -30,27 +38,23 @@ class LoginScene(Scene):
         self.username_rect = pg.Rect(340, 220, 340, 45) # Rectangle pour le champ username
         self.password_rect = pg.Rect(340, 290, 340, 45) # Rectangle pour le champ password
         self.active_field = "username"  # ou "password"
+        self.remember_rect = pg.Rect(700, 300, 24, 24)  # Case à cocher "Se souvenir de moi"
+        self.remember = False  # opt-in : pas de jeton de session par défaut
 
         self.username = ""
         self.password = ""
         self.message = ""
 
+        # Authentification en arrière-plan (bcrypt est lent : on ne bloque pas la fenêtre)
+        self.pending = None  # Future de la connexion en cours (None = aucune)
+        self.spinner = Spinner((320, 510))  # affiché à gauche du message pendant l'attente
+
         # Boutons (même style que ton MenuScene)
         self.buttons = []
 
         def do_login():
-            # Authentifier l'utilisateur
-            user = UserRepo.authenticate(self.username, self.password)
-            if user:
-                # Connexion réussie
-                self.game.current_user_id = user.id
-                self.game.current_username = user.display_name
-                self.game.current_avatar = user.avatar_path
-                self.message = "Connexion réussie!"
-                self.game.goto_menu()
-            else:
-                # Authentification échouée
-                self.message = "Identifiants incorrects."
+            # Authentifier l'utilisateur (sur le thread de travail)
+            self._submit_login()
 
         def do_register():
             # Rediriger vers la scène d'inscription séparée
@@ -63,6 +67,29 @@ class LoginScene(Scene):
         self.buttons.append(Button((520, 360, 160, 50), "Inscription", do_register))
         self.buttons.append(Button((340, 430, 340, 45), "Retour menu", go_back))
 
+    # --- Connexion asynchrone ---
+    def _submit_login(self):
+        """Envoie l'authentification au thread de travail (ignorée si une est déjà en cours)."""
+        if self.pending is not None:
+            return  # double clic / ENTRÉE répétée : on attend le premier résultat
+        self.message = "Connexion..."
+        self.pending = self.game.submit(_login_task, self.username, self.password, self.remember)
+
+    def _apply_login(self, user, token=None):
+        """Applique le résultat de l'authentification (appelé sur le thread principal)."""
+        if user:
+            # Connexion réussie
+            if token:
+                self.game.save_session_token(token)  # reconnexion directe au prochain lancement
+            self.game.current_user_id = user.id
+            self.game.current_username = user.display_name
+            self.game.current_avatar = user.avatar_path
+            self.message = "Connexion réussie!"
+            self.game.goto_menu()
+        else:
+            # Authentification échouée
+            self.message = "Identifiants incorrects."
+
     # --- Utils affichage ---
     def _draw_input(self, screen, rect, label, value, active=False, password=False):
         # fond
@@ -82,7 +109,7 @@ class LoginScene(Scene):
         text = self.font.render(shown, True, color)
         screen.blit(text, (rect.x + 12, rect.y + 10))
 
-    def draw(self, screen):
+    def draw(self, screen, alpha=1.0):
         # affiche le background si disponible sinon fond uni
         if self.bg:
             screen.blit(self.bg, (0, 0))
@@ -103,10 +130,22 @@ class LoginScene(Scene):
             active=(self.active_field == "password"), password=True
         )
 
+        # Case "Se souvenir de moi"
+        pg.draw.rect(screen, (255, 255, 255), self.remember_rect, border_radius=4)
+        pg.draw.rect(screen, (30, 30, 60), self.remember_rect, 2, border_radius=4)
+        if self.remember:
+            pg.draw.rect(screen, (10, 104, 255), self.remember_rect.inflate(-10, -10), border_radius=2)
+        label = self.font.render("Se souvenir", True, (255, 255, 255))
+        screen.blit(label, (self.remember_rect.right + 8, self.remember_rect.y + 2))
+
         # Boutons
         for b in self.buttons:
             b.draw(screen)
 
+        # Attente du résultat de la connexion
+        if self.pending is not None:
+            self.spinner.draw(screen)
+
         # Message
         if self.message:
             msg = self.font.render(self.message, True, (255, 220, 120))
@@ -117,7 +156,18 @@ class LoginScene(Scene):
         screen.blit(help_txt, (250, 610)) # Positionne l'aide rapide en bas de l'écran, aligné à gauche
 
     def update(self, dt):
-        pass
+        if self.pending is None:
+            return
+        self.spinner.update(dt)
+        # Le résultat est appliqué ici, sur le thread principal, dès que la tâche est finie
+        if self.pending.done():
+            future, self.pending = self.pending, None
+            try:
+                user, token = future.result()
+            except Exception as e:
+                print(f"Erreur lors de la connexion : {e}")
+                user, token = None, None
+            self._apply_login(user, token)
 
     def handle_event(self, event):
         # Clique : activer champ
@@ -126,6 +176,8 @@ class LoginScene(Scene):
                 self.active_field = "username"
             elif self.password_rect.collidepoint(event.pos):
                 self.active_field = "password"
+            elif self.remember_rect.collidepoint(event.pos):
+                self.remember = not self.remember
 
         # Clavier : écrire
         if event.type == pg.KEYDOWN:
@@ -135,15 +187,7 @@ class LoginScene(Scene):
 
             if event.key == pg.K_RETURN:
                 # Enter => tentative de connexion
-                user = UserRepo.authenticate(self.username, self.password)
-                if user:
-                    self.game.current_user_id = user.id
-                    self.game.current_username = user.display_name
-                    self.game.current_avatar = user.avatar_path
-                    self.message = "Connexion réussie!"
-                    self.game.goto_menu()
-                else:
-                    self.message = "Identifiants incorrects."
+                self._submit_login()
                 return
 
             if event.key == pg.K_BACKSPACE: # Supprimer le dernier caractère du champ actif
@@ -163,6 +207,7 @@ class LoginScene(Scene):
                     if len(self.password) < 32:
                         self.password += ch
 
-        # Transmettre aux boutons
-        for b in self.buttons:
-            b.handle(event)
+        # Transmettre aux boutons (clics seulement)
+        if event.type in Button.EVENT_TYPES:
+            for b in self.buttons:
+                b.handle(event)
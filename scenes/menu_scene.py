@@ -4,19 +4,18 @@
 # ========================================
 
 # === IMPORTS ===
-import random  # Pour choisir thème et mannequin aléatoires
-import os  # Pour vérifier l'existence des fichiers
 import pygame as pg  # Pygame pour l'affichage et les événements
 from scenes.base_scene import Scene  # Classe de base pour les scènes
+from asset_manifest import MANIFEST  # existence et métadonnées des images, validées au démarrage
 from ui.widgets import Button  # Widget bouton réutilisable
-from repositories import MannequinRepo  # Récupère les mannequins de la BD
+from repositories import MannequinRepo, ThemeRepo  # Récupère les mannequins et les thèmes de la BD
 from models import Mannequin  # Modèle de données mannequin
 from config import MENU_BG_PATH  # Chemin du fond d'écran
 from ui.music_disc import MusicDiscWidget  # Widget disque musical tournant
 from config import DISC_IMG_PATH, DISC_BTN_PATH, TITLE_IMG_PATH  # Images du disque et titre
 
-# === THÈMES DISPONIBLES ===
-# Liste des (code_interne, libellé_affiché) pour le jeu
+# === THÈMES PAR DÉFAUT ===
+# Liste des (code_interne, libellé_affiché) si la table theme est vide
 THEMES = [
     ("casual", "Casual"),      # Style décontracté
     ("soiree", "Soirée"),      # Tenue élégante
@@ -37,11 +36,10 @@ def _load_background(path, size, fallback_color=(240, 240, 245)):
     Returns:
         pygame.Surface: Image redimensionnée ou surface unie
     """
-    if os.path.exists(path):
-        img = pg.image.load(path)
-        # Convertir pour optimiser le rendu (avec ou sans alpha selon l'image)
-        img = img.convert() if img.get_alpha() is None else img.convert_alpha()
-        return pg.transform.smoothscale(img, size)  # redimensionnement de qualité
+    # Manifeste : existence connue sans appel disque, alpha connu sans sonder l'image
+    img = MANIFEST.load_image(path, size)
+    if img is not None:
+        return img
     # Si l'image n'existe pas, créer une surface unie
     surf = pg.Surface(size)
     surf.fill(fallback_color)
@@ -66,12 +64,14 @@ class MenuScene(Scene):  # Écran d'accueil / menu principal
             Démarre une nouvelle partie avec un thème et un mannequin choisis aléatoirement.
             Appelé lors du clic sur le bouton "Nouvelle partie".
             """
-            theme = random.choice(THEMES)  # choisit un thème au hasard dans la liste
+            # Thèmes de la BDD (avec leurs règles de score), sinon la liste par défaut
+            themes = [(t.code, t.label) for t in ThemeRepo.all()] or THEMES
+            theme = self.game.rng.choice(themes)  # choisit un thème au hasard (graine enregistrée avec la partie)
             mannequins = MannequinRepo.all()  # récupère tous les mannequins de la BDD
             
             # Sécurité : si la BDD est vide, utiliser un mannequin par défaut
             default_mannequin = Mannequin(0, 'Lina', 'assets/mannequins/mannequin_base.png')
-            m = random.choice(mannequins) if mannequins else default_mannequin
+            m = self.game.rng.choice(mannequins) if mannequins else default_mannequin
             
             # Transition vers la scène d'habillage avec le mannequin et thème sélectionnés
             self.game.goto_dress(m, theme)
@@ -86,6 +86,9 @@ class MenuScene(Scene):  # Écran d'accueil / menu principal
 
         self.buttons.append(Button((412, 390, 200, 50), "Quitter", quit_game))
 
+        # --- Bouton "Déconnexion" (oublie aussi la session mémorisée) ---
+        self.buttons.append(Button((412, 460, 200, 50), "Déconnexion", self.game.logout))
+
         # --- Bouton toggle plein écran (coin supérieur droit) ---
         self.fullscreen_btn = pg.Rect(self.game.w - 120, 10, 110, 40)  # rectangle cliquable
         self.font_small = pg.font.SysFont(None, 30)  # petite police pour le texte du bouton
@@ -164,15 +167,16 @@ class MenuScene(Scene):  # Écran d'accueil / menu principal
 
         
 
-    def draw(self, screen):
+    def draw(self, screen, alpha=1.0):
         """
         Dessine tous les éléments visuels de l'écran menu.
         
         Args:
             screen surface principale du jeu
+            alpha (float): avancement entre deux mises à jour (interpolation de la rotation du disque)
         """
         # --- Fond d'écran effet paralaxe ---
-        mx, my = pg.mouse.get_pos()
+        mx, my = self.game.mouse_pos  # position suivie par Game (mouvements fusionnés)
 
         # centre de la fenêtre (0..w, 0..h) -> (-1..1)
         nx = (mx / self.game.w) * 2 - 1
@@ -189,7 +193,7 @@ class MenuScene(Scene):  # Écran d'accueil / menu principal
 
         screen.blit(self.bg_scaled, (x, y))
         
-        self.music_disc.draw(screen)
+        self.music_disc.draw(screen, alpha)
 
         
                 # --- Affichage avatar + pseudo en haut à gauche ---
@@ -227,7 +231,7 @@ class MenuScene(Scene):  # Écran d'accueil / menu principal
 
         # --- Bouton plein écran ---
         # Couleur change au survol (hover effect)
-        color = (100, 150, 255) if self.fullscreen_btn.collidepoint(pg.mouse.get_pos()) else (249,216,251) 
+        color = (100, 150, 255) if self.fullscreen_btn.collidepoint(self.game.mouse_pos) else (249,216,251) 
         pg.draw.rect(screen, color, self.fullscreen_btn, border_radius=5)  # fond du bouton
         pg.draw.rect(screen, (255, 255, 255), self.fullscreen_btn, 2, border_radius=5)  # bordure blanche
 
@@ -255,8 +259,9 @@ class MenuScene(Scene):  # Écran d'accueil / menu principal
                 return  # empêche le traitement des autres boutons
         
         # --- Transmet l'événement aux autres boutons du menu ---
-        for b in self.buttons:  # parcourt tous les boutons (ex: "Nouvelle partie")
-            b.handle(event)  # chaque bouton gère ses propres clics
+        if event.type in Button.EVENT_TYPES:  # seuls les clics intéressent les boutons
+            for b in self.buttons:  # parcourt tous les boutons (ex: "Nouvelle partie")
+                b.handle(event)  # chaque bouton gère ses propres clics
             
     def update(self, dt):
         self.music_disc.update(dt)
@@ -7,7 +7,7 @@
 import os  # Pour parcourir les dossiers d'avatars
 import pygame as pg  # Pygame pour l'affichage et les événements
 from scenes.base_scene import Scene  # Classe de base pour les scènes
-from ui.widgets import Button  # Widget bouton réutilisable
+from ui.widgets import Button, Spinner  # Widgets bouton + indicateur d'attente
 from repositories import UserRepo  # Repository pour créer et authentifier les utilisateurs
 
 # === CONFIGURATION ===
@@ -41,6 +41,10 @@ class RegisterScene(Scene):
         self.password = "" # Mot de passe (min 6 caractères) - ne sera pas affiché en clair dans le champ, mais stocké hashé dans la DB
         self.message = "" # Message d'erreur ou de succès à afficher à l'utilisateur après une tentative d'inscription
 
+        # Création du compte en arrière-plan (hash bcrypt lent)
+        self.pending = None  # Future de l'inscription en cours (None = aucune)
+        self.spinner = Spinner((320, 610))  # affiché à gauche du message pendant l'attente
+
         # Avatars
         self.avatars = self._load_avatars() 
         self.avatar_index = 0 
@@ -57,6 +61,9 @@ class RegisterScene(Scene):
                 self.avatar_index = (self.avatar_index + 1) % len(self.avatars)
 
         def do_register():
+            if self.pending is not None:
+                return  # une inscription est déjà en cours : on ignore le double clic
+
             # Prépare les valeurs
             username_val = self.username.strip() 
             display_name_val = self.display_name.strip()
@@ -78,21 +85,9 @@ class RegisterScene(Scene):
             if self.avatars:
                 avatar_path = self.avatars[self.avatar_index]
 
-            # Créer l'utilisateur
-            new_user = UserRepo.create(username_val, display_name_val, password_val, avatar_path)
-            
-            if new_user:
-                # Inscription réussie - Connexion automatique
-                self.game.current_user_id = new_user.id
-                self.game.current_username = new_user.display_name
-                self.game.current_avatar = new_user.avatar_path
-                self.message = "Compte créé et connecté!"
-                # Exporte le nouvel utilisateur en JSON
-                UserRepo.export_to_json()
-                self.game.goto_menu()
-            else:
-                # Inscription échouée (prob. username déjà utilisé)
-                self.message = "Erreur: cet identifiant existe déjà ou une erreur est survenue."
+            # Créer l'utilisateur (sur le thread de travail, résultat appliqué dans update)
+            self.message = "Création du compte..."
+            self.pending = self.game.submit(UserRepo.create, username_val, display_name_val, password_val, avatar_path)
 
         def back():
             self.game.goto_login()
@@ -102,6 +97,21 @@ class RegisterScene(Scene):
         self.buttons.append(Button((340, 480, 340, 50), "Créer le compte", do_register))
         self.buttons.append(Button((340, 540, 340, 45), "Retour", back))
 
+    def _apply_register(self, new_user):
+        """Applique le résultat de l'inscription (appelé sur le thread principal)."""
+        if new_user:
+            # Inscription réussie - Connexion automatique
+            self.game.current_user_id = new_user.id
+            self.game.current_username = new_user.display_name
+            self.game.current_avatar = new_user.avatar_path
+            self.message = "Compte créé et connecté!"
+            # Exporte le nouvel utilisateur en JSON (en arrière-plan lui aussi)
+            self.game.export_users()
+            self.game.goto_menu()
+        else:
+            # Inscription échouée (prob. username déjà utilisé)
+            self.message = "Erreur: cet identifiant existe déjà ou une erreur est survenue."
+
     def _load_avatars(self):
         if not os.path.isdir(AVATAR_DIR): # Si le dossier n'existe pas, retourne une liste vide
             return [] #le retour en liste vide 
@@ -128,7 +138,7 @@ class RegisterScene(Scene):
         text = self.font.render(shown, True, color)
         screen.blit(text, (rect.x + 12, rect.y + 10))
 
-    def draw(self, screen):
+    def draw(self, screen, alpha=1.0):
         # affiche le background si disponible sinon fond uni
         if self.bg:
             screen.blit(self.bg, (0, 0))
@@ -153,12 +163,26 @@ class RegisterScene(Scene):
         for b in self.buttons:
             b.draw(screen)
 
+        if self.pending is not None:
+            self.spinner.draw(screen) # Indicateur d'attente pendant la création du compte
+
         if self.message:
             msg = self.font.render(self.message, True, (255, 220, 120)) # Affiche le message d'erreur ou de succès en bas de l'écran
             screen.blit(msg, (340, 600)) # Positionne le message sous les boutons
 
     def update(self, dt):
-        pass
+        if self.pending is None:
+            return
+        self.spinner.update(dt)
+        # Dès que la tâche est finie, on applique le résultat sur le thread principal
+        if self.pending.done():
+            future, self.pending = self.pending, None
+            try:
+                new_user = future.result()
+            except Exception as e:
+                print(f"Erreur lors de l'inscription : {e}")
+                new_user = None
+            self._apply_register(new_user)
 
     def handle_event(self, event):
         if event.type == pg.MOUSEBUTTONDOWN and event.button == 1: # Clic gauche dans un champ de texte pour le sélectionner 
@@ -196,5 +220,6 @@ class RegisterScene(Scene):
                     if len(self.password) < 32:
                         self.password += ch
 
-        for b in self.buttons:
-            b.handle(event)
+        if event.type in Button.EVENT_TYPES:  # les boutons ne traitent que les clics
+            for b in self.buttons:
+                b.handle(event)
@@ -4,10 +4,9 @@
 # ========================================
 
 # === IMPORTS ===
-import os  # Pour vérifier l'existence des fichiers
 import pygame as pg  # Pygame pour l'affichage
 from scenes.base_scene import Scene  # Classe de base pour les scènes
-from services import Scoring  # Service de calcul de score
+from asset_manifest import MANIFEST  # existence et métadonnées des images, validées au démarrage
 from config import RESULT_BG_PATH  # Chemin du fond d'écran résultat
 
 
@@ -23,11 +22,10 @@ def _load_background(path, size, fallback_color=(240, 240, 250)):
     Returns:
         pygame.Surface: Image redimensionnée ou surface unie
     """
-    if os.path.exists(path):
-        img = pg.image.load(path)
-        # Convertir pour optimiser le rendu (avec ou sans alpha selon l'image)
-        img = img.convert() if img.get_alpha() is None else img.convert_alpha()
-        return pg.transform.smoothscale(img, size)  # redimensionnement de qualité
+    # Manifeste : existence connue sans appel disque, alpha connu sans sonder l'image
+    img = MANIFEST.load_image(path, size)
+    if img is not None:
+        return img
     # Si l'image n'existe pas, créer une surface unie
     surf = pg.Surface(size)
     surf.fill(fallback_color)
@@ -35,6 +33,8 @@ def _load_background(path, size, fallback_color=(240, 240, 250)):
 
 
 class ResultScene(Scene):  # Écran affichant le résultat après validation de la tenue
+    EVENT_TYPES = frozenset({pg.KEYDOWN})  # touches R / N seulement
+
     def __init__(self, game, mannequin, theme, outfit, worn_garments):
         """
         Initialise l'écran de résultat avec le score, l'aperçu final et le fond d'écran.
@@ -65,16 +65,16 @@ class ResultScene(Scene):  # Écran affichant le résultat après validation de
         self.mannequin_img = self._safe_load(mannequin.base_sprite_path, size=(360, 520))
 
         # --- Tri et redimensionnement des vêtements portés ---
-        # Les vêtements sont triés par calque (shoes -> accessories) pour un affichage correct
+        # Triés une fois par calque (z_order des catégories, comme DressScene) : shoes -> accessories
         self.worn_garments = []
-        for garment in sorted(worn_garments, key=lambda g: self._layer_for(g)):
+        for garment in sorted(worn_garments, key=self.outfit.layer):
             # Redimensionner chaque vêtement à la taille du mannequin (360x520)
             img = self._safe_load(garment.sprite_path, size=(360, 520))
             self.worn_garments.append(img)
 
         # --- Calcul du score et de l'argent gagné ---
-        # Utilise le service Scoring pour évaluer la tenue selon le thème
-        self.score = Scoring.score(self.theme_code, self.outfit.all_items())
+        # Compteurs de la tenue (tenus à jour pendant l'habillage) : même résultat que Scoring.score
+        self.score = self.outfit.score(self.theme_code)
         # Conversion simple du score en argent (score / 10 * 5)
         self.money = int(self.score / 10) * 5
 
@@ -89,45 +89,15 @@ class ResultScene(Scene):  # Écran affichant le résultat après validation de
         Returns:
             pygame.Surface: Image redimensionnée ou placeholder gris avec bordure
         """
-        if os.path.exists(path):
-            img = pg.image.load(path).convert_alpha()  # charge avec canal alpha
-            return pg.transform.smoothscale(img, size)  # redimensionne proprement
+        img = MANIFEST.load_image(path, size)  # None si le fichier est absent (sans appel disque)
+        if img is not None:
+            return img
         # Si le fichier est manquant, crée un placeholder gris avec bordure
         surf = pg.Surface(size, pg.SRCALPHA)
         surf.fill((230, 220, 220))  # fond gris clair
         pg.draw.rect(surf, (120, 120, 140), surf.get_rect(), 2)  # bordure gris foncé
         return surf
 
-    def _layer_for(self, garment) -> int:
-        """
-        Détermine l'ordre de superposition d'un vêtement selon sa catégorie.
-        Réutilise la même logique que DressScene pour cohérence visuelle.
-        
-        Args:
-            garment (Garment): Vêtement à évaluer
-        
-        Returns:
-            int: Indice de calque (0=fond -> 5=avant)
-                0: chaussures, 1: bas, 2: haut, 3: cheveux, 4: visage, 5: accessoires
-        """
-        # Récupère le nom du vêtement et le convertit en majuscules pour comparaison
-        name = getattr(garment, 'name', '').upper()
-        
-        # Détecte la catégorie par mots-clés dans le nom
-        if any(tok in name for tok in ["SHOE", "CHAUSSURE"]):
-            return 0  # chaussures (fond)
-        if any(tok in name for tok in ["BOTTOM", "BAS", "PANTS", "PANTALON", "SKIRT", "JUPE"]):
-            return 1  # bas (pantalon, jupe)
-        if any(tok in name for tok in ["TOP", "HAUT", "SHIRT", "DRESS", "ROBE"]):
-            return 2  # haut (t-shirt, robe)
-        if any(tok in name for tok in ["HAIR", "CHEVEU", "HEAD"]):
-            return 3  # cheveux
-        if any(tok in name for tok in ["FACE", "VISAGE"]):
-            return 4  # visage (masques, lunettes)
-        if any(tok in name for tok in ["ACCESSORY", "ACCESSOIRE"]):
-            return 5  # accessoires (avant-plan)
-        return 2  # défaut: considéré comme un haut
-
     def handle_event(self, event):
         """
         Traite les événements utilisateur (touches clavier uniquement sur cet écran).
@@ -150,7 +120,7 @@ class ResultScene(Scene):  # Écran affichant le résultat après validation de
         """
         pass  # écran statique, pas de logique à mettre à jour
 
-    def draw(self, screen):
+    def draw(self, screen, alpha=1.0):
         """
         Dessine tous les éléments visuels de l'écran résultat.
         
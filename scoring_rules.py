@@ -0,0 +1,142 @@
+# ========================================
+# RÈGLES DE SCORE (DONNÉES -> TABLES DE CORRESPONDANCE)
+# Les règles sont en base (theme.bonus, scoring_rule, theme_category_bonus, outfit_size_points,
+# theme_palette_bonus + les palettes extraites par py -m tools.extract_palettes)
+# et compilées une fois au chargement en listes indexées par entiers :
+# noter un vêtement = deux lectures de liste, sans comparaison de chaînes
+# ========================================
+
+# === IMPORTS ===
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from db import normalize_code  # Codes de thème normalisés ("Chic" -> "chic")
+from models import Category, Garment, Theme
+from repositories import CategoryRepo, GarmentRepo, PaletteRepo, ThemeRepo  # Lecture des règles en base
+
+NO_THEME = -1  # Indice "aucun thème" (vêtement sans thème, ou thème inconnu des règles)
+# Classes de palette (garment_palette.palette_class), dans l'ordre de leur numéro
+PALETTE_CLASSES = ("neutre", "doux", "vif", "multicolore")
+
+
+class ScoringRules:
+    """Règles de score compilées.
+
+    Chaque thème reçoit un indice t (ordre de theme.id), chaque catégorie un indice c (ordre de category.id).
+    - gains[t][c] : points d'un vêtement du thème t porté dans la catégorie c (theme.bonus + bonus de catégorie)
+    - palette_gains[t][p] : harmonie, points de tout vêtement dont la palette est de classe p
+    - size_points[n] : points selon le nombre n de vêtements portés (négatif = pénalité)
+    Score d'une tenue = max(0, base + somme des points des vêtements + size_points[n]).
+    """
+
+    def __init__(self, base: int, themes: Sequence[Theme], categories: Sequence[Category],
+                 category_bonus: Iterable[Tuple[int, int, int]] = (), size_points: Optional[Dict[int, int]] = None,
+                 palette_bonus: Iterable[Tuple[int, int, int]] = (), palette_classes: Optional[Dict[int, int]] = None):
+        self.base = base
+        self.theme_codes: List[str] = []  # indice -> code normalisé
+        self.theme_index: Dict[str, int] = {}  # code normalisé -> indice
+        for t in themes:
+            code = normalize_code(t.code)
+            self.theme_index.setdefault(code, len(self.theme_codes))
+            self.theme_codes.append(code)
+        self.category_index = {c.id: i for i, c in enumerate(categories)}  # category_id -> indice
+
+        # Points d'un vêtement du thème, par catégorie (bonus de catégorie ajoutés au bonus du thème)
+        self.theme_bonus = [t.bonus for t in themes]  # catégorie inconnue des règles : bonus du thème seul
+        self.gains = [[t.bonus] * len(categories) for t in themes]
+        theme_pos = {t.id: i for i, t in enumerate(themes)}
+        for theme_id, category_id, bonus in category_bonus:
+            if theme_id in theme_pos and category_id in self.category_index:
+                self.gains[theme_pos[theme_id]][self.category_index[category_id]] += bonus
+
+        # Harmonie des couleurs : palettes précalculées, aucun pixel n'est lu pendant la partie
+        self.palette_class = palette_classes or {}  # garment_id -> classe de palette
+        self.palette_gains = [[0] * len(PALETTE_CLASSES) for _ in themes]
+        for theme_id, palette_class, bonus in palette_bonus:
+            if theme_id in theme_pos and 0 <= palette_class < len(PALETTE_CLASSES):
+                self.palette_gains[theme_pos[theme_id]][palette_class] += bonus
+
+        # Courbe de taille, jusqu'à la plus grande tenue possible (somme des max_items)
+        self.size_points, self.size_slope = self._size_curve(size_points or {}, sum(c.max_items for c in categories))
+        self._theme_of_raw: Dict[Optional[str], int] = {}  # score_theme tel qu'en base -> indice (cache)
+        self.catalog_version = None  # GarmentRepo.catalog_version au moment de load()
+
+    @staticmethod
+    def _size_curve(points: Dict[int, int], capacity: int) -> Tuple[List[int], int]:
+        """Points pour 0..capacity vêtements, et la pente utilisée au-delà.
+
+        Un nombre absent de la table reprend les points du nombre précédent ; après le
+        dernier nombre listé, la courbe continue avec la pente de ses deux derniers points.
+        """
+        if not points:
+            return [0] * (capacity + 1), 0
+        known = sorted(points)
+        last = known[-1]
+        slope = (points[last] - points[known[-2]]) // (last - known[-2]) if len(known) > 1 else 0
+        curve, current = [], points[known[0]]
+        for n in range(max(capacity, last) + 1):
+            current = points.get(n, current) if n <= last else points[last] + slope * (n - last)
+            curve.append(current)
+        return curve, slope
+
+    @classmethod
+    def load(cls) -> "ScoringRules":
+        """Lit les règles en base et les compile."""
+        catalog_version = GarmentRepo.catalog_version  # lu avant les tables (une écriture pendant la lecture => recompilation)
+        values, category_bonus, size_points, palette_bonus = ThemeRepo.scoring_rules()
+        rules = cls(values.get("base", 0), ThemeRepo.all(), CategoryRepo.all(), category_bonus, size_points,
+                    palette_bonus, PaletteRepo.classes())
+        rules.catalog_version = catalog_version
+        return rules
+
+    def theme_of(self, code: Optional[str]) -> int:
+        """Indice d'un code de thème (brut ou normalisé), NO_THEME s'il n'est pas dans les règles."""
+        t = self._theme_of_raw.get(code)
+        if t is None:
+            t = self._theme_of_raw[code] = self.theme_index.get(normalize_code(code), NO_THEME)
+        return t
+
+    def gain(self, t: int, g: Garment) -> int:
+        """Points apportés par le vêtement `g` pour le thème d'indice `t` (thème + harmonie de sa palette)."""
+        if t == NO_THEME:
+            return 0
+        points = 0
+        if self.theme_of(g.score_theme) == t:
+            c = self.category_index.get(g.category_id)
+            points = self.theme_bonus[t] if c is None else self.gains[t][c]
+        p = self.palette_class.get(g.id)
+        if p is not None:
+            points += self.palette_gains[t][p]
+        return points
+
+    def size(self, count: int) -> int:
+        """Points pour une tenue de `count` vêtements."""
+        if count < len(self.size_points):
+            return self.size_points[count]
+        return self.size_points[-1] + self.size_slope * (count - len(self.size_points) + 1)
+
+    def total(self, points: int, count: int) -> int:
+        """Score final à partir des points de thème cumulés et du nombre de vêtements (jamais négatif)."""
+        return max(0, self.base + points + self.size(count))
+
+    def score(self, theme_code: str, garments: Sequence[Garment]) -> int:
+        """Score d'une liste de vêtements pour un thème."""
+        t = self.theme_of(theme_code)
+        return self.total(sum(self.gain(t, g) for g in garments), len(garments))
+
+
+# === RÈGLES PARTAGÉES (COMPILÉES À LA DEMANDE) ===
+_rules: Optional[ScoringRules] = None
+
+
+def get_rules() -> ScoringRules:
+    """Règles compilées utilisées par le jeu (lues en base au premier appel, relues si le catalogue a changé)."""
+    global _rules
+    if _rules is None or _rules.catalog_version != GarmentRepo.catalog_version:
+        _rules = ScoringRules.load()
+    return _rules
+
+
+def reload_rules() -> ScoringRules:
+    """Relit et recompile les règles (après une modification des tables de règles)."""
+    global _rules
+    _rules = ScoringRules.load()
+    return _rules
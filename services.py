@@ -1,12 +1,19 @@
 # ========================================
 # SERVICES - LOGIQUE MÉTIER DU JEU
-# Classes pour gérer les tenues et le scoring
+# Classes pour gérer les tenues, le scoring et la recherche de la meilleure tenue
 # ========================================
 
 # === IMPORTS ===
-from collections import defaultdict  # Dictionnaire qui crée automatiquement des valeurs par défaut
-from typing import Dict, List  # Annotations de type : Dict (dictionnaire), List (liste)
-from models import Garment, Category  # Importe les modèles de données
+import heapq  # Tas des k meilleures tenues trouvées par le solveur
+import struct  # Empreinte compacte des tenues (ids empaquetés sur 4 octets)
+import threading  # Cache des scores partagé avec le thread de travail
+from collections import OrderedDict, defaultdict  # Cache LRU des scores / dictionnaire avec valeurs par défaut
+from itertools import combinations  # Sous-ensembles de vêtements d'une catégorie (max_items > 1)
+from typing import Dict, List, Optional, Tuple  # Annotations de type : Dict (dictionnaire), List (liste)
+from config import SCORE_CACHE_SIZE  # Taille du cache des scores
+from db import normalize_code  # Codes de thème normalisés (empreinte des tenues)
+from models import DEFAULT_Z_ORDER, Garment, Category  # Importe les modèles de données
+from scoring_rules import NO_THEME, get_rules  # Règles de score compilées (lues en base)
 
 
 # === GESTION DES TENUES ===
@@ -15,8 +22,14 @@ class Outfit:  # Classe qui représente la tenue actuelle du mannequin
         """Initialise une tenue vide avec les catégories du jeu."""
         # Crée un dictionnaire {id_categorie -> nombre_max_articles}
         self.max_by_cat = {c.id: c.max_items for c in categories}
+        # {id_categorie -> calque d'affichage} : ordre de superposition sur le mannequin (seule source)
+        self.z_order = {c.id: c.z_order for c in categories}
         # Crée un dictionnaire {id_categorie -> liste_de_vêtements}
         self.items_by_cat: Dict[int, List[Garment]] = defaultdict(list)
+        # Compteurs tenus à jour par add/remove (score en O(1), sans reparcourir la tenue)
+        self.rules = get_rules()  # règles compilées (fixées pour toute la partie)
+        self.count = 0  # nombre total de vêtements portés
+        self.theme_points = [0] * len(self.rules.theme_codes)  # indice de thème -> points cumulés
 
     def can_add(self, g: Garment) -> bool:
         """Vérifie si on peut ajouter un vêtement à la tenue."""
@@ -33,6 +46,10 @@ class Outfit:  # Classe qui représente la tenue actuelle du mannequin
         if self.can_add(g):
             # Ajoute le vêtement à la liste de sa catégorie
             self.items_by_cat[g.category_id].append(g)
+            self.count += 1
+            # Un vêtement peut rapporter à plusieurs thèmes (harmonie de sa palette) : O(nb de thèmes)
+            for t in range(len(self.theme_points)):
+                self.theme_points[t] += self.rules.gain(t, g)
 
     def remove(self, g: Garment):
         """Retire un vêtement de la tenue s'il est présent."""
@@ -41,6 +58,9 @@ class Outfit:  # Classe qui représente la tenue actuelle du mannequin
         # Retire le vêtement s'il est dans la liste
         if g in category_items:
             category_items.remove(g)
+            self.count -= 1
+            for t in range(len(self.theme_points)):
+                self.theme_points[t] -= self.rules.gain(t, g)
 
     def all_items(self) -> List[Garment]:
         """Retourne la liste complète de tous les vêtements portés."""
@@ -52,16 +72,198 @@ class Outfit:  # Classe qui représente la tenue actuelle du mannequin
         # Retourne tous les vêtements mélangés
         return out
 
+    def layer(self, g: Garment) -> int:
+        """Calque d'affichage du vêtement (z_order de sa catégorie) : les plus petits sont dessinés d'abord."""
+        return self.z_order.get(g.category_id, DEFAULT_Z_ORDER)
+
+    def score(self, theme_code: str) -> int:
+        """Score de la tenue pour ce thème, depuis les compteurs (même résultat que Scoring.score)."""
+        t = self.rules.theme_of(theme_code)
+        return self.rules.total(self.theme_points[t] if t != NO_THEME else 0, self.count)
+
 
 # === CALCUL DU SCORE ===
+def outfit_fingerprint(theme_code: str, garments: List[Garment]) -> bytes:
+    """Empreinte canonique d'une tenue : même thème et mêmes vêtements (dans n'importe quel ordre) = même clé.
+
+    Code de thème normalisé, un octet nul, puis les ids triés sur 4 octets chacun
+    ("Chic", [12, 3] et "chic", [3, 12] donnent la même empreinte).
+    """
+    ids = sorted(g.id for g in garments)
+    return normalize_code(theme_code).encode() + b"\0" + struct.pack(f"<{len(ids)}I", *ids)
+
+
+class ScoreCache:
+    """Cache LRU borné des scores, indexé par outfit_fingerprint.
+
+    Vidé dès que les règles compilées changent : reload_rules(), ou catalogue modifié
+    (get_rules() recompile alors les règles, voir GarmentRepo.catalog_version).
+    """
+
+    def __init__(self, maxsize: int = SCORE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.entries: "OrderedDict[bytes, int]" = OrderedDict()  # empreinte -> score (ordre = dernier accès)
+        self.rules = None  # règles avec lesquelles les scores en cache ont été calculés
+        self.lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def score(self, theme_code: str, garments: List[Garment]) -> int:
+        """Score de la tenue, depuis le cache si cette tenue a déjà été notée avec les règles actuelles."""
+        rules = get_rules()
+        key = outfit_fingerprint(theme_code, garments)
+        with self.lock:
+            if rules is not self.rules:
+                if self.rules is not None:
+                    self.invalidations += 1
+                self.entries.clear()
+                self.rules = rules
+            score = self.entries.get(key)
+            if score is not None:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return score
+            self.misses += 1
+        score = rules.score(theme_code, garments)  # calcul hors du verrou
+        with self.lock:
+            if rules is self.rules:  # pas de règles plus récentes entre-temps
+                self.entries[key] = score
+                if len(self.entries) > self.maxsize:
+                    self.entries.popitem(last=False)
+                    self.evictions += 1
+        return score
+
+    def cache_info(self) -> dict:
+        """Compteurs du cache : {"hits", "misses", "hit_rate", "size", "maxsize", "evictions", "invalidations"}."""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0,
+                    "size": len(self.entries), "maxsize": self.maxsize,
+                    "evictions": self.evictions, "invalidations": self.invalidations}
+
+    def clear(self):
+        """Vide le cache et remet les compteurs à zéro."""
+        with self.lock:
+            self.entries.clear()
+            self.rules = None
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+
 class Scoring:  # Classe utilitaire qui calcule le score d'une tenue
+    # Les règles (base, points par thème et par catégorie, courbe de taille) sont en base :
+    # voir scoring_rules.py (par défaut : 50 + 15 par vêtement du thème - 5 par vêtement au-delà de 4)
+    cache = ScoreCache()  # scores déjà calculés, par empreinte de tenue
+
     @staticmethod  # Méthode statique (pas besoin d'instance de la classe)
     def score(theme_code: str, garments: List[Garment]) -> int:
-        """Calcule le score d'une tenue selon le thème."""
-        base = 50  # Score de base que tout le monde reçoit
-        # Compte les vêtements avec le bon thème : +15 points pour chaque
-        matching = sum(15 for g in garments if g.score_theme == theme_code)
-        # Pénalité si trop de vêtements : -5 points par vêtement au-delà de 4
-        penalty = max(0, (len(garments) - 4)) * 5
-        # Retourne le score final (jamais négatif)
-        return max(0, base + matching - penalty)
\ No newline at end of file
+        """Calcule le score d'une tenue selon le thème (mémorisé : une tenue identique n'est notée qu'une fois)."""
+        return Scoring.cache.score(theme_code, garments)
+
+    @staticmethod
+    def cache_info() -> dict:
+        """Compteurs du cache des scores (succès, échecs, taux de réussite, taille...)."""
+        return Scoring.cache.cache_info()
+
+
+# === RECHERCHE DE LA MEILLEURE TENUE ===
+class OutfitSolver:  # Trouve les tenues au meilleur score pour un thème (bouton "suggérer")
+    """Top-k des tenues par séparation et évaluation (branch-and-bound).
+
+    On choisit catégorie par catégorie (au plus max_items vêtements chacune, comme
+    Outfit.can_add). Une branche est abandonnée dès que sa borne supérieure (meilleure fin
+    de tenue possible pour chaque nombre de vêtements encore ajoutés, courbe de taille comprise,
+    au prix le plus bas) ne peut plus battre la k-ième tenue trouvée. À score égal, la tenue
+    la moins chère l'emporte, puis la plus courte.
+    """
+
+    @staticmethod
+    def best(theme_code: str, categories: List[Category], garments: List[Garment], k: int = 5,
+             budget: Optional[int] = None) -> List[Tuple[int, List[Garment]]]:
+        """Renvoie jusqu'à k tenues [(score, vêtements)], de la meilleure à la moins bonne.
+
+        Args:
+            budget: prix total maximum (None = pas de limite)
+        """
+        rules = get_rules()
+        t = rules.theme_of(theme_code)
+        max_by_cat = {c.id: c.max_items for c in categories}
+        by_cat: Dict[int, List[Garment]] = defaultdict(list)
+        for g in garments:
+            if g.category_id in max_by_cat:
+                by_cat[g.category_id].append(g)
+
+        # Options de chaque catégorie : (points_de_thème, nb_vêtements, prix, vêtements)
+        levels = []
+        for cat_id, items in by_cat.items():
+            limit = max_by_cat[cat_id]
+            # Sorte = vêtements qui rapportent les mêmes points dans cette catégorie. Seuls les
+            # (k + limit) moins chers de chaque sorte peuvent figurer dans le top-k :
+            # tout autre vêtement est battu par k tenues identiques mais moins chères
+            keep = k + limit
+            ranked = sorted(items, key=lambda g: (g.price or 0, g.id))
+            by_points: Dict[int, List[Garment]] = defaultdict(list)
+            for g in ranked:
+                by_points[rules.gain(t, g)].append(g)
+            pool = [g for same in by_points.values() for g in same[:keep]]
+            options = []
+            for n in range(0, limit + 1):
+                for combo in combinations(pool, n):
+                    points = sum(rules.gain(t, g) for g in combo)
+                    options.append((points, n, sum(g.price or 0 for g in combo), combo))
+            options.sort(key=lambda o: (-o[0], o[2], o[1]))  # meilleure option d'abord
+            levels.append(options)
+        levels.sort(key=lambda opts: -opts[0][0])  # catégories qui rapportent le plus d'abord
+
+        # Borne : rest[i][e] = (points de thème maximum des catégories i.. avec exactement e
+        # vêtements de plus, prix minimum pour ces points). Points et taille sont liés par e :
+        # la borne ne compte jamais à la fois tous les bonus et la meilleure taille
+        rest = [None] * (len(levels) + 1)
+        rest[len(levels)] = {0: (0, 0)}
+        for i in range(len(levels) - 1, -1, -1):
+            per_count = {}  # nb_vêtements -> (meilleurs points, prix le plus bas à ces points)
+            for m, n, p, _ in levels[i]:  # options triées : la première de chaque taille est la meilleure
+                per_count.setdefault(n, (m, p))
+            reach = {}
+            for n, (m, p) in per_count.items():
+                for e, (rm, rp) in rest[i + 1].items():
+                    old = reach.get(n + e)
+                    if old is None or (m + rm, -(p + rp)) > (old[0], -old[1]):
+                        reach[n + e] = (m + rm, p + rp)
+            rest[i] = reach
+        best_end = {}  # (i, nb_vêtements) -> meilleure fin (points de thème + taille, -prix, -nb final)
+
+        top = []  # tas min de ((score, -prix, -nb), ordre, vêtements) : top[0] = k-ième meilleure
+        chosen = []
+        found = 0
+
+        def explore(i, points, count, price):
+            nonlocal found
+            if len(top) == k:
+                end = best_end.get((i, count))
+                if end is None:
+                    end = best_end[(i, count)] = max(
+                        (m + rules.size(count + e), -p, -(count + e)) for e, (m, p) in rest[i].items())
+                score = rules.base + points + end[0]
+                # Score nul (plancher à 0) : toutes les fins se valent, seul le prix déjà payé borne
+                bound = (score, end[1] - price, end[2]) if score > 0 else (0, -price, -count)
+                if bound <= top[0][0]:
+                    return  # cette branche ne peut plus entrer dans le top-k
+            if i == len(levels):
+                if count == 0:
+                    return  # une tenue vide n'est pas une suggestion
+                key = (rules.total(points, count), -price, -count)
+                entry = (key, -found, [g for combo in chosen for g in combo])
+                found += 1
+                if len(top) < k:
+                    heapq.heappush(top, entry)
+                elif key > top[0][0]:
+                    heapq.heapreplace(top, entry)
+                return
+            for m, n, p, combo in levels[i]:
+                if budget is not None and price + p > budget:
+                    continue  # trop cher : ni cette option ni ses suites
+                chosen.append(combo)
+                explore(i + 1, points + m, count + n, price + p)
+                chosen.pop()
+
+        explore(0, 0, 0, 0)
+        return [(key[0], outfit) for key, _, outfit in sorted(top, reverse=True)]
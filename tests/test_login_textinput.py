@@ -0,0 +1,42 @@
+# ========================================
+# TEST : SAISIE DE TEXTE DANS L'ÉCRAN DE CONNEXION
+# TEXTINPUT ne doit pas être bloqué par le filtrage des événements de Game :
+# pygame en tire KEYDOWN.unicode (accents, AltGr, chiffres AZERTY).
+# Lancement (depuis la racine du projet) : py -m pytest tests
+# ========================================
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame as pg
+import pytest
+import db
+from repositories import UserRepo
+
+
+@pytest.fixture
+def game(monkeypatch):
+    db.configure(db.MEMORY)  # base neuve, isolée de data/game.db
+    monkeypatch.setattr(UserRepo, "export_if_changed", staticmethod(lambda *a: False))
+    monkeypatch.setattr("main.Game._resume_session", lambda self: False)  # toujours l'écran de connexion
+    from main import Game
+    g = Game()
+    yield g
+    g.worker.shutdown(wait=True)
+    g.audio.shutdown()
+    pg.quit()
+
+
+def test_keydown_textinput_pair_reaches_login(game):
+    assert type(game.scene).__name__ == "LoginScene"
+    assert not pg.event.get_blocked(pg.TEXTINPUT)
+    pg.event.clear()
+    for ch, key in (("é", pg.K_2), ("@", pg.K_0)):
+        pg.event.post(pg.event.Event(pg.KEYDOWN, key=key, mod=0, unicode=ch, scancode=0))
+        pg.event.post(pg.event.Event(pg.TEXTINPUT, text=ch))
+    events = game._poll_events()
+    assert [e.type for e in events] == [pg.KEYDOWN, pg.TEXTINPUT] * 2
+    game._handle_events(events)
+    assert game.scene.username == "é@"  # chaque caractère une seule fois (TEXTINPUT n'est pas retapé)
@@ -0,0 +1,121 @@
+# ========================================
+# ANALYSE DES MUSIQUES (ENVELOPPES D'ÉNERGIE)
+# Décode chaque piste de MUSIC_TRACKS une fois (pg.sndarray + NumPy) et garde une enveloppe
+# basse résolution (ENVELOPE_RATE valeurs/s) : volume RMS + impulsions de battement.
+# Rangée dans audio_envelope par empreinte du fichier : le disque musical la lit pendant la
+# lecture, sans aucune analyse audio en jeu.
+# Usage (depuis la racine du projet) : py -m tools.analyze_audio
+# ========================================
+
+# === IMPORTS ===
+import argparse  # Lecture des options de la ligne de commande
+import os  # Pilote audio factice (aucun son n'est joué)
+from pathlib import Path
+from typing import List, Optional
+import numpy as np  # Découpage en fenêtres, RMS, détection des battements
+import pygame as pg  # Décodage des fichiers audio
+from asset_manifest import file_hash  # Même empreinte que le catalogue et le manifeste
+from audio_manager import validate_playlist  # Mêmes pistes que le jeu
+from config import MUSIC_TRACKS
+from repositories import EnvelopeRepo
+
+# === CONFIGURATION ===
+ENVELOPE_RATE = 30  # Valeurs par seconde de musique (une frame sur deux à 60 FPS)
+DECODE_RATE = 22050  # Fréquence de décodage : largement assez pour une enveloppe à 30 Hz
+RMS_PEAK_PERCENTILE = 99  # Ce niveau de volume vaut 255 (les rares pics au-dessus sont écrêtés)
+BEAT_WINDOW_S = 1.0  # Fenêtre de la moyenne locale pour détecter un temps fort (secondes)
+BEAT_THRESHOLD = 1.5  # Un temps fort = montée d'énergie supérieure à 1,5 x la moyenne locale
+BEAT_MIN_GAP_S = 0.2  # Deux temps forts sont séparés d'au moins 0,2 s (300 BPM max)
+BEAT_DECAY = 0.8  # Décroissance de l'impulsion entre deux valeurs (après un temps fort)
+
+
+def envelope(samples: np.ndarray, sample_rate: int, rate: int = ENVELOPE_RATE):
+    """Enveloppe d'un signal (N,) ou (N, canaux) : (rms, beat), deux tableaux uint8 de même longueur."""
+    mono = samples.astype(np.float32)
+    if mono.ndim > 1:
+        mono = mono.mean(axis=1)
+    hop = max(1, sample_rate // rate)
+    n = len(mono) // hop
+    if n == 0:
+        return np.zeros(0, dtype=np.uint8), np.zeros(0, dtype=np.uint8)
+    frames = mono[:n * hop].reshape(n, hop)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    peak = np.percentile(rms, RMS_PEAK_PERCENTILE) or 1.0
+    rms_u8 = np.clip(rms / peak * 255, 0, 255).astype(np.uint8)
+
+    # Temps forts : montée brusque d'énergie (en dB) par rapport à la moyenne locale
+    flux = np.maximum(0.0, np.diff(np.log10(rms + 1e-6), prepend=np.log10(rms[0] + 1e-6)))
+    width = max(1, int(BEAT_WINDOW_S * rate))
+    local = np.convolve(flux, np.ones(width) / width, mode="same")
+    candidates = np.flatnonzero((flux > BEAT_THRESHOLD * local) & (flux > 0))
+    min_gap = max(1, int(BEAT_MIN_GAP_S * rate))
+    onsets, last = set(), -min_gap
+    for i in candidates:
+        if i - last >= min_gap:
+            onsets.add(int(i))
+            last = i
+    beat, level = np.zeros(n, dtype=np.float32), 0.0
+    for i in range(n):  # impulsion : 1 sur un temps fort, puis décroissance (précalculée une fois ici)
+        level = 1.0 if i in onsets else level * BEAT_DECAY
+        beat[i] = level
+    return rms_u8, (beat * 255).astype(np.uint8)
+
+
+def analyze(path: str, digest: str) -> Optional[tuple]:
+    """Décode une piste et renvoie sa ligne de audio_envelope, ou None si elle est illisible."""
+    try:
+        sound = pg.mixer.Sound(path)
+    except (pg.error, OSError) as e:
+        print(f"✗ {path} : {e}")
+        return None
+    rms, beat = envelope(pg.sndarray.array(sound), pg.mixer.get_init()[0])
+    return (digest, ENVELOPE_RATE, rms.tobytes(), beat.tobytes())
+
+
+def analyze_tracks(tracks: List[str] = MUSIC_TRACKS, dry_run: bool = False) -> dict:
+    """Met à jour audio_envelope : seules les pistes nouvelles ou modifiées (empreinte) sont décodées.
+
+    Returns:
+        dict: compteurs {"tracks", "analyzed", "unchanged", "missing", "removed"}
+    """
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")  # décodage seulement : pas besoin de carte son
+    if not pg.mixer.get_init():
+        pg.mixer.init(frequency=DECODE_RATE, size=-16, channels=1)
+    valid, missing = validate_playlist(tracks)
+    existing = set(EnvelopeRepo.hashes())
+    stats = {"tracks": len(tracks), "analyzed": 0, "unchanged": 0, "missing": len(missing), "removed": 0}
+    rows, seen = [], set()
+    for path in valid:
+        digest = file_hash(Path(path))
+        seen.add(digest)
+        if digest in existing:
+            stats["unchanged"] += 1
+            continue
+        row = analyze(path, digest)
+        if row is None:
+            stats["missing"] += 1
+            continue
+        rows.append(row)
+        stats["analyzed"] += 1
+    removed = [h for h in existing if h not in seen]  # pistes retirées ou modifiées depuis
+    stats["removed"] = len(removed)
+    if not dry_run and (rows or removed):
+        EnvelopeRepo.sync(rows, removed)  # une seule transaction
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Précalcule l'enveloppe d'énergie de chaque musique (table audio_envelope).")
+    parser.add_argument("--dry-run", action="store_true", help="affiche les changements sans écrire en base")
+    args = parser.parse_args(argv)
+
+    stats = analyze_tracks(dry_run=args.dry_run)
+    print(
+        f"✓ {stats['tracks']} pistes : {stats['analyzed']} analysées, {stats['unchanged']} inchangées, "
+        f"{stats['missing']} introuvables, {stats['removed']} retirées"
+        + (" (dry-run, rien n'a été écrit)" if args.dry_run else "")
+    )
+
+
+if __name__ == "__main__":
+    main()
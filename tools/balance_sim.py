@@ -0,0 +1,206 @@
+# ========================================
+# SIMULATEUR D'ÉQUILIBRAGE (MONTE-CARLO)
+# Tire des millions de tenues aléatoires légales (limites Category.max_items respectées),
+# les note pour chaque thème avec BatchScorer et résume : histogramme des scores,
+# vêtements qui font monter/baisser le score (lift), chance de gagner par thème.
+# Usage (depuis la racine du projet) : py -m tools.balance_sim --outfits 20000000 --target 100
+# ========================================
+
+# === IMPORTS ===
+import argparse  # Lecture des options de la ligne de commande
+import json  # Export complet des résultats (--json)
+import time  # Mesure du débit
+from concurrent.futures import ProcessPoolExecutor  # Lots de tenues répartis sur tous les cœurs
+from typing import List, Optional, Tuple
+import numpy as np  # Tirage et scoring vectorisés
+from batch_scoring import EMPTY, BatchScorer  # Mêmes règles que Scoring.score
+from repositories import CategoryRepo, GarmentRepo
+
+# === CONFIGURATION ===
+CHUNK_SIZE = 200_000  # Tenues tirées et notées par tâche (un lot = une graine)
+HIST_BIN = 10  # Largeur des barres de l'histogramme affiché (points)
+TOP_LIFT = 5  # Vêtements affichés en tête et en queue du tableau de lift
+MIN_APPEARANCES = 100  # Un vêtement vu moins souvent n'a pas de lift fiable (non affiché)
+
+
+# === ÉCHANTILLONNAGE ===
+class OutfitSampler:
+    """Tire des tenues légales : pour chaque catégorie, 0 à max_items vêtements distincts (nombre uniforme).
+
+    Les tenues sont des lignes d'indices dans `garments` (format de BatchScorer), EMPTY pour les cases vides.
+    """
+
+    def __init__(self, garments, categories):
+        by_category = {}
+        for i, g in enumerate(garments):
+            by_category.setdefault(g.category_id, []).append(i)
+        # (indices des vêtements de la catégorie, nombre max portable) pour chaque catégorie non vide
+        self.slots: List[Tuple[np.ndarray, int]] = [
+            (np.array(by_category[c.id], dtype=np.int32), min(c.max_items, len(by_category[c.id])))
+            for c in categories if by_category.get(c.id) and c.max_items > 0
+        ]
+        self.width = sum(m for _, m in self.slots)  # nombre max de vêtements dans une tenue
+
+    def sample(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        """Matrice (n, width) de tenues aléatoires."""
+        outfits = np.full((n, self.width), EMPTY, dtype=np.int32)
+        col = 0
+        for members, max_items in self.slots:
+            count = rng.integers(0, max_items + 1, size=n)  # vêtements portés dans cette catégorie
+            picks = np.empty((n, max_items), dtype=np.int64)
+            for j in range(max_items):
+                # Tirage sans remise : rang parmi les vêtements restants, décalé au-delà des tirages précédents
+                r = rng.integers(0, len(members) - j, size=n)
+                for prev in np.sort(picks[:, :j], axis=1).T:
+                    r += r >= prev
+                picks[:, j] = r
+            block = members[picks]
+            block[np.arange(max_items) >= count[:, None]] = EMPTY
+            outfits[:, col:col + max_items] = block
+            col += max_items
+        return outfits
+
+
+# === TRAVAIL D'UN PROCESSUS ===
+_scorer: Optional[BatchScorer] = None
+_sampler: Optional[OutfitSampler] = None
+
+
+def _init_worker(scorer: BatchScorer, sampler: OutfitSampler):
+    """Reçoit une fois par processus le catalogue et les règles compilées (aucune lecture de la base)."""
+    global _scorer, _sampler
+    _scorer, _sampler = scorer, sampler
+
+
+def _run_chunk(job: Tuple[np.random.SeedSequence, int, int]) -> dict:
+    """Tire et note un lot de tenues ; renvoie des sommes qui s'additionnent d'un lot à l'autre."""
+    seed, n, target = job
+    rng = np.random.default_rng(seed)
+    outfits = _sampler.sample(rng, n)
+    scores = _scorer.score_all_themes(outfits)  # (n, n_thèmes)
+    worn = outfits != EMPTY
+    flat = outfits[worn]
+    n_garments = len(_scorer.garments)
+    return {
+        "outfits": n,
+        "hist": [np.bincount(scores[:, t]) for t in range(scores.shape[1])],
+        "sum": scores.sum(axis=0, dtype=np.int64),
+        "wins": (scores >= target).sum(axis=0),
+        "max": scores.max(axis=0, initial=0),
+        # Pour chaque vêtement : nombre de tenues qui le contiennent, somme de leurs scores (par thème)
+        "appearances": np.bincount(flat, minlength=n_garments),
+        "garment_sum": np.stack([
+            np.bincount(flat, weights=np.broadcast_to(scores[:, t:t + 1], outfits.shape)[worn], minlength=n_garments)
+            for t in range(scores.shape[1])
+        ]) if scores.shape[1] else np.zeros((0, n_garments)),
+    }
+
+
+def _merge(total: Optional[dict], part: dict) -> dict:
+    if total is None:
+        return part
+    for key in ("outfits", "sum", "wins", "appearances", "garment_sum"):
+        total[key] = total[key] + part[key]
+    total["max"] = np.maximum(total["max"], part["max"])
+    for t, h in enumerate(part["hist"]):
+        a, b = total["hist"][t], h
+        if len(a) < len(b):
+            a, b = b, a
+        a = a.copy()
+        a[:len(b)] += b
+        total["hist"][t] = a
+    return total
+
+
+# === SIMULATION ===
+def simulate(outfits: int, seed: int = 0, target: int = 100, workers: Optional[int] = None,
+             chunk_size: int = CHUNK_SIZE) -> dict:
+    """Simule `outfits` tenues aléatoires et résume les scores par thème.
+
+    Chaque lot a sa propre graine (SeedSequence(seed).spawn) : les résultats ne dépendent
+    que de `seed`, `outfits` et `chunk_size`, pas du nombre de processus.
+
+    Returns:
+        dict: {"outfits", "seconds", "width", "themes": {code: {"mean", "max", "win_rate", "hist", "lift"}}}
+    """
+    garments = GarmentRepo.all()
+    scorer = BatchScorer(garments)
+    sampler = OutfitSampler(garments, CategoryRepo.all())
+    sizes = [chunk_size] * (outfits // chunk_size) + ([outfits % chunk_size] if outfits % chunk_size else [])
+    jobs = [(s, n, target) for s, n in zip(np.random.SeedSequence(seed).spawn(len(sizes)), sizes)]
+
+    t0 = time.perf_counter()
+    total = None
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(scorer, sampler)) as pool:
+        for part in pool.map(_run_chunk, jobs):  # ordre des lots conservé : sommes identiques d'un run à l'autre
+            total = _merge(total, part)
+    seconds = time.perf_counter() - t0
+
+    result = {"outfits": outfits, "seconds": seconds, "width": sampler.width, "target": target, "themes": {}}
+    if total is None:
+        return result
+    appearances = total["appearances"]
+    for t, code in enumerate(scorer.theme_codes):
+        with_sum = total["garment_sum"][t]
+        without = outfits - appearances
+        # Lift = score moyen des tenues qui contiennent le vêtement - score moyen de celles qui ne le contiennent pas
+        reliable = (appearances >= MIN_APPEARANCES) & (without > 0)
+        lift = np.full(len(garments), np.nan)
+        lift[reliable] = (with_sum[reliable] / appearances[reliable]
+                          - (total["sum"][t] - with_sum[reliable]) / without[reliable])
+        result["themes"][code] = {
+            "mean": float(total["sum"][t] / outfits),
+            "max": int(total["max"][t]),
+            "win_rate": float(total["wins"][t] / outfits),
+            "hist": total["hist"][t].tolist(),  # hist[s] = nombre de tenues de score s
+            "lift": sorted(((float(lift[i]), g.id, g.name) for i, g in enumerate(garments) if reliable[i]),
+                           reverse=True),
+        }
+    return result
+
+
+# === AFFICHAGE ===
+def _percentile(hist: List[int], p: float) -> int:
+    """Score sous lequel se trouvent p % des tenues (à partir de l'histogramme exact)."""
+    cumulative = np.cumsum(hist)
+    return int(np.searchsorted(cumulative, cumulative[-1] * p / 100))
+
+
+def print_report(result: dict):
+    print(f"✓ {result['outfits']} tenues (jusqu'à {result['width']} vêtements) en {result['seconds']:.1f} s "
+          f"({result['outfits'] / max(result['seconds'], 1e-9) / 1e6 * 60:.0f} M tenues/min)")
+    for code, stats in result["themes"].items():
+        hist = stats["hist"]
+        print(f"\n=== {code} : moyenne {stats['mean']:.1f}, médiane {_percentile(hist, 50)}, "
+              f"p99 {_percentile(hist, 99)}, max {stats['max']}, "
+              f"gagnable (score >= {result['target']}) : {stats['win_rate']:.2%}")
+        bins = [sum(hist[i:i + HIST_BIN]) for i in range(0, len(hist), HIST_BIN)]
+        peak = max(bins) or 1
+        for i, n in enumerate(bins):
+            if n:
+                print(f"  {i * HIST_BIN:>4}-{i * HIST_BIN + HIST_BIN - 1:<4} {'█' * max(1, round(40 * n / peak)):<40} {n / result['outfits']:.2%}")
+        lift = stats["lift"]
+        if lift:
+            print("  lift + : " + ", ".join(f"{name} ({value:+.1f})" for value, _, name in lift[:TOP_LIFT]))
+            print("  lift - : " + ", ".join(f"{name} ({value:+.1f})" for value, _, name in lift[::-1][:TOP_LIFT]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simule des tenues aléatoires pour équilibrer thèmes et catalogue.")
+    parser.add_argument("--outfits", type=int, default=10_000_000, help="nombre de tenues tirées")
+    parser.add_argument("--target", type=int, default=100, help="score à atteindre pour qu'une tenue \"gagne\"")
+    parser.add_argument("--seed", type=int, default=0, help="graine (même graine = mêmes résultats)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="nombre de processus (défaut : nombre de cœurs)")
+    parser.add_argument("--json", default=None, help="écrit aussi les résultats complets dans ce fichier")
+    args = parser.parse_args(argv)
+
+    result = simulate(args.outfits, seed=args.seed, target=args.target, workers=args.workers)
+    print_report(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False)
+        print(f"\n✓ Résultats complets : {args.json}")
+
+
+if __name__ == "__main__":
+    main()
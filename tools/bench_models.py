@@ -0,0 +1,88 @@
+# ========================================
+# BENCHMARK DU CHARGEMENT DES MODÈLES
+# Compare l'ancien chargement (sqlite3.Row -> dict -> dataclass classique)
+# au nouveau (tuple -> dataclass slots/frozen) sur un gros catalogue
+# Usage (depuis la racine du projet) : py -m tools.bench_models --garments 50000
+# ========================================
+
+# === IMPORTS ===
+import argparse  # Lecture des options de la ligne de commande
+import gc  # Ramasse-miettes coupé pendant les mesures
+import sqlite3  # Row factory de l'ancien chargement
+import time  # Mesure du temps de chargement
+import tracemalloc  # Mesure de la mémoire allouée
+from dataclasses import dataclass  # Copie de l'ancienne dataclass (sans slots)
+from typing import Optional
+import db  # Base en mémoire (ne touche pas data/game.db)
+from repositories import GARMENT_COLUMNS, GarmentRepo
+
+
+@dataclass
+class LegacyGarment:  # Garment tel qu'il était avant slots/frozen (un __dict__ par objet)
+    id: int
+    name: str
+    category_id: int
+    sprite_path: str
+    score_theme: Optional[str] = None
+    price: int = 0
+
+
+def load_legacy():
+    """Ancien chemin : lignes sqlite3.Row converties en dict puis passées par mot-clé."""
+    with db.DB.connect(row_factory=sqlite3.Row) as con:
+        rows = con.execute(f"SELECT {GARMENT_COLUMNS} FROM garment").fetchall()
+    return [LegacyGarment(**dict(r)) for r in rows]
+
+
+def measure(loader, repeat: int):
+    """Renvoie (meilleur temps en s, octets alloués par objet) pour un chargement complet."""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        objs = loader()
+        best = min(best, time.perf_counter() - t0)
+        del objs
+
+    # Mémoire : on ne compte que ce qui reste alloué (les objets), pas les lignes temporaires
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objs = loader()
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return best, retained / max(1, len(objs))
+
+
+def seed(n: int):
+    """Ajoute n vêtements factices au catalogue de la base en mémoire."""
+    themes = ("Chic", "Casual", "Sport", "Soirée", None)
+    rows = [(f"Vêtement {i}", 1 + i % 6, f"assets/clothes/bench/{i}.png", themes[i % len(themes)], i % 200, None)
+            for i in range(n)]
+    GarmentRepo.upsert_many(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mesure mémoire et temps de chargement des vêtements.")
+    parser.add_argument("--garments", type=int, default=50000, help="nombre de vêtements à générer")
+    parser.add_argument("--repeat", type=int, default=5, help="nombre de chargements (on garde le meilleur)")
+    args = parser.parse_args(argv)
+
+    db.configure(db.MEMORY)
+    seed(args.garments)
+    count = len(GarmentRepo.all())
+
+    print(f"{count} vêtements")
+    print(f"{'chargement':>22} {'temps ms':>9} {'octets/objet':>13}")
+    results = {}
+    for label, loader in (("avant (Row -> dict)", load_legacy), ("après (tuple, slots)", GarmentRepo.all)):
+        results[label] = measure(loader, args.repeat)
+        t, per_obj = results[label]
+        print(f"{label:>22} {t * 1000:>9.1f} {per_obj:>13.0f}")
+    (t_old, m_old), (t_new, m_new) = results.values()
+    print(f"gain : x{t_old / t_new:.2f} en temps, -{(1 - m_new / m_old) * 100:.0f}% de mémoire par vêtement")
+
+
+if __name__ == "__main__":
+    main()
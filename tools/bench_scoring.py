@@ -0,0 +1,56 @@
+# ========================================
+# BENCHMARK DU SCORING PAR LOTS
+# Vérifie que BatchScorer donne exactement Scoring.score, puis mesure le débit (tenues/s)
+# Usage (depuis la racine du projet) : py -m tools.bench_scoring --outfits 1000000
+# ========================================
+
+# === IMPORTS ===
+import argparse  # Lecture des options de la ligne de commande
+import time  # Mesure du débit
+import numpy as np  # Génération des tenues aléatoires
+from batch_scoring import EMPTY, BatchScorer
+from repositories import GarmentRepo  # Catalogue réel (data/game.db)
+from services import Scoring  # Référence : scoring tenue par tenue
+
+
+def random_outfits(rng, n_garments: int, n_outfits: int, width: int) -> np.ndarray:
+    """Tenues aléatoires de 1 à `width` vêtements (cases restantes = EMPTY)."""
+    outfits = rng.integers(0, n_garments, size=(n_outfits, width), dtype=np.int32)
+    sizes = rng.integers(1, width + 1, size=n_outfits)
+    outfits[np.arange(width) >= sizes[:, None]] = EMPTY
+    return outfits
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare BatchScorer à Scoring.score et mesure son débit.")
+    parser.add_argument("--outfits", type=int, default=1_000_000, help="nombre de tenues notées par lot")
+    parser.add_argument("--width", type=int, default=8, help="nombre max de vêtements par tenue")
+    parser.add_argument("--check", type=int, default=20_000, help="tenues vérifiées une à une contre Scoring.score")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    garments = GarmentRepo.all()
+    scorer = BatchScorer(garments)
+    rng = np.random.default_rng(args.seed)
+    outfits = random_outfits(rng, len(garments), args.outfits, args.width)
+
+    # 1) Exactitude : chaque thème, un échantillon de tenues comparé au scoring Python
+    sample = outfits[:args.check]
+    for theme in scorer.theme_codes + ["inconnu"]:
+        batch = scorer.score(theme, sample)
+        for row, got in zip(sample, batch):
+            expected = Scoring.score(theme, [garments[i] for i in row if i != EMPTY])
+            if got != expected:
+                raise SystemExit(f"✗ écart pour {theme!r} : {row.tolist()} -> {got} au lieu de {expected}")
+    print(f"✓ {len(sample)} tenues x {len(scorer.theme_codes) + 1} thèmes identiques à Scoring.score")
+
+    # 2) Débit
+    for theme in scorer.theme_codes:
+        t0 = time.perf_counter()
+        scorer.score(theme, outfits)
+        elapsed = time.perf_counter() - t0
+        print(f"{theme:>10} : {args.outfits / elapsed / 1e6:6.1f} M tenues/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+# ========================================
+# CONSTRUCTION DU MANIFESTE DES ASSETS
+# Décode chaque image de assets/ une fois et enregistre ses métadonnées dans asset_manifest
+# Usage (depuis la racine du projet) : py -m tools.build_manifest
+# ========================================
+
+# === IMPORTS ===
+import argparse  # Lecture des options de la ligne de commande
+from asset_manifest import build_manifest  # Même code que la reconstruction en arrière-plan du jeu
+from config import ASSETS_DIR
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Construit le manifeste des images de assets/ (table asset_manifest).")
+    parser.add_argument("--dir", default=ASSETS_DIR, help="dossier racine des assets")
+    parser.add_argument("--dry-run", action="store_true", help="affiche les changements sans écrire en base")
+    args = parser.parse_args(argv)
+
+    stats = build_manifest(args.dir, dry_run=args.dry_run)
+    print(
+        f"✓ {stats['scanned']} images analysées : {stats['new']} nouvelles, {stats['updated']} modifiées, "
+        f"{stats['unchanged']} inchangées, {stats['removed']} retirées"
+        + (" (dry-run, rien n'a été écrit)" if args.dry_run else "")
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# ========================================
+# TEST DE CHARGE DE LA BASE PARTAGÉE
+# Simule plusieurs instances du jeu (bornes) qui utilisent le même fichier game.db
+# Usage (depuis la racine du projet) : py -m tools.db_loadtest --procs 1 2 4 8 --duration 5
+# ========================================
+
+# === IMPORTS ===
+import argparse  # Lecture des options de la ligne de commande
+import multiprocessing as mp  # Un processus = une instance du jeu
+import os  # Suppression de la base temporaire
+import random  # Choix des opérations
+import sqlite3  # Erreurs "database is locked"
+import tempfile  # Base de test jetable (ne touche pas data/game.db)
+import time  # Mesure des latences
+import bcrypt  # Hash peu coûteux pour les comptes de test
+from db import Database  # Même code d'accès que le jeu (WAL, busy_timeout, write())
+
+PASSWORD = "loadtest"  # Mot de passe de tous les comptes de test
+N_USERS = 200  # Comptes créés avant le test (cibles des connexions)
+OPS = ("login", "insert", "result")  # connexion, création de compte, enregistrement d'un résultat
+WEIGHTS = (6, 1, 3)  # Répartition des opérations (surtout des lectures, comme en jeu)
+# Hash bcrypt à coût minimal : le test mesure la base, pas bcrypt
+LOW_COST_HASH = bcrypt.hashpw(PASSWORD.encode("utf-8"), bcrypt.gensalt(rounds=4))
+
+
+def _setup(path):
+    """Crée la base de test et ses comptes."""
+    db = Database(path)
+    db.write(lambda con: con.executemany(
+        "INSERT INTO users (username, display_name, password_hash) VALUES (?, ?, ?)",
+        [(f"load{i}", f"Load {i}", LOW_COST_HASH) for i in range(N_USERS)]
+    ))
+
+
+def _worker(path, seed, start_at, duration, queue):
+    """Boucle d'une instance : enchaîne des opérations jusqu'à la fin du test et renvoie les latences."""
+    db = Database(path)
+    rng = random.Random(seed)
+    latencies = {op: [] for op in OPS}
+    errors = 0
+    time.sleep(max(0.0, start_at - time.time()))  # tous les processus démarrent ensemble
+    n = 0
+    while time.time() < start_at + duration:
+        op = rng.choices(OPS, WEIGHTS)[0]
+        n += 1
+        t0 = time.perf_counter()
+        try:
+            if op == "login":
+                db.authenticate(f"load{rng.randrange(N_USERS)}", PASSWORD)
+            elif op == "insert":
+                db.write(lambda con: con.execute(
+                    "INSERT INTO users (username, display_name, password_hash) VALUES (?, ?, ?)",
+                    (f"p{start_at}_{seed}_{n}", "Load", LOW_COST_HASH)  # unique d'un palier à l'autre
+                ))
+            else:
+                db.write(lambda con: con.execute(
+                    "INSERT INTO run_result (mannequin_id, theme_id, score, money_earned) VALUES (1, 1, ?, ?)",
+                    (rng.randrange(200), rng.randrange(100))
+                ))
+        except sqlite3.Error:
+            errors += 1  # ex: verrou toujours pris après toutes les tentatives
+            continue
+        latencies[op].append(time.perf_counter() - t0)
+    queue.put((latencies, errors))
+
+
+def _percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def run(procs: int, duration: float, path: str):
+    """Lance `procs` processus en parallèle et renvoie {op: (débit/s, p50 ms, p99 ms)}, erreurs."""
+    queue = mp.Queue()
+    start_at = time.time() + 0.5  # laisse le temps aux processus de démarrer
+    workers = [mp.Process(target=_worker, args=(path, seed, start_at, duration, queue)) for seed in range(procs)]
+    for w in workers:
+        w.start()
+    results = [queue.get() for _ in workers]
+    for w in workers:
+        w.join()
+
+    merged = {op: [] for op in OPS}
+    errors = 0
+    for latencies, err in results:
+        errors += err
+        for op in OPS:
+            merged[op].extend(latencies[op])
+    stats = {
+        op: (len(vals) / duration, _percentile(vals, 0.50) * 1000, _percentile(vals, 0.99) * 1000)
+        for op, vals in merged.items()
+    }
+    return stats, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mesure débit et latence p99 de game.db avec plusieurs processus.")
+    parser.add_argument("--procs", type=int, nargs="+", default=[1, 2, 4, 8], help="nombres de processus à tester")
+    parser.add_argument("--duration", type=float, default=5.0, help="durée de chaque palier (s)")
+    args = parser.parse_args(argv)
+
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    os.remove(path)  # Database() doit voir une base neuve pour exécuter le seed
+    try:
+        _setup(path)
+        print(f"{'procs':>5} {'op':>7} {'ops/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+        for procs in args.procs:
+            stats, errors = run(procs, args.duration, path)
+            for op, (rate, p50, p99) in stats.items():
+                print(f"{procs:>5} {op:>7} {rate:>9.1f} {p50:>8.2f} {p99:>8.2f}")
+            print(f"{procs:>5} {'erreurs':>7} {errors:>9}")
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(path + suffix)
+            except OSError:
+                pass
+
+
+if __name__ == "__main__":
+    main()
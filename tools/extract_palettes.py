@@ -0,0 +1,139 @@
+# ========================================
+# EXTRACTION DES PALETTES DE COULEURS
+# Lit chaque sprite de vêtement une fois (pg.surfarray + NumPy, pixels opaques seulement),
+# garde ses couleurs dominantes et sa classe de palette dans la table garment_palette.
+# Les règles de score s'en servent pour l'harmonie (theme_palette_bonus), sans lire de pixels en jeu.
+# Usage (depuis la racine du projet) : py -m tools.extract_palettes
+# ========================================
+
+# === IMPORTS ===
+import argparse  # Lecture des options de la ligne de commande
+import colorsys  # Teinte / saturation / luminosité des couleurs dominantes
+import os  # Existence des sprites
+from collections import Counter  # Répartition des classes de palette (affichage)
+from concurrent.futures import ProcessPoolExecutor  # Décodage des images réparti sur tous les cœurs
+from pathlib import Path
+from typing import List, Optional, Tuple
+import numpy as np  # Histogramme des couleurs
+import pygame as pg  # Décodage des images (aucune fenêtre n'est ouverte)
+from asset_manifest import file_hash  # Même empreinte que l'import du catalogue
+from repositories import GarmentRepo, PaletteRepo
+from scoring_rules import PALETTE_CLASSES  # Numéros des classes de palette
+
+# === CONFIGURATION ===
+PALETTE_SIZE = 5  # Couleurs dominantes gardées par vêtement
+QUANT_BITS = 3  # Bits gardés par canal pour regrouper les couleurs proches (8 x 8 x 8 cases)
+ALPHA_OPAQUE = 128  # Un pixel plus transparent que ça ne compte pas (bords, fond)
+SAMPLE_SIDE = 256  # Image réduite à ce côté max avant l'histogramme (mêmes proportions de couleurs, 50x moins de pixels)
+NEUTRAL_SATURATION = 0.15  # Saturation moyenne sous laquelle la palette est neutre
+VIVID_SATURATION = 0.45  # Saturation moyenne à partir de laquelle la palette est vive
+HUE_SATURATION = 0.35  # Une couleur moins saturée n'a pas de "teinte" qui compte
+HUE_MIN_SHARE = 0.10  # Une teinte doit couvrir au moins 10 % des aplats
+HUE_SECTORS = 12  # Teintes regroupées par secteurs de 30°
+OUTLINE_VALUE = 0.2  # Couleur plus sombre = trait de contour, ignoré pour la classe (sauf vêtement tout noir)
+
+
+def dominant_colors(pixels: np.ndarray) -> List[Tuple[int, int, int, int]]:
+    """Couleurs dominantes de pixels (N, 3) : [(r, g, b, part sur 255)], la plus présente d'abord."""
+    if len(pixels) == 0:
+        return []
+    shift = 8 - QUANT_BITS
+    q = pixels.astype(np.int32) >> shift
+    bins = (q[:, 0] << (2 * QUANT_BITS)) | (q[:, 1] << QUANT_BITS) | q[:, 2]
+    size = 1 << (3 * QUANT_BITS)
+    counts = np.bincount(bins, minlength=size)
+    # Couleur moyenne de chaque case (et non son coin) : la palette garde les vraies teintes
+    sums = [np.bincount(bins, weights=pixels[:, c], minlength=size) for c in range(3)]
+    top = [b for b in np.argsort(-counts, kind="stable")[:PALETTE_SIZE] if counts[b]]
+    return [(*(int(sums[c][b] / counts[b]) for c in range(3)), round(255 * counts[b] / len(pixels)))
+            for b in top]
+
+
+def palette_class(colors: List[Tuple[int, int, int, int]]) -> int:
+    """Classe de la palette : indice dans PALETTE_CLASSES (neutre, doux, vif, multicolore)."""
+    hsv = [(colorsys.rgb_to_hsv(r / 255, g / 255, b / 255), share) for r, g, b, share in colors]
+    # Les traits de contour (presque noirs) dominent les sprites dessinés : on ne garde que les aplats
+    hsv = [c for c in hsv if c[0][2] >= OUTLINE_VALUE]
+    total = sum(share for _, share in hsv) or 1
+    saturation, hues = 0.0, set()
+    for (h, s, v), share in hsv:
+        saturation += s * share / total
+        if s >= HUE_SATURATION and share / total >= HUE_MIN_SHARE:
+            hues.add(int(h * HUE_SECTORS) % HUE_SECTORS)
+    if saturation < NEUTRAL_SATURATION:
+        return PALETTE_CLASSES.index("neutre")
+    if len(hues) >= 2:
+        return PALETTE_CLASSES.index("multicolore")
+    return PALETTE_CLASSES.index("vif" if saturation >= VIVID_SATURATION else "doux")
+
+
+def analyze(job: Tuple[int, str, Optional[str]]) -> Tuple[int, str, Optional[tuple]]:
+    """Dans un processus du pool : (garment_id, état, ligne de garment_palette ou None).
+
+    L'empreinte est calculée ici aussi : un sprite inchangé n'est pas décodé.
+    """
+    garment_id, path, known_hash = job
+    if not os.path.exists(path):
+        return garment_id, "missing", None
+    digest = file_hash(Path(path))
+    if digest == known_hash:
+        return garment_id, "unchanged", None
+    try:
+        img = pg.image.load(path)
+    except (pg.error, OSError):
+        return garment_id, "missing", None
+    scale = SAMPLE_SIDE / max(img.get_size())
+    if scale < 1:  # échantillonnage au plus proche : les couleurs restent exactes (pas de mélange)
+        img = pg.transform.scale(img, (max(1, round(img.get_width() * scale)), max(1, round(img.get_height() * scale))))
+    rgb = pg.surfarray.array3d(img).reshape(-1, 3)
+    alpha = pg.surfarray.array_alpha(img).reshape(-1)  # 255 partout si l'image n'a pas d'alpha
+    colors = dominant_colors(rgb[alpha >= ALPHA_OPAQUE])
+    blob = bytes(v for color in colors for v in color)
+    return garment_id, "extracted", (garment_id, blob, palette_class(colors), digest)
+
+
+def extract_palettes(workers: Optional[int] = None, dry_run: bool = False) -> dict:
+    """Met à jour garment_palette : seuls les sprites nouveaux ou modifiés sont décodés.
+
+    Returns:
+        dict: compteurs {"garments", "extracted", "unchanged", "missing", "removed", "classes"}
+    """
+    existing = PaletteRepo.hashes()
+    jobs = [(g.id, g.sprite_path, existing.get(g.id)) for page in GarmentRepo.iter_pages(1000) for g in page]
+    stats = Counter(garments=len(jobs), extracted=0, unchanged=0, missing=0)
+    rows = []
+    # Décodage PNG + histogramme : limité par le CPU, donc réparti sur plusieurs processus
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for _, state, row in pool.map(analyze, jobs, chunksize=16):
+            stats[state] += 1
+            if row is not None:
+                rows.append(row)
+
+    seen = {garment_id for garment_id, _, _ in jobs}
+    removed = [garment_id for garment_id in existing if garment_id not in seen]
+    stats["removed"] = len(removed)
+    if not dry_run and (rows or removed):
+        PaletteRepo.sync(rows, removed)  # une seule transaction
+    stats = dict(stats)
+    stats["classes"] = Counter(PALETTE_CLASSES[row[2]] for row in rows)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extrait la palette de couleurs de chaque vêtement (table garment_palette).")
+    parser.add_argument("--workers", type=int, default=None, help="nombre de processus (défaut : nombre de cœurs)")
+    parser.add_argument("--dry-run", action="store_true", help="affiche les changements sans écrire en base")
+    args = parser.parse_args(argv)
+
+    stats = extract_palettes(args.workers, dry_run=args.dry_run)
+    print(
+        f"✓ {stats['garments']} vêtements : {stats['extracted']} palettes extraites, {stats['unchanged']} inchangées, "
+        f"{stats['missing']} sprites introuvables, {stats['removed']} retirées"
+        + (" (dry-run, rien n'a été écrit)" if args.dry_run else "")
+    )
+    if stats["classes"]:
+        print("  " + ", ".join(f"{name} : {n}" for name, n in stats["classes"].most_common()))
+
+
+if __name__ == "__main__":
+    main()
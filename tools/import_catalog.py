@@ -0,0 +1,120 @@
+# ========================================
+# IMPORT DU CATALOGUE DE VÊTEMENTS
+# Parcourt assets/clothes/<catégorie>/ et met à jour la table garment
+# Usage (depuis la racine du projet) : py -m tools.import_catalog
+# ========================================
+
+# === IMPORTS ===
+import argparse  # Lecture des options de la ligne de commande
+import json  # Lecture des fichiers de métadonnées (sidecar)
+from pathlib import Path  # Parcours des dossiers
+from asset_manifest import file_hash  # Empreinte du contenu des sprites (même que le manifeste)
+from db import normalize_code  # Codes de thème normalisés, comme en base
+from repositories import CategoryRepo, GarmentRepo  # Accès BDD catégories / vêtements
+
+# === CONFIGURATION ===
+CLOTHES_DIR = Path("assets/clothes")  # Dossier racine des sprites (un sous-dossier par catégorie)
+IMAGE_EXTS = (".png", ".jpg", ".jpeg")  # Extensions reconnues comme sprites
+
+# Nom de dossier -> nom de catégorie en base (les dossiers sont au pluriel, les catégories au singulier)
+FOLDER_TO_CATEGORY = {
+    "tops": "top",
+    "bottoms": "bottom",
+    "shoes": "shoes",
+    "accessories": "accessory",
+    "hairs": "hair",
+    "faces": "face",
+}
+
+
+def read_sidecar(sprite: Path) -> dict:
+    """Lit les métadonnées optionnelles d'un sprite (ex: top1.png -> top1.json).
+
+    Clés reconnues : "name", "theme", "price". Retourne {} s'il n'y a pas de fichier.
+    """
+    meta_path = sprite.with_suffix(".json")
+    if not meta_path.exists():
+        return {}
+    with open(meta_path, encoding="utf-8") as f:
+        meta = json.load(f)
+    # On ne garde que les clés connues pour éviter d'écrire n'importe quoi en base
+    return {k: meta[k] for k in ("name", "theme", "price") if k in meta}
+
+
+def scan(clothes_dir: Path = CLOTHES_DIR):
+    """Parcourt les sous-dossiers et renvoie (nom_catégorie, sprite, métadonnées) pour chaque image."""
+    for folder in sorted(p for p in clothes_dir.iterdir() if p.is_dir()):
+        category_name = FOLDER_TO_CATEGORY.get(folder.name, folder.name)
+        for sprite in sorted(folder.iterdir()):
+            if sprite.suffix.lower() in IMAGE_EXTS:
+                yield category_name, sprite, read_sidecar(sprite)
+
+
+def import_catalog(clothes_dir: Path = CLOTHES_DIR, dry_run: bool = False) -> dict:
+    """Importe les sprites du dossier et n'écrit que les vêtements nouveaux ou modifiés.
+
+    Les valeurs déjà en base (nom, thème, prix saisis dans seed_data.sql) sont conservées
+    tant qu'aucun sidecar ne les remplace : relancer l'import sans changement n'écrit rien.
+
+    Returns:
+        dict: compteurs {"scanned", "new", "updated", "unchanged"}
+    """
+    existing = GarmentRepo.index_by_sprite()  # une seule requête pour tout le catalogue
+    category_ids = {}  # cache nom -> id (évite une requête par sprite)
+    stats = {"scanned": 0, "new": 0, "updated": 0, "unchanged": 0}
+    rows = []
+
+    for category_name, sprite, meta in scan(clothes_dir):
+        stats["scanned"] += 1
+        if category_name not in category_ids:
+            category_ids[category_name] = CategoryRepo.create(category_name).id
+        category_id = category_ids[category_name]
+
+        sprite_path = sprite.as_posix()  # chemins stockés avec des "/" comme dans le seed
+        digest = file_hash(sprite)
+        current = existing.get(sprite_path)
+
+        if current is None:
+            # Nouveau vêtement : valeurs du sidecar, sinon nom tiré du fichier
+            name = meta.get("name", sprite.stem)
+            theme = meta.get("theme")
+            price = int(meta.get("price", 0))
+        else:
+            # Vêtement connu : le sidecar l'emporte, sinon on garde la valeur en base
+            old_name, _, old_theme, old_price, _ = current
+            name = meta.get("name", old_name)
+            theme = meta.get("theme", old_theme)
+            price = int(meta.get("price", old_price or 0))
+
+        theme = normalize_code(theme) or None  # "Chic" du sidecar = "chic" en base
+        row = (name, category_id, sprite_path, theme, price, digest)
+        if current is None:
+            stats["new"] += 1
+        elif (name, category_id, theme, price, digest) != current:
+            stats["updated"] += 1
+        else:
+            stats["unchanged"] += 1
+            continue  # rien à écrire
+        rows.append(row)
+
+    if not dry_run:
+        GarmentRepo.upsert_many(rows)  # une seule transaction pour tout le lot
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importe les sprites de assets/clothes dans la table garment.")
+    parser.add_argument("--dir", default=str(CLOTHES_DIR), help="dossier racine des vêtements")
+    parser.add_argument("--dry-run", action="store_true", help="affiche les changements sans écrire en base")
+    args = parser.parse_args(argv)
+
+    stats = import_catalog(Path(args.dir), dry_run=args.dry_run)
+    print(
+        f"✓ {stats['scanned']} sprites analysés : {stats['new']} nouveaux, "
+        f"{stats['updated']} modifiés, {stats['unchanged']} inchangés"
+        + (" (dry-run, rien n'a été écrit)" if args.dry_run else "")
+    )
+
+
+if __name__ == "__main__":
+    main()
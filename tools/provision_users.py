@@ -0,0 +1,95 @@
+# ========================================
+# CRÉATION DE COMPTES EN MASSE (ÉVÉNEMENTS)
+# Lit un CSV (username, display_name, password, avatar) et crée tous les comptes d'un coup
+# Usage (depuis la racine du projet) : py -m tools.provision_users comptes.csv
+# ========================================
+
+# === IMPORTS ===
+import argparse  # Lecture des options de la ligne de commande
+import csv  # Lecture du fichier CSV
+from concurrent.futures import ProcessPoolExecutor  # bcrypt réparti sur tous les cœurs
+from db import Database, hash_password  # Règles de validation + hachage partagés avec create_user
+from repositories import UserRepo  # Vérification des doublons + insertion groupée
+
+DEFAULT_AVATAR = "assets/avatars/default.png"  # Même avatar par défaut que Database.create_user
+
+
+def read_rows(csv_path: str):
+    """Lit le CSV et renvoie (numéro_de_ligne, username, display_name, password, avatar).
+
+    La première ligne doit contenir les en-têtes : username, display_name, password, avatar
+    (la colonne avatar est optionnelle).
+    """
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        for r in reader:
+            yield (
+                reader.line_num,  # numéro de ligne dans le fichier (pour les messages d'erreur)
+                (r.get("username") or "").strip(),
+                (r.get("display_name") or "").strip(),
+                r.get("password") or "",
+                (r.get("avatar") or "").strip() or DEFAULT_AVATAR,
+            )
+
+
+def provision(csv_path: str, workers=None):
+    """Valide, hache et insère les comptes du CSV.
+
+    Les lignes invalides ou en double sont signalées sans interrompre le lot.
+
+    Returns:
+        tuple: (nombre_de_comptes_créés, liste_d_erreurs[(ligne, username, message)])
+    """
+    errors = []
+    valid = []
+    seen = set()  # doublons à l'intérieur du fichier
+    for line, username, display_name, password, avatar in read_rows(csv_path):
+        error = Database.validate_user_fields(username, display_name, password)
+        if error is None and username in seen:
+            error = "Identifiant en double dans le fichier."
+        if error:
+            errors.append((line, username, error))
+            continue
+        seen.add(username)
+        valid.append((line, username, display_name, password, avatar))
+
+    # Doublons avec la base : retirés AVANT le hachage (bcrypt est l'étape coûteuse)
+    taken = UserRepo.existing_usernames([v[1] for v in valid])
+    todo = []
+    for v in valid:
+        if v[1] in taken:
+            errors.append((v[0], v[1], "Identifiant déjà utilisé."))
+        else:
+            todo.append(v)
+
+    # bcrypt sur plusieurs processus (le hachage est limité par le CPU)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        hashes = list(pool.map(hash_password, [v[3] for v in todo], chunksize=8))
+
+    rows = [(username, display_name, avatar, pw_hash)
+            for (_, username, display_name, _, avatar), pw_hash in zip(todo, hashes)]
+    created = UserRepo.create_many(rows)  # une seule transaction
+    if created < len(rows):
+        # Compte créé par quelqu'un d'autre entre la vérification et l'insertion
+        errors.append((None, None, f"{len(rows) - created} identifiant(s) pris entre-temps, ignoré(s)."))
+    errors.sort(key=lambda e: e[0] or 0)  # rapport dans l'ordre du fichier
+    return created, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Crée des comptes en masse depuis un CSV.")
+    parser.add_argument("csv", help="fichier CSV (username, display_name, password, avatar)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="nombre de processus bcrypt (défaut: nb de cœurs)")
+    args = parser.parse_args(argv)
+
+    created, errors = provision(args.csv, args.workers)
+    for line, username, message in errors:
+        where = f"ligne {line} ({username})" if line else "lot"
+        print(f"✗ {where} : {message}")
+    print(f"✓ {created} compte(s) créé(s), {len(errors)} erreur(s)")
+    if created:
+        UserRepo.export_if_changed()  # garde data/users_export.json à jour
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# ========================================
+# REJEU D'UNE PARTIE ENREGISTRÉE
+# Rejoue un enregistrement de py main.py --record sans fenêtre ni son, aussi vite que possible :
+# mêmes événements, mêmes durées de frame, même graine, tâches de fond vues finies aux mêmes frames.
+# Mesure le temps de chaque frame : une partie enregistrée devient un test de performance répétable
+# (et un ralentissement de l'habillage se reproduit à volonté). Les tâches de fond tournent sur le thread
+# de travail comme en jeu ; leur attente, avant la frame qui les libère, est mesurée à part.
+# Chaque rejeu travaille sur une copie temporaire de la base : data/game.db n'est jamais modifiée.
+# Usage (depuis la racine du projet) : py -m tools.replay partie.rec.gz --repeat 3
+# ========================================
+
+# === IMPORTS ===
+import argparse  # Lecture des options de la ligne de commande
+import json  # Export des mesures (--json)
+import os  # Pilotes SDL factices (aucune fenêtre, aucun son)
+import shutil  # Suppression de la copie de la base
+import sqlite3  # Copie cohérente de la base (API de sauvegarde, WAL compris)
+import tempfile  # Dossier de la copie
+import time  # Mesure de chaque frame
+from pathlib import Path
+from typing import List
+import numpy as np  # Percentiles des temps de frame
+import db  # Base utilisée par le jeu : remplacée par la copie le temps du rejeu
+from config import DB_PATH
+from input_recording import load_recording
+
+# === CONFIGURATION ===
+TOP_FRAMES = 5  # Frames les plus lentes affichées
+
+
+def _copy_database(source: str, folder: str) -> str:
+    """Copie la base `source` dans `folder` et renvoie le chemin de la copie."""
+    target = os.path.join(folder, "replay.db")
+    src = sqlite3.connect(Path(source).resolve().as_uri() + "?mode=ro", uri=True)  # lecture seule, jamais créée
+    dst = sqlite3.connect(target)
+    try:
+        src.backup(dst)
+    finally:
+        src.close()
+        dst.close()
+    return target
+
+
+def replay(recording: dict, database: str = DB_PATH) -> dict:
+    """Rejoue un enregistrement chargé par load_recording, sur une copie de la base `database`.
+
+    Connexions, inscriptions et déconnexions rejouées n'écrivent que dans la copie.
+
+    Returns:
+        dict: {"frames", "seconds", "frame_ms" (temps de chaque frame), "job_ms" (attente des tâches de fond
+               avant chaque frame, hors frame_ms), "scenes" (scène de chaque frame), "end_scene", "expected_end_scene"}
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    from main import Game  # après les pilotes : pg.init() a lieu dans Game
+
+    folder = tempfile.mkdtemp(prefix="newstyle-replay-")
+    previous = db.get_database()
+    try:
+        db.configure(_copy_database(database, folder))  # même état de départ à chaque rejeu
+        game = Game(replay=recording)
+        frame_ms: List[float] = []
+        job_ms: List[float] = []
+        scenes: List[str] = []
+        t0 = time.perf_counter()
+        for frame_dt, events, released in recording["frames"]:
+            if not game.running:
+                break
+            job_ms.append(game.wait_jobs(released))  # tâches vues finies à cette frame : attendues hors chrono
+            start = time.perf_counter()
+            game.step(frame_dt, events, released)
+            frame_ms.append((time.perf_counter() - start) * 1000)
+            scenes.append(type(game.scene).__name__)
+        seconds = time.perf_counter() - t0
+        end_scene = type(game.scene).__name__
+        game.worker.shutdown(wait=True)
+        game.audio.shutdown()
+        db.DB.close()
+    finally:
+        db.use_database(previous)
+        shutil.rmtree(folder, ignore_errors=True)
+    return {"frames": len(frame_ms), "seconds": seconds, "frame_ms": frame_ms, "job_ms": job_ms, "scenes": scenes,
+            "end_scene": end_scene, "expected_end_scene": recording["end"]["scene"]}
+
+
+def print_report(result: dict):
+    times = np.array(result["frame_ms"])
+    if not len(times):
+        print("✗ Enregistrement vide")
+        return
+    print(f"✓ {result['frames']} frames rejouées en {result['seconds']:.2f} s "
+          f"(moyenne {times.mean():.2f} ms, p50 {np.percentile(times, 50):.2f}, p95 {np.percentile(times, 95):.2f}, "
+          f"p99 {np.percentile(times, 99):.2f}, max {times.max():.2f} ms)")
+    by_scene = {}
+    for ms, scene in zip(times, result["scenes"]):
+        by_scene.setdefault(scene, []).append(ms)
+    for scene, values in by_scene.items():
+        print(f"  {scene:<14} {len(values):>6} frames, moyenne {np.mean(values):.2f} ms, max {np.max(values):.2f} ms")
+    jobs = np.array(result["job_ms"])
+    if jobs.any():
+        print(f"  tâches de fond : {np.count_nonzero(jobs)} attente(s) hors frames, total {jobs.sum():.1f} ms, "
+              f"max {jobs.max():.1f} ms")
+    slowest = np.argsort(-times, kind="stable")[:TOP_FRAMES]
+    print("  plus lentes : " + ", ".join(f"#{i} {result['scenes'][i]} ({times[i]:.1f} ms)" for i in slowest))
+    if result["end_scene"] != result["expected_end_scene"]:
+        print(f"⚠ Rejeu divergent : fin sur {result['end_scene']} au lieu de {result['expected_end_scene']} "
+              f"(base de données différente de celle de l'enregistrement ?)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rejoue une partie enregistrée (py main.py --record) et mesure ses frames.")
+    parser.add_argument("path", help="fichier d'enregistrement")
+    parser.add_argument("--repeat", type=int, default=1, help="nombre de rejeux (le premier réchauffe les caches)")
+    parser.add_argument("--db", default=DB_PATH, help="base copiée pour le rejeu (celle de l'enregistrement)")
+    parser.add_argument("--json", default=None, help="écrit aussi les temps de frame du dernier rejeu dans ce fichier")
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.db):
+        parser.error(f"base introuvable : {args.db}")
+
+    recording = load_recording(args.path)
+    for _ in range(args.repeat):
+        result = replay(recording, args.db)
+        print_report(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f)
+        print(f"\n✓ Mesures complètes : {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,23 @@
 # ========================================
 # DISQUE DE MUSIQUE - WIDGET INTERACTIF
 # Widget affichant un disque vinyl tournant
+# Vitesse et pulsation suivent la musique (enveloppes précalculées par py -m tools.analyze_audio)
 # ========================================
 
 # === IMPORTS ===
 import pygame as pg  # Pygame pour le rendu graphique
 
+# === RÉACTION À LA MUSIQUE ===
+SPEED_MIN = 0.4  # Vitesse (x speed_deg) dans un passage silencieux
+SPEED_MAX = 1.6  # Vitesse (x speed_deg) au volume maximal
+PULSE_SCALE = 0.06  # Le disque grossit de 6 % sur un temps fort
+SMOOTHING = 12.0  # Vitesse de lissage (par seconde) : évite les à-coups entre deux valeurs de l'enveloppe
+
 
 # === CLASSE DISQUE MUSICAL ===
 class MusicDiscWidget:
     """Widget affichant un disque vinyl tournant avec un bouton au centre."""
+    EVENT_TYPES = frozenset({pg.MOUSEBUTTONDOWN})  # seuls les clics sont traités
     
     def __init__(self, game, disc_path, button_path, size=220, anchor="topleft", margin=16, speed_deg=60):
         """Crée un widget disque musical."""
@@ -19,6 +27,9 @@ class MusicDiscWidget:
         self.margin = margin  # Marge par rapport au bord
         self.speed_deg = speed_deg  # Vitesse de rotation en degrés par seconde
         self.angle = 0.0  # Angle de rotation actuel
+        self.prev_angle = 0.0  # Angle à la mise à jour précédente (interpolation au dessin)
+        self.energy = 0.5  # Volume lissé de la musique (0 à 1)
+        self.pulse = 0.0  # Pulsation lissée (1 = temps fort)
 
         # Charge le disque en préservant ses proportions
         disc = pg.image.load(disc_path)
@@ -105,24 +116,36 @@ class MusicDiscWidget:
 
     def update(self, dt):
         """Met à jour l'angle de rotation (appelé chaque frame)."""
+        # Volume et battement à la position de lecture : simple lecture de table, aucune analyse audio
+        level = self.game.audio.level() if self.game.audio else None
+        if level is None:
+            speed = self.speed_deg  # piste non analysée (ou pas de musique) : vitesse constante
+            energy, pulse = 0.5, 0.0
+        else:
+            energy, pulse = level
+            speed = self.speed_deg * (SPEED_MIN + (SPEED_MAX - SPEED_MIN) * self.energy)
+        k = min(1.0, SMOOTHING * dt)
+        self.energy += (energy - self.energy) * k
+        self.pulse += (pulse - self.pulse) * k
         # dt = temps écoulé depuis la dernière frame
         # Augmente l'angle à chaque frame
-        self.angle = (self.angle + self.speed_deg * dt) % 360
+        self.prev_angle = self.angle
+        self.angle = (self.angle + speed * dt) % 360
 
     def handle_event(self, event):
         """Gère les clics souris sur le bouton."""
         # Vérifie si clic gauche sur le bouton
-        if event.type == pg.MOUSEBUTTONDOWN and event.button == 1:
+        if event.type in self.EVENT_TYPES and event.button == 1:
             if self.btn_rect.collidepoint(event.pos):
                 # Passe à la piste suivante
                 self.game.audio.next_track()
                 return True
         return False
 
-    def draw(self, screen):
-        """Dessine le disque tournant et le bouton."""
+    def draw(self, screen, alpha=1.0):
+        """Dessine le disque tournant et le bouton (angle interpolé entre les deux dernières mises à jour)."""
         # Calcule l'offset de parallax inverse en fonction de la position souris
-        mx, my = pg.mouse.get_pos()
+        mx, my = self.game.mouse_pos
         mouse = pg.Vector2(mx, my)
         dir_vec = mouse - self.center
         dist = dir_vec.length()
@@ -140,7 +163,9 @@ class MusicDiscWidget:
         render_center = self.center + offset - 1.5 * offset  # Ajuste pour que le disque "s'éloigne" légèrement de la souris (parallax inverse)
 
         # Disque tournant : applique une rotation à l'image
-        rotated = pg.transform.rotozoom(self.disc_base, -self.angle, 1.0)
+        step = (self.angle - self.prev_angle) % 360  # le disque tourne toujours dans le même sens
+        angle = self.prev_angle + step * alpha
+        rotated = pg.transform.rotozoom(self.disc_base, -angle, 1.0 + PULSE_SCALE * self.pulse)
         rect = rotated.get_rect(center=render_center)
         # Dessine le disque sur l'écran
         screen.blit(rotated, rect)
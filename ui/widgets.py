@@ -1,7 +1,11 @@
+import math  # calculs d'angles pour le Spinner
 import pygame as pg  # wrapper pygame importé sous le nom pg
+from audio_manager import SFX  # effet sonore du clic (décodé au démarrage)
 
 
 class Button:  # Widget simple de bouton
+    EVENT_TYPES = frozenset({pg.MOUSEBUTTONDOWN})  # seuls les clics sont traités (les scènes filtrent avant d'appeler handle)
+
     def __init__(self, rect, text, on_click):  # rect: tuple/rect, text: label, on_click: callable
         self.rect = pg.Rect(rect)  # stocke le rectangle du bouton (x,y,w,h)
         self.text = text  # texte affiché sur le bouton
@@ -18,4 +22,23 @@ class Button:  # Widget simple de bouton
 
     def handle(self, event):  # Gère les événements pygame pour le bouton
         if event.type == pg.MOUSEBUTTONDOWN and self.rect.collidepoint(event.pos):  # clic dans le rect ?
-            self.on_click()  # appelle le callback associé
\ No newline at end of file
+            SFX.play("click")  # effet déjà décodé : aucun coût de chargement
+            self.on_click()  # appelle le callback associé
+
+class Spinner:  # Indicateur d'attente (arc qui tourne) pendant une tâche en arrière-plan
+    def __init__(self, center, radius=12, speed_deg=360):  # center: (x,y), speed_deg: degrés par seconde
+        self.center = center  # centre du spinner
+        self.radius = radius  # rayon en pixels
+        self.speed_deg = speed_deg  # vitesse de rotation
+        self.angle = 0.0  # angle courant en degrés
+
+
+    def update(self, dt):  # Avance l'animation (dt en secondes)
+        self.angle = (self.angle + self.speed_deg * dt) % 360  # rotation continue
+
+
+    def draw(self, surf):  # Dessine un arc de 270° qui tourne
+        rect = pg.Rect(0, 0, self.radius * 2, self.radius * 2)  # carré englobant le cercle
+        rect.center = self.center  # centré sur la position demandée
+        start = math.radians(self.angle)  # début de l'arc en radians
+        pg.draw.arc(surf, (10,104,255), rect, start, start + math.radians(270), 3)  # arc bleu (même couleur que Button)